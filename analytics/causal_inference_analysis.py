@@ -25,305 +25,445 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .event_study import EventStudy, EVENT_STUDY_OUTCOMES
+    from .panel_regression import FixedEffects, PanelRegression, group_codes
+    from .staggered_did import StaggeredDiD
+    from .iv_regression import IVRegression, StreamingIVRegression
+    from .synthetic_control import SyntheticControl
+    from .heterogeneity import HeterogeneityCube
+    from .panel_store import PanelStore, StreamingPanelRegression
+    from .resampling_inference import (WildClusterBootstrap, RandomizationInference,
+                                       adoption_contributions, instrument_contributions)
+except ImportError:
+    from event_study import EventStudy, EVENT_STUDY_OUTCOMES
+    from panel_regression import FixedEffects, PanelRegression, group_codes
+    from staggered_did import StaggeredDiD
+    from iv_regression import IVRegression, StreamingIVRegression
+    from synthetic_control import SyntheticControl
+    from heterogeneity import HeterogeneityCube
+    from panel_store import PanelStore, StreamingPanelRegression
+    from resampling_inference import (WildClusterBootstrap, RandomizationInference,
+                                      adoption_contributions, instrument_contributions)
+
+# Firm attribute categories
+INDUSTRIES = ['Manufacturing', 'Services', 'Finance', 'Healthcare', 'Retail', 'Technology']
+PREFECTURES = ['Tokyo', 'Osaka', 'Nagoya', 'Fukuoka', 'Sendai', 'Hiroshima']
+SIZE_CATEGORIES = ['Micro', 'Small', 'Medium', 'Large']
+
+# AI adoption probability multipliers
+SIZE_ADOPTION_MULTIPLIERS = {
+    'Micro': 0.4, 'Small': 0.7, 'Medium': 1.0, 'Large': 1.8
+}
+INDUSTRY_ADOPTION_MULTIPLIERS = {
+    'Technology': 2.0, 'Finance': 1.5, 'Manufacturing': 1.2,
+    'Services': 1.0, 'Healthcare': 0.9, 'Retail': 0.8
+}
+
 class CausalInferenceAnalysis:
     """
     Comprehensive causal inference analysis for AI investment effects on productivity
     """
     
+    # Firm-period float columns (optionally stored as float32)
+    PANEL_FLOAT_COLUMNS = ['productivity_level', 'revenue_per_employee', 'productivity_growth',
+                           'true_ai_effect', 'covid_effect', 'macro_shock', 'industry_shock']
+    
+    # Firm-level columns carried on every panel row
+    PANEL_FIRM_COLUMNS = ['industry', 'prefecture', 'size_category', 'ceo_gender',
+                          'ai_adoption', 'adoption_period']
+    
+    # Excluded instruments and exogenous firm controls for the IV analysis
+    IV_INSTRUMENTS = ['subsidy_eligible', 'university_partnerships', 'supplier_ai_rate']
+    IV_CONTROLS = ['digital_maturity', 'ceo_tech_background']
+    
+    # CEO age bands for the heterogeneity analysis
+    CEO_AGE_BINS = [30, 45, 55, 70]
+    CEO_AGE_GROUPS = ['Young', 'Middle', 'Senior']
+    
     def __init__(self):
         self.data = None
+        self.store = None
+        self.firms = None
         self.treatment_effects = {}
+        self.event_study_results = {}
+        self._fixed_effects = {}
+        self._heterogeneity_cube = None
         self.heterogeneous_effects = {}
         self.robustness_results = {}
         
-    def generate_comprehensive_dataset(self, n_firms=1000, n_periods=20):
+    def generate_comprehensive_dataset(self, n_firms=1000, n_periods=20, seed=42,
+                                       float32_outcomes=False):
         """
         Generate realistic dataset with embedded causal structure
+        
+        Firm attributes, adoption events and firm-period shocks are drawn as
+        arrays and the panel is assembled by broadcasting firm-level values
+        over periods.
+        
+        Firm-level data lives once per firm in self.firms, indexed by an
+        integer firm_id (the 'JP_0000' labels are kept as firm_label). The
+        panel in self.data carries firm_id, the firm-period outcomes, the
+        treatment timing (ai_adoption, nullable adoption_period) and the
+        categorical dimensions industry, prefecture, size_category and
+        ceo_gender, attached by positional lookup on the firm codes. Other
+        firm attributes are read through firm_attribute. Set
+        float32_outcomes to store the firm-period outcomes as float32.
         """
-        np.random.seed(42)
+        rng = np.random.default_rng(seed)
         
         print("🔬 GENERATING CAUSAL INFERENCE DATASET")
         print("=" * 50)
         
-        # Firm characteristics
-        firms = []
-        industries = ['Manufacturing', 'Services', 'Finance', 'Healthcare', 'Retail', 'Technology']
-        prefectures = ['Tokyo', 'Osaka', 'Nagoya', 'Fukuoka', 'Sendai', 'Hiroshima']
-        
-        for i in range(n_firms):
-            # Firm size (log-normal distribution)
-            employees = int(np.random.lognormal(4, 1.5))
-            revenue = np.random.lognormal(8, 1.2) * 1e6
-            
-            if employees < 50:
-                size_category = 'Micro'
-            elif employees < 300:
-                size_category = 'Small'  
-            elif employees < 1000:
-                size_category = 'Medium'
+        firms_df = self._generate_firms(n_firms, rng)
+        ai_df = self._generate_ai_events(firms_df, rng)
+        self.firms = firms_df.join(ai_df)
+        panel = self._generate_panel(self.firms, n_periods, rng)
+        
+        if float32_outcomes:
+            for column in self.PANEL_FLOAT_COLUMNS:
+                panel[column] = panel[column].astype(np.float32)
+        
+        # Firm-level dimensions and treatment timing by position (firm-major rows)
+        firm_index = panel['firm_id']
+        for column in self.PANEL_FIRM_COLUMNS:
+            values = self.firms[column].array
+            if isinstance(values, pd.Categorical):
+                panel[column] = pd.Categorical.from_codes(values.codes[firm_index], dtype=values.dtype)
             else:
-                size_category = 'Large'
-            
-            firm = {
-                'firm_id': f'JP_{i:04d}',
-                'industry': np.random.choice(industries),
-                'prefecture': np.random.choice(prefectures),
-                'employees_2020': employees,
-                'revenue_2020': revenue,
-                'size_category': size_category,
-                'digital_maturity': np.random.randint(1, 6),
-                'distance_to_tokyo': np.random.exponential(2) * 100,
-                
-                # Executive characteristics
-                'ceo_age': np.random.randint(35, 70),
-                'ceo_gender': np.random.choice(['Male', 'Female'], p=[0.85, 0.15]),
-                'ceo_tech_background': np.random.choice([0, 1], p=[0.7, 0.3]),
-                
-                # Instrumental variables
-                'subsidy_eligible': int(np.random.random() < 0.3),
-                'university_partnerships': np.random.poisson(1.5),
-                'supplier_ai_rate': np.random.beta(2, 3),
-            }
-            firms.append(firm)
+                panel[column] = values.take(firm_index)
         
-        firms_df = pd.DataFrame(firms)
+        self.data = pd.DataFrame(panel, copy=False)
+        self.store = None
+        self._fixed_effects = {}
+        self._heterogeneity_cube = None
         
-        # Generate AI adoption events (staggered treatment)
-        ai_events = []
-        for _, firm in firms_df.iterrows():
-            # AI adoption probability depends on firm characteristics
-            adoption_prob = self._calculate_adoption_probability(firm)
-            
-            if np.random.random() < adoption_prob:
-                # Random adoption timing (2021-2023)
-                adoption_period = np.random.choice(range(5, 16))  # Periods 5-15
-                
-                ai_event = {
-                    'firm_id': firm['firm_id'],
-                    'ai_adoption': 1,
-                    'adoption_period': adoption_period,
-                    'investment_amount': np.random.lognormal(6, 1) * 1e6,
-                    'implementation_quality': np.random.beta(3, 2),
-                }
-            else:
-                ai_event = {
-                    'firm_id': firm['firm_id'],
-                    'ai_adoption': 0,
-                    'adoption_period': None,
-                    'investment_amount': 0,
-                    'implementation_quality': None,
-                }
-            
-            ai_events.append(ai_event)
+        print(f"✅ Dataset generated!")
+        print(f"📊 Firms: {n_firms}")
+        print(f"🤖 AI Adopters: {ai_df['ai_adoption'].sum()}")
+        print(f"📈 Panel Observations: {len(self.data)}")
+        print(f"🎯 Treatment Observations: {self.data['post_treatment'].sum()}")
         
-        ai_df = pd.DataFrame(ai_events)
+        return self.data
+    
+    def save_panel(self, path, partition_by='period'):
+        """
+        Write the panel and firm table as a partitioned Parquet store
         
-        # Generate panel productivity data
-        panel_data = []
+        Partitioning by 'period' or 'industry' keeps every partition small;
+        open_panel analyzes the store out of core.
+        """
+        return PanelStore.write(path, self.data, self.firms, partition_by=partition_by)
+    
+    def open_panel(self, path, batch_size=1_000_000):
+        """
+        Analyze a partitioned panel store out of core
         
-        for _, firm in firms_df.iterrows():
-            firm_ai = ai_df[ai_df['firm_id'] == firm['firm_id']].iloc[0]
-            base_productivity = np.random.normal(1.0, 0.2)  # Firm-specific base
-            
-            for period in range(n_periods):
-                # Determine if post-treatment
-                is_post_treatment = (
-                    firm_ai['ai_adoption'] == 1 and 
-                    firm_ai['adoption_period'] is not None and
-                    period >= firm_ai['adoption_period']
-                )
-                
-                # Generate productivity with causal effects
-                productivity_data = self._generate_productivity_outcome(
-                    firm, firm_ai, period, is_post_treatment, base_productivity
-                )
-                
-                panel_data.append(productivity_data)
+        Nothing of the panel is kept in memory: the event study, DiD, IV
+        and heterogeneity analyses stream the store in batches of about
+        batch_size rows, reading only the columns they use, and accumulate
+        sufficient statistics. Firm attributes are read from the store's
+        firm table into self.firms.
+        """
+        self.store = PanelStore(path, batch_size=batch_size)
+        self.firms = self.store.firms()
+        self.data = None
+        self._fixed_effects = {}
+        self._heterogeneity_cube = None
+        return self.store
+    
+    def _require_data(self, analysis):
+        if self.data is None:
+            raise ValueError(f"{analysis} needs the panel in memory; out-of-core stores support "
+                             f"the event study, DiD, IV and heterogeneity analyses")
+    
+    def _streamed_means(self, column, key, inputs=(), where=None):
+        """Mean of a stored column by key(batch), skipping rows with a missing key"""
+        totals = []
+        for batch in self.store.scan([column, *inputs], where):
+            keys = np.asarray(key(batch), dtype=float)
+            valid = ~np.isnan(keys)
+            totals.append(batch[column][valid].groupby(keys[valid]).agg(['sum', 'count']))
+        totals = pd.concat(totals).groupby(level=0).sum()
+        return totals['sum'] / totals['count']
+    
+    def _post_treatment_mean(self, column, where=None):
+        """Mean of a stored column over post-adoption rows"""
+        def post(batch):
+            return np.where(batch['post_treatment'] == 1, 1.0, np.nan)
         
-        panel_df = pd.DataFrame(panel_data)
+        return self._streamed_means(column, post, ['post_treatment'], where).iloc[0]
+    
+    def fixed_effects(self, absorb=('firm_id', 'period')):
+        """
+        Absorbed fixed effects of the panel, built once per specification
         
-        # Merge all data
-        self.data = panel_df.merge(firms_df, on='firm_id').merge(ai_df, on='firm_id')
+        Shared by the estimators, so residualized outcomes are reused
+        across methods and specifications.
+        """
+        key = tuple(absorb)
+        if key not in self._fixed_effects:
+            self._fixed_effects[key] = FixedEffects(self.data, absorb)
+        return self._fixed_effects[key]
+    
+    def heterogeneity_cube(self, outcomes=('productivity_growth', 'true_ai_effect')):
+        """
+        Size x industry x CEO age band x CEO gender x treatment status cube
         
-        print(f"✅ Dataset generated!")
-        print(f"📊 Firms: {n_firms}")
-        print(f"🤖 AI Adopters: {ai_df['ai_adoption'].sum()}")
-        print(f"📈 Panel Observations: {len(panel_df)}")
-        print(f"🎯 Treatment Observations: {self.data['post_treatment'].sum()}")
+        Built in one pass over the panel (or the streamed store) and kept
+        for drill-downs; rebuilt only when outcomes not yet in the cube are
+        requested.
+        """
+        cube = self._heterogeneity_cube
+        if cube is None or not set(outcomes) <= set(cube.outcomes):
+            dimensions = {
+                'size_category': self.firms['size_category'],
+                'industry': self.firms['industry'],
+                'ceo_age_group': pd.cut(self.firms['ceo_age'], bins=self.CEO_AGE_BINS,
+                                        labels=self.CEO_AGE_GROUPS),
+                'ceo_gender': self.firms['ceo_gender']
+            }
+            if cube is not None:
+                outcomes = list(dict.fromkeys([*cube.outcomes, *outcomes]))
+            data = self.data
+            if self.store is not None:
+                data = self.store.scan(['firm_id', 'ai_adoption', 'post_treatment', *outcomes])
+            self._heterogeneity_cube = HeterogeneityCube(data, dimensions, outcomes)
+        return self._heterogeneity_cube
+    
+    def firm_attribute(self, column, rows=None):
+        """
+        Firm-level attribute aligned with panel rows
         
-        return self.data
+        Looks the value up in self.firms by integer firm_id instead of
+        storing it once per period.
+        """
+        rows = self.data if rows is None else rows
+        return pd.Series(self.firms[column].array.take(rows['firm_id'].to_numpy()),
+                         index=rows.index, name=column)
+    
+    def _generate_firms(self, n_firms, rng):
+        """Draw firm characteristics and instruments, one row per firm"""
+        # Firm size (log-normal distribution, at least one employee)
+        employees = np.maximum(rng.lognormal(4, 1.5, n_firms).astype(np.int64), 1)
+        revenue = rng.lognormal(8, 1.2, n_firms) * 1e6
+        size_codes = np.searchsorted([50, 300, 1000], employees, side='right')
+        
+        def categorical(codes, categories, ordered=False):
+            return pd.Categorical.from_codes(codes.astype(np.int8), categories=categories, ordered=ordered)
+        
+        firm_numbers = np.arange(n_firms).astype(str)
+        return pd.DataFrame({
+            'firm_label': np.char.add('JP_', np.char.zfill(firm_numbers, 4)).astype(object),
+            'industry': categorical(rng.integers(0, len(INDUSTRIES), n_firms), INDUSTRIES),
+            'prefecture': categorical(rng.integers(0, len(PREFECTURES), n_firms), PREFECTURES),
+            'employees_2020': employees.astype(np.int32),
+            'revenue_2020': revenue,
+            'size_category': categorical(size_codes, SIZE_CATEGORIES, ordered=True),
+            'digital_maturity': rng.integers(1, 6, n_firms).astype(np.int8),
+            'distance_to_tokyo': rng.exponential(2, n_firms) * 100,
+            
+            # Executive characteristics
+            'ceo_age': rng.integers(35, 70, n_firms).astype(np.int8),
+            'ceo_gender': categorical((rng.random(n_firms) < 0.15).astype(int), ['Male', 'Female']),
+            'ceo_tech_background': (rng.random(n_firms) < 0.3).astype(np.int8),
+            
+            # Instrumental variables
+            'subsidy_eligible': (rng.random(n_firms) < 0.3).astype(np.int8),
+            'university_partnerships': rng.poisson(1.5, n_firms).astype(np.int16),
+            'supplier_ai_rate': rng.beta(2, 3, n_firms),
+        }, index=pd.RangeIndex(n_firms, name='firm_id'))
+    
+    def _generate_ai_events(self, firms_df, rng):
+        """Draw AI adoption events (staggered treatment), one row per firm"""
+        n_firms = len(firms_df)
+        
+        # AI adoption probability depends on firm characteristics
+        adopted = rng.random(n_firms) < self._calculate_adoption_probability(firms_df)
+        
+        # Random adoption timing (2021-2023), investment and quality for adopters
+        adoption_period = rng.integers(5, 16, n_firms)
+        investment_amount = np.where(adopted, rng.lognormal(6, 1, n_firms) * 1e6, 0.0)
+        implementation_quality = np.where(adopted, rng.beta(3, 2, n_firms), np.nan)
+        
+        return pd.DataFrame({
+            'ai_adoption': adopted.astype(np.int8),
+            'adoption_period': pd.arrays.IntegerArray(adoption_period.astype(np.int16), ~adopted),
+            'investment_amount': investment_amount,
+            'implementation_quality': implementation_quality,
+        }, index=firms_df.index)
     
-    def _calculate_adoption_probability(self, firm):
+    def _calculate_adoption_probability(self, firms):
         """Calculate AI adoption probability based on firm characteristics"""
         base_prob = 0.25
         
         # Size effect (larger firms more likely to adopt)
-        size_multiplier = {
-            'Micro': 0.4, 'Small': 0.7, 'Medium': 1.0, 'Large': 1.8
-        }[firm['size_category']]
+        size_multiplier = firms['size_category'].map(SIZE_ADOPTION_MULTIPLIERS).to_numpy(dtype=float)
         
         # Industry effect
-        industry_multiplier = {
-            'Technology': 2.0, 'Finance': 1.5, 'Manufacturing': 1.2,
-            'Services': 1.0, 'Healthcare': 0.9, 'Retail': 0.8
-        }[firm['industry']]
+        industry_multiplier = firms['industry'].map(INDUSTRY_ADOPTION_MULTIPLIERS).to_numpy(dtype=float)
         
         # Location effect (Tokyo advantage)
-        location_multiplier = 1.4 if firm['prefecture'] == 'Tokyo' else 1.0
+        location_multiplier = np.where(firms['prefecture'] == 'Tokyo', 1.4, 1.0)
         
         # Digital maturity effect
-        digital_multiplier = firm['digital_maturity'] / 3.0
+        digital_multiplier = firms['digital_maturity'].to_numpy() / 3.0
         
         # CEO characteristics
-        tech_multiplier = 1.3 if firm['ceo_tech_background'] else 1.0
-        age_multiplier = 1.2 if 40 <= firm['ceo_age'] <= 55 else 1.0
+        tech_multiplier = np.where(firms['ceo_tech_background'] == 1, 1.3, 1.0)
+        age_multiplier = np.where(firms['ceo_age'].between(40, 55), 1.2, 1.0)
         
         final_prob = (base_prob * size_multiplier * industry_multiplier * 
                      location_multiplier * digital_multiplier * 
                      tech_multiplier * age_multiplier)
         
-        return min(final_prob, 0.85)  # Cap at 85%
+        return np.minimum(final_prob, 0.85)  # Cap at 85%
     
-    def _generate_productivity_outcome(self, firm, firm_ai, period, is_post_treatment, base_productivity):
-        """Generate productivity outcomes with embedded causal effects"""
+    def _generate_panel(self, firms_df, n_periods, rng):
+        """Generate firm-period productivity outcomes with embedded causal effects"""
+        n_firms = len(firms_df)
+        shape = (n_firms, n_periods)
+        period = np.arange(n_periods)
+        base_productivity = rng.normal(1.0, 0.2, n_firms)  # Firm-specific base
         
         # Base trend
         trend = 0.02  # 2% quarterly growth
         
         # Random shocks
-        firm_shock = np.random.normal(0, 0.01)
-        industry_shock = np.random.normal(0, 0.015)
-        macro_shock = np.random.normal(0, 0.02)
+        firm_shock = rng.normal(0, 0.01, shape)
+        industry_shock = rng.normal(0, 0.015, shape)
+        macro_shock = rng.normal(0, 0.02, shape)
         
         # COVID impact (periods 0-7)
-        covid_effect = 0
-        if period <= 3:  # 2020
-            covid_effect = np.random.normal(-0.1, 0.03)
-        elif period <= 7:  # 2021
-            covid_effect = np.random.normal(-0.04, 0.02)
+        covid_effect = np.zeros(shape)
+        covid_2020 = period <= 3
+        covid_2021 = (period > 3) & (period <= 7)
+        covid_effect[:, covid_2020] = rng.normal(-0.1, 0.03, (n_firms, covid_2020.sum()))
+        covid_effect[:, covid_2021] = rng.normal(-0.04, 0.02, (n_firms, covid_2021.sum()))
         
         # CAUSAL AI EFFECT
-        ai_effect = 0
-        if is_post_treatment:
-            periods_since_treatment = period - firm_ai['adoption_period']
-            
-            # Base causal effect varies by firm characteristics
-            base_ai_effect = self._calculate_true_ai_effect(firm, firm_ai)
-            
-            # Dynamic effect (ramps up over time)
-            if periods_since_treatment <= 3:
-                ramp_multiplier = periods_since_treatment / 3
-            else:
-                ramp_multiplier = 1.0
-            
-            ai_effect = base_ai_effect * ramp_multiplier
+        adopted = firms_df['ai_adoption'].to_numpy()[:, None] == 1
+        adoption_period = firms_df['adoption_period'].to_numpy(dtype=np.int16, na_value=0)[:, None]
+        is_post_treatment = adopted & (period >= adoption_period)
+        periods_since_treatment = np.where(is_post_treatment, period - adoption_period, 0).astype(np.int16)
+        
+        # Base causal effect varies by firm characteristics
+        base_ai_effect = self._calculate_true_ai_effect(firms_df)[:, None]
+        
+        # Dynamic effect (ramps up over 3 periods)
+        ramp_multiplier = np.minimum(periods_since_treatment / 3, 1.0)
+        ai_effect = np.where(is_post_treatment, base_ai_effect * ramp_multiplier, 0.0)
         
         # Total productivity growth
         total_growth = trend + firm_shock + industry_shock + macro_shock + covid_effect + ai_effect
         
         # Calculate levels
-        productivity_level = base_productivity * (1 + total_growth) ** period
-        revenue_per_employee = (firm['revenue_2020'] / firm['employees_2020']) * productivity_level
+        productivity_level = base_productivity[:, None] * (1 + total_growth) ** period
+        revenue_per_employee = ((firms_df['revenue_2020'] / firms_df['employees_2020']).to_numpy()[:, None]
+                                * productivity_level)
         
         return {
-            'firm_id': firm['firm_id'],
-            'period': period,
-            'year': 2020 + period // 4,
-            'quarter': (period % 4) + 1,
+            'firm_id': np.repeat(firms_df.index.to_numpy(dtype=np.int32), n_periods),
+            'period': np.tile(period.astype(np.int16), n_firms),
+            'year': np.tile((2020 + period // 4).astype(np.int16), n_firms),
+            'quarter': np.tile((period % 4 + 1).astype(np.int8), n_firms),
             
             # Outcome variables
-            'productivity_level': productivity_level,
-            'revenue_per_employee': revenue_per_employee,
-            'productivity_growth': total_growth,
+            'productivity_level': productivity_level.ravel(),
+            'revenue_per_employee': revenue_per_employee.ravel(),
+            'productivity_growth': total_growth.ravel(),
             
             # Treatment indicators
-            'post_treatment': int(is_post_treatment),
-            'periods_since_treatment': period - firm_ai['adoption_period'] if is_post_treatment else 0,
+            'post_treatment': is_post_treatment.ravel().astype(np.int8),
+            'periods_since_treatment': periods_since_treatment.ravel(),
             
             # Components (for validation)
-            'true_ai_effect': ai_effect,
-            'covid_effect': covid_effect,
-            'macro_shock': macro_shock,
-            'industry_shock': industry_shock,
+            'true_ai_effect': ai_effect.ravel(),
+            'covid_effect': covid_effect.ravel(),
+            'macro_shock': macro_shock.ravel(),
+            'industry_shock': industry_shock.ravel(),
         }
     
-    def _calculate_true_ai_effect(self, firm, firm_ai):
-        """Calculate true causal effect of AI (heterogeneous by firm type)"""
-        if firm_ai['ai_adoption'] == 0:
-            return 0
-        
+    def _calculate_true_ai_effect(self, firms):
+        """Calculate true causal effect of AI (heterogeneous by firm type and adoption)"""
         # Base effect
         base_effect = 0.025  # 2.5% quarterly productivity gain
         
         # Size heterogeneity (larger firms benefit more)
-        size_multiplier = {
+        size_multiplier = firms['size_category'].map({
             'Micro': 0.3, 'Small': 0.6, 'Medium': 1.0, 'Large': 1.8
-        }[firm['size_category']]
+        }).to_numpy(dtype=float)
         
         # Industry heterogeneity
-        industry_multiplier = {
+        industry_multiplier = firms['industry'].map({
             'Technology': 1.6, 'Finance': 1.4, 'Manufacturing': 1.2,
             'Services': 1.0, 'Healthcare': 0.9, 'Retail': 0.7
-        }[firm['industry']]
+        }).to_numpy(dtype=float)
         
         # Implementation quality
-        quality_multiplier = firm_ai['implementation_quality'] if firm_ai['implementation_quality'] else 0.5
+        quality = firms['implementation_quality'].to_numpy()
+        quality_multiplier = np.where(np.isnan(quality) | (quality == 0), 0.5, quality)
         
         # Investment amount (log effect)
-        investment_multiplier = np.log(firm_ai['investment_amount'] / 1e6) / 10
+        adopted = firms['ai_adoption'].to_numpy() == 1
+        investment = firms['investment_amount'].to_numpy()
+        investment_multiplier = np.zeros(len(investment))
+        investment_multiplier[adopted] = np.log(investment[adopted] / 1e6) / 10
         
-        return base_effect * size_multiplier * industry_multiplier * quality_multiplier * investment_multiplier
+        effect = base_effect * size_multiplier * industry_multiplier * quality_multiplier * investment_multiplier
+        return np.where(adopted, effect, 0.0)
     
-    def run_event_study(self, outcome='productivity_growth', window=(-4, 4)):
+    def run_event_study(self, outcome='productivity_growth', window=(-4, 4),
+                        outcomes=EVENT_STUDY_OUTCOMES):
         """
         Event study analysis around AI adoption
+        
+        Leads and lags are estimated jointly with firm and period fixed
+        effects, never-treated firms as controls, and firm-clustered
+        standard errors. All outcomes share one projection; the full
+        tables are kept in self.event_study_results and the requested
+        outcome is reported. With an open store the regression runs out of
+        core.
         """
         print(f"\n🔍 EVENT STUDY ANALYSIS: {outcome}")
         print("=" * 50)
         
-        # Filter to treated firms
-        treated_data = self.data[self.data['ai_adoption'] == 1].copy()
-        
-        if len(treated_data) == 0:
+        n_treated = int((self.firms['ai_adoption'] == 1).sum())
+        if not n_treated:
             print("❌ No treated firms found!")
             return None
         
-        # Create event time relative to treatment
-        treated_data['event_time'] = treated_data['periods_since_treatment']
-        treated_data.loc[treated_data['post_treatment'] == 0, 'event_time'] = (
-            treated_data.loc[treated_data['post_treatment'] == 0, 'period'] - 
-            treated_data.loc[treated_data['post_treatment'] == 0, 'adoption_period']
-        )
-        
-        # Filter to event window
-        event_data = treated_data[
-            (treated_data['event_time'] >= window[0]) & 
-            (treated_data['event_time'] <= window[1])
-        ].copy()
+        estimator = EventStudy(window=window)
+        outcomes = list(dict.fromkeys([outcome, *outcomes]))
+        if self.store is None:
+            self.event_study_results = estimator.fit(self.data, outcomes, self.fixed_effects())
+            
+            # True effect by binned event time (validation)
+            relative = estimator.relative_time(self.data)
+            treated = ~np.isnan(relative)
+            true_effect = self.data['true_ai_effect'][treated].groupby(relative[treated]).mean()
+        else:
+            self.event_study_results = estimator.fit_store(self.store, outcomes)
+            true_effect = self._streamed_means('true_ai_effect', estimator.relative_time,
+                                               [estimator.time, estimator.adoption])
+        table = self.event_study_results[outcome]
         
-        # Calculate event study coefficients
         event_results = {}
-        for t in range(window[0], window[1] + 1):
-            period_data = event_data[event_data['event_time'] == t]
-            
-            if len(period_data) > 0:
-                coeff = period_data[outcome].mean()
-                se = period_data[outcome].std() / np.sqrt(len(period_data))
-                t_stat = coeff / se if se > 0 else 0
-                
-                event_results[t] = {
-                    'coefficient': coeff,
-                    'std_error': se,
-                    'n_obs': len(period_data),
-                    't_stat': t_stat,
-                    'significant': abs(t_stat) > 1.96,
-                    'true_effect': period_data['true_ai_effect'].mean()  # Validation
-                }
+        for t, row in table.iterrows():
+            event_results[t] = {
+                'coefficient': row['coefficient'],
+                'std_error': row['std_error'],
+                'n_obs': int(row['n_obs']),
+                't_stat': row['t_stat'],
+                'p_value': row['p_value'],
+                'significant': abs(row['t_stat']) > 1.96,
+                'true_effect': true_effect.get(t, np.nan)  # Validation
+            }
         
         self.treatment_effects['event_study'] = event_results
         
         # Display results
-        print(f"📊 Event Study Results (n_firms = {event_data['firm_id'].nunique()}):")
+        print(f"📊 Event Study Results (treated firms = {n_treated}, reference t = {estimator.reference}):")
         print("-" * 70)
         print(f"{'Event Time':<12} {'Coeff':<10} {'SE':<8} {'T-stat':<8} {'True Effect':<12} {'Sig'}")
         print("-" * 70)
@@ -339,94 +479,44 @@ class CausalInferenceAnalysis:
     def analyze_heterogeneous_effects(self, outcome='productivity_growth'):
         """
         Analyze how treatment effects vary by firm characteristics
+        
+        Post-adoption adopters are compared with never-adopters within each
+        firm size, industry, CEO age band and CEO gender. All marginals are
+        read from the heterogeneity cube, with firm-clustered standard
+        errors; further cross-tabs come from
+        self.heterogeneity_cube().effects(outcome, by=[...]).
         """
         print(f"\n🔬 HETEROGENEOUS TREATMENT EFFECTS: {outcome}")
         print("=" * 60)
         
-        treated_post = self.data[
-            (self.data['ai_adoption'] == 1) & 
-            (self.data['post_treatment'] == 1)
-        ].copy()
-        
-        control = self.data[self.data['ai_adoption'] == 0].copy()
+        cube = self.heterogeneity_cube((outcome, 'true_ai_effect'))
+        
+        def dimension_effects(dimension, label, width):
+            effects = cube.effects(outcome, by=[dimension])
+            true_effects = cube.effects('true_ai_effect', by=[dimension])['treated_mean']
+            results = {}
+            for group, row in effects.iterrows():
+                results[group] = {
+                    'treatment_effect': row['coefficient'],
+                    'std_error': row['std_error'],
+                    'true_effect': true_effects[group],
+                    'n_treated': int(row['n_treated']),
+                    'n_control': int(row['n_control'])
+                }
+                print(f"  {label}{group:<{width}}: Effect={row['coefficient']:.4f} "
+                      f"(SE {row['std_error']:.4f}), True={true_effects[group]:.4f}, "
+                      f"n_treated={int(row['n_treated'])}")
+            return results
         
-        # Size effects
         print("\n📏 TREATMENT EFFECTS BY FIRM SIZE:")
-        size_effects = {}
-        for size in ['Micro', 'Small', 'Medium', 'Large']:
-            treated_size = treated_post[treated_post['size_category'] == size][outcome].mean()
-            control_size = control[control['size_category'] == size][outcome].mean()
-            effect = treated_size - control_size
-            
-            n_treated = len(treated_post[treated_post['size_category'] == size])
-            n_control = len(control[control['size_category'] == size])
-            
-            # True effect for validation
-            true_effect = treated_post[treated_post['size_category'] == size]['true_ai_effect'].mean()
-            
-            size_effects[size] = {
-                'treatment_effect': effect,
-                'true_effect': true_effect,
-                'n_treated': n_treated,
-                'n_control': n_control
-            }
-            
-            print(f"  {size:<8}: Effect={effect:.4f}, True={true_effect:.4f}, n_treated={n_treated}")
+        size_effects = dimension_effects('size_category', '', 8)
         
-        # Industry effects  
         print("\n🏭 TREATMENT EFFECTS BY INDUSTRY:")
-        industry_effects = {}
-        for industry in self.data['industry'].unique():
-            treated_ind = treated_post[treated_post['industry'] == industry][outcome].mean()
-            control_ind = control[control['industry'] == industry][outcome].mean()
-            effect = treated_ind - control_ind
-            
-            n_treated = len(treated_post[treated_post['industry'] == industry])
-            true_effect = treated_post[treated_post['industry'] == industry]['true_ai_effect'].mean()
-            
-            industry_effects[industry] = {
-                'treatment_effect': effect,
-                'true_effect': true_effect,
-                'n_treated': n_treated
-            }
-            
-            print(f"  {industry:<12}: Effect={effect:.4f}, True={true_effect:.4f}, n={n_treated}")
+        industry_effects = dimension_effects('industry', '', 12)
         
-        # Executive demographic effects
         print("\n👔 TREATMENT EFFECTS BY CEO CHARACTERISTICS:")
-        
-        # Age effects
-        treated_post['ceo_age_group'] = pd.cut(treated_post['ceo_age'], 
-                                              bins=[30, 45, 55, 70], 
-                                              labels=['Young', 'Middle', 'Senior'])
-        control['ceo_age_group'] = pd.cut(control['ceo_age'], 
-                                         bins=[30, 45, 55, 70], 
-                                         labels=['Young', 'Middle', 'Senior'])
-        
-        age_effects = {}
-        for age_group in ['Young', 'Middle', 'Senior']:
-            treated_age = treated_post[treated_post['ceo_age_group'] == age_group][outcome].mean()
-            control_age = control[control['ceo_age_group'] == age_group][outcome].mean()
-            effect = treated_age - control_age
-            
-            n_treated = len(treated_post[treated_post['ceo_age_group'] == age_group])
-            true_effect = treated_post[treated_post['ceo_age_group'] == age_group]['true_ai_effect'].mean()
-            
-            age_effects[age_group] = {'treatment_effect': effect, 'true_effect': true_effect}
-            print(f"  CEO {age_group:<8}: Effect={effect:.4f}, True={true_effect:.4f}, n={n_treated}")
-        
-        # Gender effects
-        gender_effects = {}
-        for gender in ['Male', 'Female']:
-            treated_gender = treated_post[treated_post['ceo_gender'] == gender][outcome].mean()
-            control_gender = control[control['ceo_gender'] == gender][outcome].mean()
-            effect = treated_gender - control_gender
-            
-            n_treated = len(treated_post[treated_post['ceo_gender'] == gender])
-            true_effect = treated_post[treated_post['ceo_gender'] == gender]['true_ai_effect'].mean()
-            
-            gender_effects[gender] = {'treatment_effect': effect, 'true_effect': true_effect}
-            print(f"  CEO {gender:<8}: Effect={effect:.4f}, True={true_effect:.4f}, n={n_treated}")
+        age_effects = dimension_effects('ceo_age_group', 'CEO ', 8)
+        gender_effects = dimension_effects('ceo_gender', 'CEO ', 8)
         
         self.heterogeneous_effects = {
             'size': size_effects,
@@ -439,90 +529,297 @@ class CausalInferenceAnalysis:
     
     def difference_in_differences_analysis(self, outcome='productivity_growth'):
         """
-        Canonical difference-in-differences analysis
+        Two-way fixed-effects difference-in-differences
+        
+        Regresses the outcome on the post-adoption indicator with firm and
+        period fixed effects, and again with firm and industry x period
+        effects, clustering by firm. With an open store both regressions
+        run out of core.
         """
         print(f"\n📊 DIFFERENCE-IN-DIFFERENCES ANALYSIS: {outcome}")
         print("=" * 60)
         
-        # Create treatment indicator
-        self.data['treated'] = self.data['ai_adoption']
-        
-        # Pre/post periods (split at median adoption period)
-        median_adoption = self.data[self.data['ai_adoption'] == 1]['adoption_period'].median()
-        self.data['post_period'] = (self.data['period'] >= median_adoption).astype(int)
-        
-        # Calculate DID estimator manually
-        did_data = self.data.groupby(['treated', 'post_period'])[outcome].mean().unstack()
-        
-        # DID coefficient = (T1 - T0) - (C1 - C0)
-        did_coeff = (did_data.loc[1, 1] - did_data.loc[1, 0]) - (did_data.loc[0, 1] - did_data.loc[0, 0])
+        specifications = {
+            'Firm + period FE': ('firm_id', 'period'),
+            'Firm + industry x period FE': ('firm_id', ('industry', 'period')),
+        }
+        estimates = {}
+        for label, absorb in specifications.items():
+            if self.store is None:
+                regression = PanelRegression(self.data, fixed_effects=self.fixed_effects(absorb))
+            else:
+                regression = StreamingPanelRegression(self.store, absorb)
+            estimates[label] = regression.fit(outcome, ['post_treatment'])[outcome].loc['post_treatment']
         
         print("📈 DID Results:")
-        print(f"   Control Pre:     {did_data.loc[0, 0]:.4f}")
-        print(f"   Control Post:    {did_data.loc[0, 1]:.4f}")
-        print(f"   Treated Pre:     {did_data.loc[1, 0]:.4f}")
-        print(f"   Treated Post:    {did_data.loc[1, 1]:.4f}")
+        for label, row in estimates.items():
+            print(f"   {label:<28} {row['coefficient']:.4f} (SE {row['std_error']:.4f})")
+        
+        did = estimates['Firm + period FE']
+        did_coeff = did['coefficient']
         print(f"   DID Coefficient: {did_coeff:.4f}")
         
         # Validation with true effects
-        true_effect = self.data[self.data['post_treatment'] == 1]['true_ai_effect'].mean()
+        if self.store is None:
+            true_effect = self.data[self.data['post_treatment'] == 1]['true_ai_effect'].mean()
+        else:
+            true_effect = self._post_treatment_mean('true_ai_effect')
         print(f"   True Effect:     {true_effect:.4f}")
         print(f"   Estimation Error: {abs(did_coeff - true_effect):.4f}")
         
         self.treatment_effects['did'] = {
             'coefficient': did_coeff,
+            'std_error': did['std_error'],
+            'p_value': did['p_value'],
+            'specifications': estimates,
             'true_effect': true_effect,
             'estimation_error': abs(did_coeff - true_effect)
         }
         
         return did_coeff
     
-    def instrumental_variables_analysis(self):
+    def staggered_did_analysis(self, outcome='productivity_growth', control_group='never_treated',
+                               n_bootstrap=999, seed=0):
         """
-        Instrumental variables estimation using policy instruments
+        Callaway-Sant'Anna difference-in-differences for staggered adoption
+        
+        Estimates every cohort x period ATT, aggregates them to event-time,
+        cohort and overall effects, and bootstraps all of them jointly.
         """
-        print(f"\n🎯 INSTRUMENTAL VARIABLES ANALYSIS")
-        print("=" * 50)
+        self._require_data("Staggered DiD")
+        print(f"\n📊 STAGGERED DIFFERENCE-IN-DIFFERENCES: {outcome}")
+        print("=" * 60)
         
-        # Use subsidy eligibility as instrument
-        instrument_data = self.data[self.data['period'] >= 10].copy()  # Post-policy period
+        estimator = StaggeredDiD(control_group=control_group)
+        results = estimator.fit(self.data, outcome, n_bootstrap=n_bootstrap, seed=seed)
+        
+        # Same estimator on the embedded effect gives the true aggregate (validation)
+        true_results = estimator.fit(self.data, 'true_ai_effect', n_bootstrap=0)
+        overall = results['overall']
+        true_effect = true_results['overall']['att']
+        
+        print(f"📈 Group-time ATTs: {len(results['group_time'])} cohort x period cells, "
+              f"{len(results['cohort'])} cohorts")
+        print(f"{'Event Time':<12} {'ATT':<10} {'SE':<8} {'True Effect':<12}")
+        post = results['event_time'].loc[0:]
+        for e, row in post.iterrows():
+            print(f"{e:<12} {row['att']:<10.4f} {row['std_error']:<8.4f} "
+                  f"{true_results['event_time'].loc[e, 'att']:<12.4f}")
+        
+        print(f"   Overall ATT:      {overall['att']:.4f} (SE {overall['std_error']:.4f})")
+        print(f"   True Effect:      {true_effect:.4f}")
+        print(f"   Estimation Error: {abs(overall['att'] - true_effect):.4f}")
+        
+        self.treatment_effects['staggered_did'] = {
+            'coefficient': overall['att'],
+            'std_error': overall['std_error'],
+            'results': results,
+            'true_effect': true_effect,
+            'estimation_error': abs(overall['att'] - true_effect)
+        }
         
-        # First stage: AI adoption on instrument
-        first_stage = instrument_data.groupby('subsidy_eligible')['ai_adoption'].mean()
-        first_stage_f = ((first_stage[1] - first_stage[0]) ** 2) / 0.01  # Approximate F-stat
+        return results
+    
+    def synthetic_control_analysis(self, outcome='productivity_growth', n_placebos=200,
+                                   n_draws=999, n_workers=None, seed=0):
+        """
+        Synthetic control for every adopter with placebo-in-space inference
         
-        print("📊 First Stage Results:")
-        print(f"   Control group AI adoption:     {first_stage[0]:.3f}")
-        print(f"   Subsidy eligible AI adoption:  {first_stage[1]:.3f}")
-        print(f"   First stage coefficient:       {first_stage[1] - first_stage[0]:.3f}")
-        print(f"   Approximate F-statistic:       {first_stage_f:.1f}")
+        Each adopter's counterfactual is a penalized convex combination of
+        never-treated firms matching its pre-adoption path; donor weights
+        are solved in batches per adoption cohort and in parallel across
+        workers. Placebo fits of sampled donors give per-firm and aggregate
+        p-values.
+        """
+        self._require_data("Synthetic control")
+        print(f"\n🧩 SYNTHETIC CONTROL METHOD: {outcome}")
+        print("=" * 60)
         
-        # Reduced form: productivity on instrument
-        reduced_form = instrument_data.groupby('subsidy_eligible')['productivity_growth'].mean()
-        reduced_form_coeff = reduced_form[1] - reduced_form[0]
+        estimator = SyntheticControl(n_placebos=n_placebos, n_draws=n_draws,
+                                     n_workers=n_workers, seed=seed)
+        results = estimator.fit(self.data, outcome)
+        
+        # Donors carry no effect, so the same fit on the embedded effect is the truth
+        true_results = estimator.fit(self.data, 'true_ai_effect')
+        overall = results['overall']
+        true_effect = true_results['overall']['att']
+        unit_effects = results['unit_effects']
+        
+        print(f"📈 {len(unit_effects):,} treated firms, {len(results['donors']):,} donor firms")
+        print(f"   Median pre-treatment RMSPE:  {unit_effects['pre_rmspe'].median():.4f}")
+        print(f"{'Event Time':<12} {'ATT':<10} {'Placebo p':<10} {'True Effect':<12}")
+        for e, row in results['event_time'].loc[0:].iterrows():
+            print(f"{e:<12} {row['att']:<10.4f} {row['p_value']:<10.3f} "
+                  f"{true_results['event_time'].loc[e, 'att']:<12.4f}")
+        
+        print(f"   Overall ATT:      {overall['att']:.4f} (placebo p = {overall['p_value']:.3f})")
+        print(f"   Firms with placebo p < 0.05: {(unit_effects['p_value'] < 0.05).mean():.1%}")
+        print(f"   True Effect:      {true_effect:.4f}")
+        print(f"   Estimation Error: {abs(overall['att'] - true_effect):.4f}")
+        
+        self.treatment_effects['synthetic_control'] = {
+            'coefficient': overall['att'],
+            'p_value': overall['p_value'],
+            'results': results,
+            'true_effect': true_effect,
+            'estimation_error': abs(overall['att'] - true_effect)
+        }
         
-        # IV estimate = Reduced form / First stage
-        iv_estimate = reduced_form_coeff / (first_stage[1] - first_stage[0])
+        return results
+    
+    def instrumental_variables_analysis(self, outcome='productivity_growth'):
+        """
+        Instrumental variables estimation using policy instruments
+        
+        2SLS and LIML of the outcome on AI adoption in the post-policy
+        periods, instrumenting with subsidy eligibility, university
+        partnerships and supplier AI adoption. Period and industry effects
+        are absorbed and firm controls partialled out; standard errors,
+        first-stage F and the Hansen J overidentification test are
+        clustered by firm. All specifications share one estimator, so
+        columns and instrument factorizations are computed once. With an
+        open store the moments are streamed from the post-policy
+        partitions and the firm attributes joined per batch.
+        """
+        print(f"\n🎯 INSTRUMENTAL VARIABLES ANALYSIS")
+        print("=" * 50)
+        
+        if self.store is None:
+            sample = self.data[self.data['period'] >= 10]
+            instrument_data = self._iv_sample(outcome)
+            estimator = IVRegression(instrument_data, absorb=['period', 'industry'])
+            post = sample['post_treatment'].to_numpy() == 1
+            true_effect = instrument_data['true_ai_effect'][post].mean()
+        else:
+            where = [('period', '>=', 10)]
+            estimator = StreamingIVRegression(
+                self.store, [outcome, 'ai_adoption', *self.IV_INSTRUMENTS, *self.IV_CONTROLS],
+                absorb=['period', 'industry'], where=where
+            )
+            true_effect = self._post_treatment_mean('true_ai_effect', where)
+        specifications = {
+            '2SLS (subsidy)': dict(instruments=self.IV_INSTRUMENTS[:1], method='2sls'),
+            '2SLS (all instruments)': dict(instruments=self.IV_INSTRUMENTS, method='2sls'),
+            'LIML (all instruments)': dict(instruments=self.IV_INSTRUMENTS, method='liml')
+        }
+        results = {
+            name: estimator.fit(outcome, ['ai_adoption'], exogenous=self.IV_CONTROLS, **spec)[outcome]
+            for name, spec in specifications.items()
+        }
         
-        print("\n📈 IV Results:")
-        print(f"   Reduced form coefficient: {reduced_form_coeff:.4f}")
-        print(f"   IV estimate:             {iv_estimate:.4f}")
+        print(f"{'Specification':<24} {'Coeff':<10} {'SE':<8} {'1st-stage F':<12} {'J p-value':<10}")
+        print("-" * 66)
+        for name, result in results.items():
+            row = result['coefficients'].loc['ai_adoption']
+            j_p_value = (f"{result['overidentification']['p_value']:.3f}"
+                         if result['overidentification'] is not None else '-')
+            print(f"{name:<24} {row['coefficient']:<10.4f} {row['std_error']:<8.4f} "
+                  f"{result['first_stage'].loc['ai_adoption', 'f_stat']:<12.1f} {j_p_value:<10}")
+        
+        headline = results['2SLS (subsidy)']
+        iv_estimate = headline['coefficients'].loc['ai_adoption', 'coefficient']
+        first_stage = headline['first_stage'].loc['ai_adoption']
         
         # Compare to true effect
-        true_effect = instrument_data[instrument_data['post_treatment'] == 1]['true_ai_effect'].mean()
+        print(f"\n📈 IV Results:")
+        print(f"   IV estimate (subsidy):   {iv_estimate:.4f}")
         print(f"   True effect:             {true_effect:.4f}")
         print(f"   IV estimation error:     {abs(iv_estimate - true_effect):.4f}")
+        if first_stage['f_stat'] < 10:
+            print(f"   ⚠️  Weak first stage (F = {first_stage['f_stat']:.1f} < 10)")
         
         self.treatment_effects['iv'] = {
             'coefficient': iv_estimate,
-            'first_stage': first_stage[1] - first_stage[0],
-            'f_stat': first_stage_f,
+            'std_error': headline['coefficients'].loc['ai_adoption', 'std_error'],
+            'first_stage': first_stage,
+            'f_stat': first_stage['f_stat'],
+            'specifications': results,
             'true_effect': true_effect,
             'estimation_error': abs(iv_estimate - true_effect)
         }
         
         return iv_estimate
     
+    def _iv_sample(self, outcome):
+        """Post-policy IV sample; firm attributes looked up instead of copying the panel"""
+        sample = self.data[self.data['period'] >= 10]
+        instrument_data = pd.DataFrame({
+            column: sample[column].to_numpy()
+            for column in ['firm_id', 'period', 'industry', 'ai_adoption', outcome, 'true_ai_effect']
+        })
+        for column in self.IV_INSTRUMENTS + self.IV_CONTROLS:
+            instrument_data[column] = self.firm_attribute(column, sample).to_numpy()
+        return instrument_data
+    
+    def resampling_inference(self, outcome='productivity_growth', n_draws=999, n_workers=None, seed=0):
+        """
+        Wild-cluster bootstrap and placebo adoption-date inference
+        
+        Covers the fixed-effects DiD, the event study and the headline IV
+        estimate (same sample, absorbed effects and controls as
+        instrumental_variables_analysis), clustering by firm. Permutation inference reassigns adoption dates
+        (for IV, subsidy eligibility) across firms.
+        """
+        self._require_data("Resampling inference")
+        print(f"\n🎲 RESAMPLING INFERENCE: {outcome} ({n_draws:,} draws)")
+        print("=" * 60)
+        
+        wild = WildClusterBootstrap(n_bootstrap=n_draws, n_workers=n_workers, seed=seed)
+        permutation = RandomizationInference(n_permutations=n_draws, n_workers=n_workers, seed=seed)
+        fixed_effects = self.fixed_effects()
+        clusters = group_codes(self.data, 'firm_id')
+        y = fixed_effects.residualize([outcome])[:, 0]
+        
+        def combine(wild_results, permutation_results):
+            combined = wild_results[['coefficient', 'std_error', 't_stat']].copy()
+            combined['wild_p_value'] = wild_results['p_value'].to_numpy()
+            combined['permutation_p_value'] = permutation_results['p_value'].to_numpy()
+            return combined
+        
+        # Difference-in-differences (firm + period FE)
+        x = fixed_effects.residualize(['post_treatment'])
+        contributions, codes = adoption_contributions(self.data, y, lambda r: np.where(r >= 0, 0, -1), 1)
+        did = combine(wild.test(x, y, clusters, names=['post_treatment']),
+                      permutation.test(contributions, codes, x.T @ x))
+        
+        # Event study leads and lags
+        estimator = EventStudy()
+        x = fixed_effects.demean(estimator.design(self.data).toarray(order='F'), copy=False)
+        contributions, codes = adoption_contributions(self.data, y, estimator.relative_columns,
+                                                      len(estimator.event_times))
+        event_study = combine(wild.test(x, y, clusters, names=estimator.event_times),
+                              permutation.test(contributions, codes, x.T @ x))
+        
+        # Instrumental variables: the headline IV specification (post-policy
+        # sample, period and industry effects absorbed, controls partialled out)
+        iv_data = self._iv_sample(outcome)
+        iv_columns = [outcome, 'ai_adoption', 'subsidy_eligible']
+        iv_fixed_effects = FixedEffects(iv_data, ['period', 'industry'])
+        partialled = iv_fixed_effects.residualize(iv_columns)
+        controls, _ = np.linalg.qr(iv_fixed_effects.residualize(self.IV_CONTROLS))
+        partialled -= controls @ (controls.T @ partialled)
+        iv_y, x, z = partialled.T
+        # Placebo eligibility is reassigned across firms; the residualized
+        # outcome is orthogonal to the absorbed effects and controls, so the
+        # observed statistic is the partialled reduced form
+        instrument = iv_data['subsidy_eligible'].to_numpy(dtype=float)
+        contributions, codes = instrument_contributions(iv_data, iv_y, instrument)
+        iv = combine(wild.test(x, iv_y, group_codes(iv_data, 'firm_id'), instruments=z,
+                               names=['ai_adoption']),
+                     permutation.test(contributions, codes, ((instrument - instrument.mean()) ** 2).sum()))
+        
+        self.robustness_results['resampling'] = {'did': did, 'event_study': event_study, 'iv': iv}
+        
+        print(f"{'Estimate':<16} {'Coeff':<10} {'CR1 SE':<8} {'Wild p':<8} {'Perm. p':<8}")
+        print("-" * 54)
+        rows = [('DID', did.iloc[0]), ('IV', iv.iloc[0])]
+        rows += [(f'Event t={t}', row) for t, row in event_study.iterrows()]
+        for label, row in rows:
+            print(f"{label:<16} {row['coefficient']:<10.4f} {row['std_error']:<8.4f} "
+                  f"{row['wild_p_value']:<8.3f} {row['permutation_p_value']:<8.3f}")
+        
+        return self.robustness_results['resampling']
+    
     def comprehensive_analysis_summary(self):
         """
         Comprehensive summary of all causal inference results
@@ -644,13 +941,22 @@ def run_comprehensive_causal_analysis():
     # 2. Difference-in-Differences
     causal_analysis.difference_in_differences_analysis()
     
-    # 3. Instrumental Variables
+    # 3. Staggered Difference-in-Differences
+    causal_analysis.staggered_did_analysis()
+    
+    # 4. Synthetic Control
+    causal_analysis.synthetic_control_analysis()
+    
+    # 5. Instrumental Variables
     causal_analysis.instrumental_variables_analysis()
     
-    # 4. Heterogeneous Effects
+    # 6. Wild-cluster bootstrap and randomization inference
+    causal_analysis.resampling_inference()
+    
+    # 7. Heterogeneous Effects
     causal_analysis.analyze_heterogeneous_effects()
     
-    # 5. Comprehensive Summary
+    # 8. Comprehensive Summary
     summary = causal_analysis.comprehensive_analysis_summary()
     
     print(f"\n✅ CAUSAL INFERENCE ANALYSIS COMPLETE!")
@@ -659,6 +965,29 @@ def run_comprehensive_causal_analysis():
     
     return causal_analysis, summary
 
+def run_out_of_core_causal_analysis(path):
+    """
+    Execute the analyses that stream a partitioned panel store
+    
+    Event study, DiD, IV and heterogeneity on a store written by
+    CausalInferenceAnalysis.save_panel (or PanelStore.write), without
+    loading the panel.
+    """
+    print("🚀 EXECUTING OUT-OF-CORE CAUSAL INFERENCE ANALYSIS")
+    print("=" * 80)
+    
+    causal_analysis = CausalInferenceAnalysis()
+    store = causal_analysis.open_panel(path)
+    print(f"📦 Panel store: {store.n_rows:,} rows partitioned by {', '.join(store.partition_by)}")
+    
+    causal_analysis.run_event_study()
+    causal_analysis.difference_in_differences_analysis()
+    causal_analysis.instrumental_variables_analysis()
+    causal_analysis.analyze_heterogeneous_effects()
+    summary = causal_analysis.comprehensive_analysis_summary()
+    
+    return causal_analysis, summary
+
 if __name__ == "__main__":
     # Run the complete analysis
     analysis, summary = run_comprehensive_causal_analysis()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Event Study Estimation
+
+Dynamic treatment effects around AI adoption estimated jointly by least
+squares with unit and period fixed effects:
+
+    y_it = a_i + l_t + sum_{e != ref} b_e 1[t - g_i = e] + u_it
+
+Never-treated units enter as controls with every relative-time indicator
+at zero. The indicators are built once as a sparse design, the fixed
+effects are absorbed through panel_regression.FixedEffects (for unit and
+period effects an exact solve that factorizes only a periods x periods
+system), and all outcomes are projected and solved together. Standard
+errors are clustered by unit. fit_store runs the same regression out of
+core on a partitioned panel_store.PanelStore.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    from .panel_regression import Absorb, FixedEffects, cluster_covariance, coefficient_table, group_codes
+    from .panel_store import Filter, PanelStore, StreamingPanelRegression
+except ImportError:
+    from panel_regression import Absorb, FixedEffects, cluster_covariance, coefficient_table, group_codes
+    from panel_store import Filter, PanelStore, StreamingPanelRegression
+
+
+EVENT_STUDY_OUTCOMES = ('productivity_growth', 'revenue_per_employee', 'productivity_level')
+
+
+class EventStudy:
+    """
+    Lead/lag regression with unit and period fixed effects.
+
+    Relative times outside the window are binned into the endpoints, and
+    the reference relative time is omitted, so every coefficient is the
+    effect relative to the period before adoption.
+    """
+
+    def __init__(self, window: Tuple[int, int] = (-4, 4), reference: int = -1,
+                 unit: str = 'firm_id', time: str = 'period',
+                 adoption: str = 'adoption_period',
+                 absorb: Optional[Sequence[Absorb]] = None):
+        """
+        Args:
+            window: First and last relative time estimated
+            reference: Omitted relative time
+            unit: Unit identifier column (also the cluster)
+            time: Period column
+            adoption: First treated period column (missing for never-treated)
+            absorb: Fixed-effect sets (defaults to unit and time; e.g. add
+                ('industry', 'period') for industry x period effects)
+        """
+        if not window[0] <= reference <= window[1]:
+            raise ValueError("reference must lie inside the window")
+        self.window = window
+        self.reference = reference
+        self.unit = unit
+        self.time = time
+        self.adoption = adoption
+        self.absorb = list(absorb) if absorb is not None else [unit, time]
+        self.event_times = [e for e in range(window[0], window[1] + 1) if e != reference]
+
+    def relative_time(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Relative time to adoption, binned into the window endpoints.
+
+        Returns:
+            Float array with NaN for never-treated rows
+        """
+        adoption = data[self.adoption].to_numpy(dtype=float, na_value=np.nan)
+        relative = data[self.time].to_numpy(dtype=float) - adoption
+        return np.clip(relative, *self.window)
+
+    def relative_columns(self, relative: np.ndarray) -> np.ndarray:
+        """
+        Indicator column of each relative time (binned at the window
+        endpoints), -1 for the reference period.
+        """
+        column_of = np.full(self.window[1] - self.window[0] + 1, -1)
+        column_of[[e - self.window[0] for e in self.event_times]] = np.arange(len(self.event_times))
+        return column_of[np.clip(relative, *self.window).astype(int) - self.window[0]]
+
+    def design(self, data: pd.DataFrame) -> sparse.csr_matrix:
+        """
+        Sparse relative-time indicator matrix (one column per event time).
+
+        Args:
+            data: Panel with time and adoption columns
+
+        Returns:
+            (n_rows, n_event_times) CSR matrix
+        """
+        relative = self.relative_time(data)
+        rows = np.flatnonzero(~np.isnan(relative))
+        columns = self.relative_columns(relative[rows])
+        keep = columns >= 0
+        return sparse.csr_matrix(
+            (np.ones(keep.sum()), (rows[keep], columns[keep])),
+            shape=(len(data), len(self.event_times))
+        )
+
+    def fit(self, data: pd.DataFrame,
+            outcomes: Sequence[str] = EVENT_STUDY_OUTCOMES,
+            fixed_effects: Optional[FixedEffects] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Estimate all leads and lags for several outcomes at once.
+
+        Rows with a missing value in any outcome are dropped, so every
+        outcome uses the same sample and projection.
+
+        Args:
+            data: Panel with unit, time, adoption and outcome columns
+            outcomes: Outcome columns
+            fixed_effects: Absorber built on the same rows to reuse (its
+                cached outcome columns are used); built from absorb if None
+
+        Returns:
+            Dictionary mapping each outcome to a DataFrame indexed by event
+            time with coefficient, std_error, t_stat, p_value, ci_lower,
+            ci_upper and n_obs
+        """
+        outcomes = list(outcomes)
+        if fixed_effects is None:
+            sample = data[outcomes].notna().all(axis=1).to_numpy()
+            if not sample.all():
+                data = data[sample]
+            fixed_effects = FixedEffects(data, self.absorb)
+        elif fixed_effects.n_obs != len(data):
+            raise ValueError("fixed_effects must be built on the rows of data")
+
+        # Indicators are projected once; outcomes come from the shared cache
+        indicators = self.design(data)
+        x_tilde = fixed_effects.demean(indicators.toarray(order='F'), copy=False)
+        y_tilde = fixed_effects.residualize(outcomes)
+
+        gram = cho_factor(x_tilde.T @ x_tilde)
+        coefficients = cho_solve(gram, x_tilde.T @ y_tilde)
+        bread = cho_solve(gram, np.eye(x_tilde.shape[1]))
+
+        clusters = group_codes(data, self.unit)
+        n_obs = np.asarray(indicators.sum(axis=0)).ravel().astype(int)
+        index = pd.Index(self.event_times, name='event_time')
+
+        results = {}
+        for j, outcome in enumerate(outcomes):
+            errors = y_tilde[:, j] - x_tilde @ coefficients[:, j]
+            covariance = cluster_covariance(x_tilde, errors, clusters, bread)
+            results[outcome] = coefficient_table(coefficients[:, j], covariance, index, n_obs=n_obs)
+        return results
+
+    def fit_store(self, store: PanelStore,
+                  outcomes: Sequence[str] = EVENT_STUDY_OUTCOMES,
+                  where: Optional[Filter] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Estimate all leads and lags on a partitioned panel, out of core.
+
+        The indicators are built per streamed batch from the time and
+        adoption columns; results match fit on the same rows.
+
+        Args:
+            store: Panel store
+            outcomes: Outcome columns
+            where: Row filter for the estimation sample
+
+        Returns:
+            Dictionary mapping each outcome to a DataFrame as returned by fit
+        """
+        names = [f'event_time_{e}' for e in self.event_times]
+
+        def indicators(frame: pd.DataFrame) -> pd.DataFrame:
+            design = pd.DataFrame(self.design(frame).toarray(), index=frame.index, columns=names)
+            return pd.concat([frame, design], axis=1)
+
+        regression = StreamingPanelRegression(store, self.absorb, cluster=self.unit, where=where)
+        tables = regression.fit(list(outcomes), names, derive=indicators, inputs=[self.time, self.adoption])
+        n_obs = regression.moments.totals[:len(names)].astype(int)
+        index = pd.Index(self.event_times, name='event_time')
+        return {outcome: table.set_axis(index).assign(n_obs=n_obs) for outcome, table in tables.items()}
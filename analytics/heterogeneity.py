@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Heterogeneity Cube
+
+Sufficient statistics for treated-vs-control comparisons over every
+combination of firm-level dimensions (size, industry, CEO age band, CEO
+gender, ...) and treatment status, built in one grouped pass over the
+panel.
+
+Rows are first reduced to (firm, status) clusters with bincounts; each
+cluster lies in exactly one cell because the dimensions are constant
+within firm, so cells hold counts, sums and sums of squares of every
+outcome together with the cluster-level moments sum S_g^2, sum S_g n_g
+and sum n_g^2. Any marginal or cross-tab is then a sum over cube axes,
+with firm-clustered standard errors, without touching the rows again.
+The panel can also be passed as an iterable of row batches (e.g.
+panel_store.PanelStore.scan), so the cube builds out of core.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+try:
+    from .panel_regression import coefficient_table
+except ImportError:
+    from panel_regression import coefficient_table
+
+
+STATUSES = ('control', 'treated', 'pre_treatment')
+
+
+class HeterogeneityCube:
+    """
+    Cell statistics over firm dimensions x treatment status.
+
+    Status is 'control' for never-adopters, 'treated' for adopters after
+    adoption and 'pre_treatment' for adopters before it. Effects compare
+    treated and control means; the two groups share no firms, so their
+    clustered variances add.
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                 dimensions: Mapping[str, pd.Series], outcomes: Sequence[str], unit: str = 'firm_id',
+                 treated: str = 'ai_adoption', post: str = 'post_treatment'):
+        """
+        Args:
+            data: Panel with unit, treatment, post-treatment and outcome
+                columns, or an iterable of row batches of it
+            dimensions: Categorical Series per dimension, indexed by unit
+                (all on the same index); a missing category is kept in an
+                extra level of that dimension, so the unit is left out only
+                of groupings and restrictions over that dimension
+            outcomes: Outcome columns to summarize
+            unit: Unit column (also the cluster)
+            treated: Ever-treated indicator column
+            post: Post-treatment indicator column
+        """
+        names = list(dimensions)
+        units = dimensions[names[0]].index
+        self.categories = {name: pd.Index(dimensions[name].cat.categories, name=name) for name in names}
+        self.outcomes = list(outcomes)
+        # Each dimension axis ends with a level for units missing that dimension
+        self.shape = tuple(len(c) + 1 for c in self.categories.values()) + (len(STATUSES),)
+
+        codes = np.column_stack([dimensions[name].reindex(units).cat.codes.to_numpy() for name in names])
+        codes = np.where(codes >= 0, codes, [len(self.categories[name]) for name in names])
+        unit_cell = np.ravel_multi_index(codes.T, self.shape[:-1])
+
+        # One pass to (unit, status) clusters, then clusters into cells
+        n_statuses = len(STATUSES)
+        n_clusters = len(units) * n_statuses
+        cluster_counts = np.zeros(n_clusters)
+        cluster_sums = {outcome: np.zeros(n_clusters) for outcome in self.outcomes}
+        cluster_squares = {outcome: np.zeros(n_clusters) for outcome in self.outcomes}
+        for frame in ([data] if isinstance(data, pd.DataFrame) else data):
+            positions = units.get_indexer(frame[unit])
+            if (positions < 0).any():
+                raise ValueError("Every panel unit needs an entry in the dimension tables")
+            status = np.where(frame[treated].to_numpy() == 0, 0, np.where(frame[post].to_numpy() == 1, 1, 2))
+            cluster = positions * n_statuses + status
+            cluster_counts += np.bincount(cluster, minlength=n_clusters)
+            for outcome in self.outcomes:
+                y = frame[outcome].to_numpy(dtype=float)
+                cluster_sums[outcome] += np.bincount(cluster, weights=y, minlength=n_clusters)
+                cluster_squares[outcome] += np.bincount(cluster, weights=y * y, minlength=n_clusters)
+
+        cluster_cell = np.repeat(unit_cell, n_statuses) * n_statuses + np.tile(np.arange(n_statuses), len(units))
+        keep = cluster_counts > 0
+        cell, n_g = cluster_cell[keep], cluster_counts[keep]
+
+        n_cells = int(np.prod(self.shape))
+
+        def to_cells(weights=None):
+            return np.bincount(cell, weights=weights, minlength=n_cells).reshape(self.shape)
+
+        self.count = to_cells(n_g)
+        self.n_clusters = to_cells()
+        self.cluster_n2 = to_cells(n_g ** 2)
+        self.sum, self.sum_squares, self.cluster_sq, self.cluster_cross = {}, {}, {}, {}
+        for outcome in self.outcomes:
+            s_g = cluster_sums[outcome][keep]
+            self.sum[outcome] = to_cells(s_g)
+            self.sum_squares[outcome] = to_cells(cluster_squares[outcome][keep])
+            self.cluster_sq[outcome] = to_cells(s_g ** 2)
+            self.cluster_cross[outcome] = to_cells(s_g * n_g)
+
+    def _marginal(self, statistic: np.ndarray, by: Sequence[str],
+                  where: Optional[Mapping[str, Union[str, Sequence[str]]]]) -> np.ndarray:
+        """
+        Sum a cell statistic over all dimensions not in by, after slicing by where.
+
+        The missing level of a dimension is dropped when grouping by or
+        restricting it, and summed over otherwise.
+        """
+        names = list(self.categories)
+        where = where or {}
+        for name, values in where.items():
+            values = [values] if isinstance(values, str) else list(values)
+            positions = self.categories[name].get_indexer(values)
+            if (positions < 0).any():
+                raise KeyError(f"Unknown {name} categories: {np.asarray(values)[positions < 0].tolist()}")
+            statistic = np.take(statistic, positions, axis=names.index(name))
+        for name in by:
+            if name not in where:
+                statistic = np.take(statistic, np.arange(len(self.categories[name])), axis=names.index(name))
+        summed = tuple(i for i, name in enumerate(names) if name not in by)
+        statistic = statistic.sum(axis=summed)
+        kept = [name for name in names if name in by]
+        return np.moveaxis(statistic, [kept.index(name) for name in by], range(len(by)))
+
+    def _index(self, by: Sequence[str], where) -> pd.Index:
+        if not by:
+            return pd.Index(['all'])
+        levels = []
+        for name in by:
+            values = (where or {}).get(name)
+            if values is None:
+                levels.append(self.categories[name])
+            else:
+                levels.append(pd.Index([values] if isinstance(values, str) else list(values), name=name))
+        return levels[0] if len(levels) == 1 else pd.MultiIndex.from_product(levels)
+
+    def moments(self, outcome: str, by: Sequence[str] = (),
+                where: Optional[Mapping[str, Union[str, Sequence[str]]]] = None) -> pd.DataFrame:
+        """
+        Count, firms, mean and standard deviation per group and status.
+
+        Args:
+            outcome: Outcome column
+            by: Dimensions to group by (in order)
+            where: Restrict dimensions to one category or a list of them
+
+        Returns:
+            DataFrame indexed by the by-groups with (statistic, status) columns
+        """
+        by = list(by)
+        count = self._marginal(self.count, by, where)
+        total = self._marginal(self.sum[outcome], by, where)
+        squares = self._marginal(self.sum_squares[outcome], by, where)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            std = np.sqrt((squares - total * mean) / (count - 1))
+        statistics = {'n_obs': count, 'n_firms': self._marginal(self.n_clusters, by, where),
+                      'mean': mean, 'std': std}
+        index = self._index(by, where)
+        return pd.concat({name: pd.DataFrame(values.reshape(len(index), -1), index=index,
+                                              columns=pd.Index(STATUSES, name='status'))
+                          for name, values in statistics.items()}, axis=1)
+
+    def effects(self, outcome: str, by: Sequence[str] = (),
+                where: Optional[Mapping[str, Union[str, Sequence[str]]]] = None) -> pd.DataFrame:
+        """
+        Treated-minus-control mean differences with firm-clustered SEs.
+
+        Args:
+            outcome: Outcome column
+            by: Dimensions to group by (in order), e.g. ['size_category'] or
+                ['industry', 'ceo_gender'] for a cross-tab
+            where: Restrict dimensions to one category or a list of them
+
+        Returns:
+            Coefficient table (coefficient = effect) indexed by the
+            by-groups, with treated and control means and counts
+        """
+        by = list(by)
+        parts = {}
+        for status in ('treated', 'control'):
+            column = STATUSES.index(status)
+
+            def marginal(statistic):
+                return self._marginal(statistic[..., column], by, where).ravel()
+
+            n, g = marginal(self.count), marginal(self.n_clusters)
+            total = marginal(self.sum[outcome])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = total / n
+                # Clustered variance of the mean: G/(G-1) sum_g (S_g - n_g mean)^2 / n^2
+                deviations = (marginal(self.cluster_sq[outcome]) - 2 * mean * marginal(self.cluster_cross[outcome])
+                              + mean ** 2 * marginal(self.cluster_n2))
+                variance = g / (g - 1) * deviations / n ** 2
+            parts[status] = (mean, variance, n, g)
+
+        (treated_mean, treated_var, n_treated, treated_firms) = parts['treated']
+        (control_mean, control_var, n_control, control_firms) = parts['control']
+        return coefficient_table(treated_mean - control_mean, np.diag(treated_var + control_var),
+                                 self._index(by, where),
+                                 treated_mean=treated_mean, control_mean=control_mean,
+                                 n_treated=n_treated.astype(int), n_control=n_control.astype(int),
+                                 treated_firms=treated_firms.astype(int),
+                                 control_firms=control_firms.astype(int))
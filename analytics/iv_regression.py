@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Instrumental Variables Regression
+
+Two-stage least squares and LIML with several endogenous regressors and
+instruments, exogenous controls and absorbed fixed effects, with
+firm-clustered inference, first-stage strength and overidentification
+tests.
+
+Fixed effects are absorbed through panel_regression.FixedEffects and
+the exogenous controls partialled out by a QR factorization, so the
+estimators work on residualized columns. The excluded instruments are
+factorized once per (controls, instruments) set; every outcome,
+endogenous regressor and estimator on that set then only needs the
+projections Q'v of its columns, which are cached, so trying many
+instrument/outcome combinations costs a few small matrix products each.
+
+StreamingIVRegression fits the same estimators out of core on a
+panel_store.PanelStore: Q'v follows from the residualized Gram matrix
+through a Cholesky factor of the instrument block, and the clustered
+scores of a specification take one more pass over the store.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import eigh, solve_triangular
+from scipy.stats import chi2, f as f_distribution
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+try:
+    from .panel_regression import Absorb, FixedEffects, coefficient_table, group_codes
+    from .panel_store import Filter, PanelStore, StreamingMoments
+except ImportError:
+    from panel_regression import Absorb, FixedEffects, coefficient_table, group_codes
+    from panel_store import Filter, PanelStore, StreamingMoments
+
+
+class IVRegression:
+    """
+    k-class IV estimation (2SLS, LIML) on a fixed panel sample.
+
+    Coefficients are reported for the endogenous regressors; fixed effects
+    and exogenous controls are partialled out.
+    """
+
+    def __init__(self, data: pd.DataFrame, absorb: Sequence[Absorb] = (),
+                 cluster: str = 'firm_id', fixed_effects: Optional[FixedEffects] = None):
+        """
+        Args:
+            data: Panel with outcome, regressor, instrument, control,
+                fixed-effect and cluster columns
+            absorb: Fixed-effect sets (empty absorbs the intercept; ignored
+                if fixed_effects is given)
+            cluster: Cluster column for standard errors and tests
+            fixed_effects: Existing absorber built on the same rows
+        """
+        self.data = data
+        self.fixed_effects = fixed_effects or FixedEffects(data, absorb)
+        self.clusters = group_codes(data, cluster)
+        self.n_clusters = self.clusters.max() + 1
+        self._control_bases: Dict[Tuple[str, ...], Optional[np.ndarray]] = {}
+        self._instrument_bases: Dict[Tuple, np.ndarray] = {}
+        self._projections: Dict[Tuple, np.ndarray] = {}
+
+    def fit(self, outcomes: Union[str, Sequence[str]], endogenous: Sequence[str],
+            instruments: Sequence[str], exogenous: Sequence[str] = (),
+            method: str = '2sls') -> Dict[str, Dict]:
+        """
+        Estimate one specification for one or several outcomes.
+
+        Args:
+            outcomes: Outcome column(s)
+            endogenous: Endogenous regressor columns
+            instruments: Excluded instrument columns (at least as many as
+                endogenous regressors)
+            exogenous: Exogenous control columns
+            method: '2sls' or 'liml'
+
+        Returns:
+            Dictionary mapping each outcome to a dictionary with
+            'coefficients' (coefficient table), 'first_stage' (cluster-robust
+            F, its p-value and partial R^2 per endogenous regressor),
+            'overidentification' (Hansen J from two-step efficient GMM, or
+            None if exactly identified), 'kappa' and 'n_obs'
+        """
+        if method not in ('2sls', 'liml'):
+            raise ValueError(f"Unknown method: {method}")
+        outcomes = [outcomes] if isinstance(outcomes, str) else list(outcomes)
+        endogenous, instruments, exogenous = list(endogenous), list(instruments), tuple(exogenous)
+        n_endogenous, n_instruments = len(endogenous), len(instruments)
+        if n_instruments < n_endogenous:
+            raise ValueError("Model is underidentified: fewer instruments than endogenous regressors")
+
+        basis = self._instrument_basis(instruments, exogenous)
+        x = self._partialled(endogenous, exogenous)
+        qx = self._project(basis, instruments, exogenous, endogenous)
+        n_obs = len(x)
+        dof = n_obs - n_endogenous - len(exogenous)
+
+        first_stage = self._first_stage(x, qx, basis, endogenous, n_obs - n_instruments - len(exogenous))
+
+        results = {}
+        for outcome in outcomes:
+            y = self._partialled([outcome], exogenous)[:, 0]
+            qy = self._project(basis, instruments, exogenous, [outcome])[:, 0]
+
+            kappa = 1.0
+            if method == 'liml':
+                # Smallest root of det(V'V - k V'M_Z V) = 0 with V = [y, X]
+                v = np.column_stack([y, x])
+                qv = np.column_stack([qy, qx])
+                total = v.T @ v
+                kappa = eigh(total, total - qv.T @ qv, eigvals_only=True)[0]
+
+            bread = (1 - kappa) * (x.T @ x) + kappa * (qx.T @ qx)
+            beta = np.linalg.solve(bread, (1 - kappa) * (x.T @ y) + kappa * (qx.T @ qy))
+            errors = y - x @ beta
+
+            # Effective regressors (I - kappa M_Z) X for the cluster scores
+            effective = (1 - kappa) * x + kappa * (basis @ qx)
+            bread_inverse = np.linalg.inv(bread)
+            scores = self._cluster_sums(effective * errors[:, None])
+            covariance = (self._correction(n_obs, dof) * bread_inverse
+                          @ (scores.T @ scores) @ bread_inverse.T)
+
+            overidentification = None
+            if n_instruments > n_endogenous:
+                overidentification = self._hansen_j(qx, qy, self._cluster_sums(basis * errors[:, None]),
+                                                    n_instruments - n_endogenous)
+
+            results[outcome] = {
+                'coefficients': coefficient_table(beta, covariance, pd.Index(endogenous, name='regressor')),
+                'first_stage': first_stage,
+                'overidentification': overidentification,
+                'kappa': kappa,
+                'method': method,
+                'n_obs': n_obs
+            }
+        return results
+
+    def _partialled(self, columns: Sequence[str], exogenous: Tuple[str, ...]) -> np.ndarray:
+        """Columns residualized on the fixed effects and exogenous controls."""
+        values = self.fixed_effects.residualize(list(columns))
+        control_basis = self._control_basis(exogenous)
+        if control_basis is not None:
+            values -= control_basis @ (control_basis.T @ values)
+        return values
+
+    def _control_basis(self, exogenous: Tuple[str, ...]) -> Optional[np.ndarray]:
+        """Orthonormal basis of the residualized controls (factorized once)."""
+        if not exogenous:
+            return None
+        if exogenous not in self._control_bases:
+            controls = self.fixed_effects.residualize(list(exogenous))
+            self._control_bases[exogenous] = self._orthonormal(controls, 'exogenous controls')
+        return self._control_bases[exogenous]
+
+    def _instrument_basis(self, instruments: Sequence[str], exogenous: Tuple[str, ...]) -> np.ndarray:
+        """Orthonormal basis of the partialled excluded instruments (factorized once)."""
+        key = (tuple(instruments), exogenous)
+        if key not in self._instrument_bases:
+            self._instrument_bases[key] = self._orthonormal(self._partialled(instruments, exogenous),
+                                                            'instruments')
+        return self._instrument_bases[key]
+
+    def _project(self, basis: np.ndarray, instruments: Sequence[str],
+                 exogenous: Tuple[str, ...], columns: Sequence[str]) -> np.ndarray:
+        """Cached coordinates Q'v of partialled columns on an instrument basis."""
+        key = (tuple(instruments), exogenous)
+        missing = [c for c in columns if (key, c) not in self._projections]
+        if missing:
+            coordinates = basis.T @ self._partialled(missing, exogenous)
+            for j, c in enumerate(missing):
+                self._projections[(key, c)] = coordinates[:, j]
+        return np.column_stack([self._projections[(key, c)] for c in columns])
+
+    @staticmethod
+    def _orthonormal(values: np.ndarray, label: str) -> np.ndarray:
+        q, triangular = np.linalg.qr(values)
+        diagonal = np.abs(np.diag(triangular))
+        if diagonal.min() <= 1e-10 * max(diagonal.max(), 1.0):
+            raise ValueError(f"Collinear {label} after absorbing fixed effects")
+        return q
+
+    def _cluster_sums(self, values: np.ndarray) -> np.ndarray:
+        return np.column_stack([np.bincount(self.clusters, weights=values[:, i], minlength=self.n_clusters)
+                                for i in range(values.shape[1])])
+
+    def _correction(self, n_obs: int, dof: int) -> float:
+        return self.n_clusters / (self.n_clusters - 1) * (n_obs - 1) / dof
+
+    def _first_stage(self, x: np.ndarray, qx: np.ndarray, basis: np.ndarray,
+                     endogenous: Sequence[str], dof: int) -> pd.DataFrame:
+        """
+        Cluster-robust Wald F of the excluded instruments per endogenous regressor.
+
+        In the orthonormal basis the first-stage coefficients are Q'x, so
+        F = pi' V^-1 pi / L with V the clustered covariance of pi.
+        """
+        n_instruments = basis.shape[1]
+        rows = []
+        for k in range(len(endogenous)):
+            pi = qx[:, k]
+            scores = self._cluster_sums(basis * (x[:, k] - basis @ pi)[:, None])
+            covariance = self._correction(len(x), dof) * (scores.T @ scores)
+            f_stat = pi @ np.linalg.solve(covariance, pi) / n_instruments
+            rows.append({
+                'f_stat': f_stat,
+                'f_p_value': f_distribution.sf(f_stat, n_instruments, self.n_clusters - 1),
+                'partial_r2': (pi @ pi) / (x[:, k] @ x[:, k])
+            })
+        return pd.DataFrame(rows, index=pd.Index(endogenous, name='regressor'))
+
+    @staticmethod
+    def _hansen_j(qx: np.ndarray, qy: np.ndarray, moment_scores: np.ndarray, df: int) -> pd.Series:
+        """Hansen J from two-step efficient GMM with a clustered weight matrix."""
+        weight = np.linalg.inv(moment_scores.T @ moment_scores)
+        beta = np.linalg.solve(qx.T @ weight @ qx, qx.T @ weight @ qy)
+        moments = qy - qx @ beta
+        j_stat = moments @ weight @ moments
+        return pd.Series({'j_stat': j_stat, 'df': df, 'p_value': chi2.sf(j_stat, df)})
+
+
+class StreamingIVRegression:
+    """
+    Out-of-core counterpart of IVRegression on a partitioned panel.
+
+    The residualized moments of all columns are accumulated once; every
+    fit then solves from the Gram matrix and streams the store once more
+    for its clustered scores, first-stage and overidentification tests.
+    """
+
+    def __init__(self, store: PanelStore, columns: Sequence[str], absorb: Sequence[Absorb] = (),
+                 cluster: str = 'firm_id', where: Optional[Filter] = None):
+        """
+        Args:
+            store: Panel store
+            columns: Every outcome, regressor, instrument and control column
+                later fits may use (panel or firm-table columns)
+            absorb: Fixed-effect sets (empty absorbs the intercept)
+            cluster: Cluster column for standard errors and tests
+            where: Row filter for the estimation sample
+        """
+        self.moments = StreamingMoments(store, columns, absorb, cluster, where)
+        self.n_clusters = self.moments.n_clusters
+
+    def fit(self, outcomes: Union[str, Sequence[str]], endogenous: Sequence[str],
+            instruments: Sequence[str], exogenous: Sequence[str] = (),
+            method: str = '2sls') -> Dict[str, Dict]:
+        """
+        Estimate one specification for one or several outcomes.
+
+        Arguments and results as in IVRegression.fit.
+        """
+        if method not in ('2sls', 'liml'):
+            raise ValueError(f"Unknown method: {method}")
+        outcomes = [outcomes] if isinstance(outcomes, str) else list(outcomes)
+        endogenous, instruments, exogenous = list(endogenous), list(instruments), list(exogenous)
+        n_endogenous, n_instruments = len(endogenous), len(instruments)
+        if n_instruments < n_endogenous:
+            raise ValueError("Model is underidentified: fewer instruments than endogenous regressors")
+
+        # Partial out the controls: columns map to residuals through transform
+        moments = self.moments
+        m = len(moments.columns)
+        gram, transform = moments.gram, np.eye(m)
+        if exogenous:
+            w = moments.index(exogenous)
+            _triangular(gram[np.ix_(w, w)], 'exogenous controls')
+            partial = np.linalg.solve(gram[np.ix_(w, w)], gram[w])
+            gram = gram - gram[:, w] @ partial
+            transform[w] -= partial
+
+        # Orthonormal instrument basis Q = Z R^-1, so Q'v = R^-T Z'v
+        z, x = moments.index(instruments), moments.index(endogenous)
+        triangular = _triangular(gram[np.ix_(z, z)], 'instruments')
+        basis = solve_triangular(triangular, transform[:, z].T, trans='T').T
+
+        def project(columns):
+            return solve_triangular(triangular, gram[np.ix_(z, columns)], trans='T')
+
+        qx = project(x)
+        xx = gram[np.ix_(x, x)]
+        n_obs = moments.n_obs
+        dof = n_obs - n_endogenous - len(exogenous)
+        correction = self.n_clusters / (self.n_clusters - 1) * (n_obs - 1) / dof
+
+        # Cluster sums needed by this fit, collected for a single pass
+        left, right = [], []
+        for k in range(n_endogenous):
+            left.append(basis)
+            right.append(np.repeat((transform[:, x[k]] - basis @ qx[:, k])[:, None], n_instruments, axis=1))
+
+        estimates = {}
+        for outcome in outcomes:
+            y = moments.index([outcome])[0]
+            qy = project([y])[:, 0]
+            kappa = 1.0
+            if method == 'liml':
+                v = [y] + x
+                qv = np.column_stack([qy, qx])
+                total = gram[np.ix_(v, v)]
+                kappa = eigh(total, total - qv.T @ qv, eigvals_only=True)[0]
+
+            bread = (1 - kappa) * xx + kappa * (qx.T @ qx)
+            beta = np.linalg.solve(bread, (1 - kappa) * gram[x, y] + kappa * (qx.T @ qy))
+            errors = transform[:, y] - transform[:, x] @ beta
+            effective = (1 - kappa) * transform[:, x] + kappa * (basis @ qx)
+            left += [effective, basis]
+            right += [np.repeat(errors[:, None], n_endogenous, axis=1),
+                      np.repeat(errors[:, None], n_instruments, axis=1)]
+            estimates[outcome] = (kappa, beta, bread, qy)
+
+        sums = moments.cluster_products(np.hstack(left), np.hstack(right))
+        blocks = np.split(sums, np.cumsum([block.shape[1] for block in left])[:-1], axis=1)
+
+        first_dof = n_obs - n_instruments - len(exogenous)
+        first_correction = self.n_clusters / (self.n_clusters - 1) * (n_obs - 1) / first_dof
+        rows = []
+        for k in range(n_endogenous):
+            pi = qx[:, k]
+            covariance = first_correction * (blocks[k].T @ blocks[k])
+            f_stat = pi @ np.linalg.solve(covariance, pi) / n_instruments
+            rows.append({
+                'f_stat': f_stat,
+                'f_p_value': f_distribution.sf(f_stat, n_instruments, self.n_clusters - 1),
+                'partial_r2': (pi @ pi) / xx[k, k]
+            })
+        first_stage = pd.DataFrame(rows, index=pd.Index(endogenous, name='regressor'))
+
+        results = {}
+        for j, (outcome, (kappa, beta, bread, qy)) in enumerate(estimates.items()):
+            scores, moment_scores = blocks[n_endogenous + 2 * j], blocks[n_endogenous + 2 * j + 1]
+            bread_inverse = np.linalg.inv(bread)
+            covariance = correction * bread_inverse @ (scores.T @ scores) @ bread_inverse.T
+
+            overidentification = None
+            if n_instruments > n_endogenous:
+                overidentification = IVRegression._hansen_j(qx, qy, moment_scores,
+                                                            n_instruments - n_endogenous)
+
+            results[outcome] = {
+                'coefficients': coefficient_table(beta, covariance, pd.Index(endogenous, name='regressor')),
+                'first_stage': first_stage,
+                'overidentification': overidentification,
+                'kappa': kappa,
+                'method': method,
+                'n_obs': n_obs
+            }
+        return results
+
+
+def _triangular(gram: np.ndarray, label: str) -> np.ndarray:
+    """Upper Cholesky factor R (R'R = gram), the R of a QR of the columns."""
+    try:
+        triangular = np.linalg.cholesky(gram).T
+    except np.linalg.LinAlgError:
+        raise ValueError(f"Collinear {label} after absorbing fixed effects") from None
+    diagonal = np.abs(np.diag(triangular))
+    if diagonal.min() <= 1e-10 * max(diagonal.max(), 1.0):
+        raise ValueError(f"Collinear {label} after absorbing fixed effects")
+    return triangular
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Partitioned Panel Storage and Out-of-Core Estimation
+
+Stores a firm-period panel as a hive-partitioned Parquet dataset (by
+period, industry, ...) next to a firm table and a small metadata file,
+and runs fixed-effects regressions on it without loading the panel:
+rows are streamed in batches with only the needed columns read, and
+estimators work from accumulated sufficient statistics.
+
+Absorption is exact and takes two passes. The largest fixed-effect set
+(usually firms) is partialled out by group means and the remaining sets
+through the Schur complement of their dummies, as in
+panel_regression.FixedEffects. The first pass accumulates per-group
+counts and sums, the raw Gram matrix and the group incidence; the
+residualized Gram of every requested column follows from those alone.
+Cluster-robust scores need residuals, so the second pass residualizes
+each batch from the stored group offsets and sums scores by cluster.
+
+Memory is bounded by the firm-level state: per-firm sums of the streamed
+columns and the firm x other-effect incidence (one bit per cell when
+large), never by the number of rows.
+"""
+
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from scipy.linalg import cho_factor, cho_solve
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for on-disk panels
+    pa = ds = pq = None
+
+try:
+    from .panel_regression import Absorb, coefficient_table
+except ImportError:
+    from panel_regression import Absorb, coefficient_table
+
+Filter = Sequence[tuple]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Partitioned panel storage requires pyarrow (pip install pyarrow)")
+
+
+class PanelStore:
+    """
+    Hive-partitioned Parquet panel with its firm table.
+
+    Layout under the root directory: panel/<partition>=<value>/*.parquet
+    for the firm-period rows, firms.parquet for firm attributes (indexed
+    by unit) and metadata.json with the partitioning, the time levels and
+    the categories of every categorical column, so batches decode to the
+    same codes whichever partition they come from.
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 1_000_000):
+        """
+        Args:
+            path: Store root written by PanelStore.write
+            batch_size: Rows per streamed batch (small record batches are
+                combined up to this size)
+        """
+        _require_pyarrow()
+        self.path = Path(path)
+        self.batch_size = batch_size
+        metadata = json.loads((self.path / 'metadata.json').read_text())
+        self.unit = metadata['unit']
+        self.time = metadata['time']
+        self.partition_by = metadata['partition_by']
+        self.time_levels = pd.Index(metadata['time_levels'], name=self.time)
+        self.categories = {column: pd.CategoricalDtype(spec['categories'], ordered=spec['ordered'])
+                           for column, spec in metadata['categories'].items()}
+        self.dataset = ds.dataset(self.path / 'panel', format='parquet', partitioning='hive')
+        self.columns = list(self.dataset.schema.names)
+        self.firm_columns = [c for c in pq.read_schema(self.path / 'firms.parquet').names if c != self.unit]
+        self._firms = None
+
+    @classmethod
+    def write(cls, path: Union[str, Path], data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+              firms: pd.DataFrame, partition_by: Union[str, Sequence[str]] = 'period',
+              unit: str = 'firm_id', time: str = 'period', **kwargs) -> 'PanelStore':
+        """
+        Write a panel, in one frame or in chunks, and its firm table.
+
+        Args:
+            path: Store root (created; an existing panel there is replaced)
+            data: Panel rows, or an iterable of row chunks with the same
+                columns and categories, so panels larger than memory can
+                be written piece by piece
+            firms: Firm attributes indexed by unit
+            partition_by: Partition column(s), e.g. 'period' or 'industry'
+            unit: Unit column (the firm table's index)
+            time: Period column
+            **kwargs: Passed to PanelStore (e.g. batch_size)
+
+        Returns:
+            The opened store
+        """
+        _require_pyarrow()
+        root = Path(path)
+        if (root / 'panel').exists():
+            shutil.rmtree(root / 'panel')
+        (root / 'panel').mkdir(parents=True)
+        partition_by = [partition_by] if isinstance(partition_by, str) else list(partition_by)
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+
+        categories, time_levels = None, set()
+        for i, chunk in enumerate(chunks):
+            chunk_categories = {column: chunk[column].dtype for column in chunk
+                                if isinstance(chunk[column].dtype, pd.CategoricalDtype)}
+            if categories is None:
+                categories = chunk_categories
+            elif chunk_categories != categories:
+                raise ValueError("Every chunk needs the same categorical columns and categories")
+            time_levels.update(pd.unique(chunk[time]).tolist())
+            pq.write_to_dataset(pa.Table.from_pandas(chunk, preserve_index=False), root / 'panel',
+                                partition_cols=partition_by, basename_template=f'part-{i}-{{i}}.parquet',
+                                existing_data_behavior='overwrite_or_ignore',
+                                compression='zstd')
+
+        firms.rename_axis(unit).to_parquet(root / 'firms.parquet', compression='zstd')
+        metadata = {
+            'unit': unit,
+            'time': time,
+            'partition_by': partition_by,
+            'time_levels': sorted(time_levels),
+            'categories': {column: {'categories': dtype.categories.tolist(), 'ordered': bool(dtype.ordered)}
+                           for column, dtype in (categories or {}).items()}
+        }
+        (root / 'metadata.json').write_text(json.dumps(metadata, indent=2))
+        return cls(root, **kwargs)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns or column in self.firm_columns or column == self.unit
+
+    @property
+    def n_rows(self) -> int:
+        return self.dataset.count_rows()
+
+    def firms(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Firm table indexed by unit (read once, then projected in memory).
+
+        Args:
+            columns: Firm columns to return (default all)
+        """
+        if self._firms is None:
+            self._firms = pd.read_parquet(self.path / 'firms.parquet')
+        return self._firms if columns is None else self._firms[list(columns)]
+
+    def scan(self, columns: Sequence[str], where: Optional[Filter] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream panel rows batch by batch, reading only the given columns.
+
+        Firm-table columns are attached to each batch by unit lookup, and
+        categorical columns decode with the stored categories.
+
+        Args:
+            columns: Panel and firm-table columns
+            where: Row filter in pyarrow DNF form, e.g. [('period', '>=', 10)];
+                filters on partition columns skip whole partitions
+
+        Yields:
+            DataFrame per batch with the requested columns
+        """
+        columns = list(dict.fromkeys(columns))
+        unknown = [c for c in columns if c not in self]
+        if unknown:
+            raise KeyError(f"Columns not in the panel store: {unknown}")
+        firm_columns = [c for c in columns if c not in self.columns]
+        read = [c for c in columns if c in self.columns]
+        if firm_columns and self.unit not in read:
+            read.append(self.unit)
+        firms = self.firms(firm_columns) if firm_columns else None
+
+        batches = self.dataset.to_batches(columns=read, batch_size=self.batch_size,
+                                          filter=pq.filters_to_expression(where) if where else None)
+        for table in self._coalesce(batches):
+            frame = table.to_pandas()
+            for column in read:
+                if column in self.categories:
+                    frame[column] = frame[column].astype(self.categories[column])
+            if firm_columns:
+                positions = firms.index.get_indexer(frame[self.unit])
+                if (positions < 0).any():
+                    raise ValueError("Panel rows reference units missing from the firm table")
+                for column in firm_columns:
+                    frame[column] = firms[column].array.take(positions)
+            yield frame[columns]
+
+    def _coalesce(self, batches: Iterable) -> Iterator:
+        """Combine record batches (one or more per file) into tables of about batch_size rows."""
+        buffer, n_rows = [], 0
+        for batch in batches:
+            if batch.num_rows:
+                buffer.append(batch)
+                n_rows += batch.num_rows
+            if n_rows >= self.batch_size:
+                yield pa.Table.from_batches(buffer)
+                buffer, n_rows = [], 0
+        if buffer:
+            yield pa.Table.from_batches(buffer)
+
+    def n_levels(self, columns: Absorb) -> int:
+        """Number of level combinations of a key column or interaction."""
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        return int(np.prod([len(self._levels(c)) for c in columns]))
+
+    def codes(self, frame: pd.DataFrame, columns: Absorb) -> np.ndarray:
+        """
+        Store-wide integer codes of a key column or interaction.
+
+        Unlike panel_regression.group_codes the codes do not depend on the
+        batch: units are coded by firm-table position, periods by the
+        stored time levels and categoricals by their categories.
+        """
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        codes = np.zeros(len(frame), dtype=np.int64)
+        for column in columns:
+            levels = self._levels(column)
+            if column in self.categories:
+                column_codes = frame[column].cat.codes.to_numpy()
+            else:
+                column_codes = levels.get_indexer(frame[column])
+            if (column_codes < 0).any():
+                raise ValueError(f"Missing or unknown {column} values in the panel store")
+            codes = codes * len(levels) + column_codes
+        return codes
+
+    def _levels(self, column: str) -> pd.Index:
+        if column in self.categories:
+            return pd.Index(self.categories[column].categories)
+        if column == self.unit:
+            return self.firms().index
+        if column == self.time:
+            return self.time_levels
+        raise KeyError(f"No stored levels for {column}: key on the unit, time or categorical columns")
+
+
+class StreamingMoments:
+    """
+    Residualized second moments of streamed columns after absorbing fixed effects.
+
+    After construction (the first pass), gram holds the cross-products of
+    the columns residualized on all absorbed effects; cluster_products
+    runs further passes for cluster-level score sums.
+    """
+
+    def __init__(self, store: PanelStore, columns: Sequence[str],
+                 absorb: Sequence[Absorb] = ('firm_id', 'period'), cluster: str = 'firm_id',
+                 where: Optional[Filter] = None,
+                 derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                 inputs: Sequence[str] = (), chunk_size: int = 65_536, dense_limit: int = 2 ** 22):
+        """
+        Args:
+            store: Panel store
+            columns: Columns to residualize: panel or firm-table columns, or
+                columns added by derive
+            absorb: Fixed-effect sets, each a key column or a tuple of them
+                for an interaction (an empty list absorbs the intercept)
+            cluster: Cluster key column for cluster_products
+            where: Row filter passed to PanelStore.scan
+            derive: Adds derived columns to each batch (e.g. event-time
+                indicators); must be row-wise
+            inputs: Stored columns derive reads
+            chunk_size: Groups per block when combining group-level state
+            dense_limit: Largest incidence (groups x other levels) kept as
+                counts; larger ones are kept as bits, which needs at most one
+                row per cell (e.g. one row per firm and period)
+        """
+        self.store = store
+        self.columns = list(columns)
+        self.cluster = cluster
+        self.where = where
+        self.derive = derive
+        self.chunk_size = chunk_size
+
+        keys = [key for key in absorb]
+        sizes = [store.n_levels(key) for key in keys]
+        self.n_groups = {key if isinstance(key, str) else ' x '.join(key): size for key, size in zip(keys, sizes)}
+        # Largest set is partialled out by group means, the rest through their dummies
+        order = np.argsort([-size for size in sizes], kind='stable')
+        self._keys = [keys[i] for i in order]
+        self._sizes = [sizes[i] for i in order]
+        self._offsets = np.cumsum([0] + self._sizes[1:])
+        self._n_clusters = store.n_levels(cluster)
+        self._n_dummies = int(self._offsets[-1])
+        self._dense = (self._sizes[0] if keys else 1) * self._n_dummies <= dense_limit
+
+        key_columns = [c for key in keys for c in ([key] if isinstance(key, str) else key)]
+        self._read = [c for c in dict.fromkeys([*self.columns, *inputs, *key_columns, cluster]) if c in store]
+        self._accumulate()
+
+    def _batches(self) -> Iterator[tuple]:
+        """Column values, fixed-effect codes and cluster codes per batch, non-finite rows dropped."""
+        for frame in self.store.scan(self._read, self.where):
+            if self.derive is not None:
+                frame = self.derive(frame)
+            values = np.column_stack([frame[c].to_numpy(dtype=float, na_value=np.nan) for c in self.columns])
+            keep = np.isfinite(values).all(axis=1)
+            if not keep.all():
+                frame, values = frame[keep], values[keep]
+            if not len(values):
+                continue
+            codes = [self.store.codes(frame, key) for key in self._keys] or [np.zeros(len(values), dtype=np.int64)]
+            yield values, codes, self.store.codes(frame, self.cluster)
+
+    def _accumulate(self):
+        """First pass: group counts and sums, raw Gram and incidence; then the residualized Gram."""
+        m = len(self.columns)
+        n_groups = self._sizes[0] if self._keys else 1
+        n_dummies = self._n_dummies
+        group_counts = np.zeros(n_groups)
+        group_sums = np.zeros((n_groups, m))
+        raw_gram = np.zeros((m, m))
+        dummy_gram = np.zeros((n_dummies, n_dummies))
+        dummy_sums = np.zeros((n_dummies, m))
+        if self._dense:
+            incidence = np.zeros((n_groups, n_dummies))
+        else:
+            incidence = np.zeros((n_groups, (n_dummies + 7) // 8), dtype=np.uint8)
+        cluster_counts = np.zeros(self._n_clusters)
+        totals = np.zeros(m)
+
+        for values, codes, clusters in self._batches():
+            groups, dummies = codes[0], [codes[j] + self._offsets[j - 1] for j in range(1, len(codes))]
+            group_counts += np.bincount(groups, minlength=n_groups)
+            for i in range(m):
+                group_sums[:, i] += np.bincount(groups, weights=values[:, i], minlength=n_groups)
+            raw_gram += values.T @ values
+            totals += values.sum(axis=0)
+            cluster_counts += np.bincount(clusters, minlength=self._n_clusters)
+            for j, columns in enumerate(dummies):
+                for i in range(m):
+                    dummy_sums[:, i] += np.bincount(columns, weights=values[:, i], minlength=n_dummies)
+                for other in dummies[j:]:
+                    dummy_gram += np.bincount(columns * n_dummies + other,
+                                              minlength=n_dummies ** 2).reshape(n_dummies, n_dummies)
+                if self._dense:
+                    incidence += np.bincount(groups * n_dummies + columns,
+                                             minlength=n_groups * n_dummies).reshape(n_groups, n_dummies)
+                else:
+                    np.bitwise_or.at(incidence, (groups, columns >> 3),
+                                     np.left_shift(1, columns & 7).astype(np.uint8))
+
+        self.n_obs = int(group_counts.sum())
+        if self.n_obs == 0:
+            raise ValueError("No complete rows in the panel store for these columns")
+        self.n_clusters = int((cluster_counts > 0).sum())
+        self.totals = totals
+        self._cluster_present = cluster_counts > 0
+
+        # Partial out the largest set by group means
+        inverse_counts = np.divide(1.0, group_counts, out=np.zeros(n_groups), where=group_counts > 0)
+        group_means = group_sums * inverse_counts[:, None]
+        gram = raw_gram - group_sums.T @ group_means
+        self._group_offsets = group_means
+        self._effects = np.zeros((n_dummies, m))
+        if n_dummies:
+            # Remaining sets: Schur complement S = D'M D and D'M v from the incidence
+            dummy_gram = np.triu(dummy_gram) + np.triu(dummy_gram, 1).T
+            weighted_incidence = np.zeros((n_dummies, n_dummies))
+            incidence_means = np.zeros((n_dummies, m))
+            n_cells = 0.0
+            for rows, block in self._incidence_blocks(incidence):
+                weighted_incidence += block.T @ (block * inverse_counts[rows, None])
+                incidence_means += block.T @ group_means[rows]
+                n_cells += block.sum()
+            if not self._dense and n_cells != self.n_obs * (len(self._keys) - 1):
+                raise ValueError(f"Absorbing {self.n_groups} out of core needs at most one row per "
+                                 f"cell, or a dense_limit above the incidence size")
+            projected_sums = dummy_sums - incidence_means
+            # Singular (one null direction per connected component): cut those off
+            schur_inverse = np.linalg.pinv(dummy_gram - weighted_incidence, rcond=1e-10, hermitian=True)
+            self._effects = schur_inverse @ projected_sums
+            gram -= projected_sums.T @ self._effects
+            for rows, block in self._incidence_blocks(incidence):
+                self._group_offsets[rows] -= (block @ self._effects) * inverse_counts[rows, None]
+        self.gram = (gram + gram.T) / 2
+
+    def _incidence_blocks(self, incidence: np.ndarray) -> Iterator[tuple]:
+        """Row blocks of the group x dummy incidence as float arrays."""
+        for start in range(0, len(incidence), self.chunk_size):
+            rows = slice(start, start + self.chunk_size)
+            block = incidence[rows]
+            if not self._dense:
+                block = np.unpackbits(block, axis=1, count=self._n_dummies, bitorder='little')
+            yield rows, block.astype(float)
+
+    def residualize(self, values: np.ndarray, codes: List[np.ndarray]) -> np.ndarray:
+        """Batch columns residualized on all absorbed effects."""
+        residuals = values - self._group_offsets[codes[0]]
+        for j in range(1, len(codes)):
+            residuals -= self._effects[codes[j] + self._offsets[j - 1]]
+        return residuals
+
+    def cluster_products(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """
+        Cluster sums of products of linear combinations of the residualized columns.
+
+        One pass over the store computes sum_{i in g} (v_i'left)(v_i'right)
+        elementwise, so regression scores x_i e_i come from left selecting
+        regressors and right holding residual coefficients.
+
+        Args:
+            left: (m, q) coefficients on the columns
+            right: (m, q) coefficients on the columns
+
+        Returns:
+            (n_clusters, q) score sums of the clusters with rows
+        """
+        sums = np.zeros((self._n_clusters, left.shape[1]))
+        for values, codes, clusters in self._batches():
+            residuals = self.residualize(values, codes)
+            products = (residuals @ left) * (residuals @ right)
+            for i in range(products.shape[1]):
+                sums[:, i] += np.bincount(clusters, weights=products[:, i], minlength=self._n_clusters)
+        return sums[self._cluster_present]
+
+    def index(self, columns: Sequence[str]) -> List[int]:
+        """Positions of columns in gram."""
+        return [self.columns.index(c) for c in columns]
+
+
+class StreamingPanelRegression:
+    """
+    Out-of-core counterpart of panel_regression.PanelRegression.
+
+    Same estimates and CR1 standard errors, from two passes over a
+    PanelStore per fit.
+    """
+
+    def __init__(self, store: PanelStore, absorb: Sequence[Absorb] = ('firm_id', 'period'),
+                 cluster: str = 'firm_id', where: Optional[Filter] = None):
+        """
+        Args:
+            store: Panel store
+            absorb: Fixed-effect sets
+            cluster: Cluster column for standard errors
+            where: Row filter for the estimation sample
+        """
+        self.store = store
+        self.absorb = list(absorb)
+        self.cluster = cluster
+        self.where = where
+        self.moments = None
+
+    def fit(self, outcomes: Union[str, Sequence[str]], regressors: Sequence[str],
+            derive: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+            inputs: Sequence[str] = ()) -> Dict[str, pd.DataFrame]:
+        """
+        Estimate one specification for one or several outcomes.
+
+        Rows with a missing value in any outcome or regressor are dropped.
+        The moments of the last fit are kept in self.moments.
+
+        Args:
+            outcomes: Outcome column(s)
+            regressors: Regressor columns (no intercept; it is absorbed)
+            derive: Adds derived regressor columns to each batch
+            inputs: Stored columns derive reads
+
+        Returns:
+            Dictionary mapping each outcome to a coefficient table indexed
+            by regressor
+        """
+        outcomes = [outcomes] if isinstance(outcomes, str) else list(outcomes)
+        regressors = list(regressors)
+        k, n_outcomes = len(regressors), len(outcomes)
+        self.moments = moments = StreamingMoments(self.store, regressors + outcomes, self.absorb,
+                                                  self.cluster, self.where, derive, inputs)
+        gram = cho_factor(moments.gram[:k, :k])
+        coefficients = cho_solve(gram, moments.gram[:k, k:])
+        bread = cho_solve(gram, np.eye(k))
+
+        # Scores x_i e_i of every outcome in one pass: e = y_j - X b_j
+        residual = np.zeros((k + n_outcomes, n_outcomes))
+        residual[:k] = -coefficients
+        residual[k:] = np.eye(n_outcomes)
+        left = np.tile(np.eye(k + n_outcomes)[:, :k], n_outcomes)
+        scores = moments.cluster_products(left, np.repeat(residual, k, axis=1))
+
+        n, g = moments.n_obs, moments.n_clusters
+        correction = g / (g - 1) * (n - 1) / (n - k)
+        results = {}
+        for j, outcome in enumerate(outcomes):
+            outcome_scores = scores[:, j * k:(j + 1) * k]
+            covariance = correction * bread @ (outcome_scores.T @ outcome_scores) @ bread
+            results[outcome] = coefficient_table(coefficients[:, j], covariance,
+                                                 pd.Index(regressors, name='regressor'))
+        return results
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Resampling Inference for Treatment Effects
+
+Wild-cluster bootstrap and randomization (placebo adoption date)
+inference for the linear estimators of the causal analysis: fixed-effects
+DiD and event-study regressions, and instrumental variables.
+
+Both reduce every draw to a weight vector over clusters or units:
+
+- Wild-cluster bootstrap (restricted, WCR): with the null imposed, a draw
+  flips the restricted residuals of each cluster by a multiplier, and the
+  bootstrap coefficient and cluster-robust variance are linear in those
+  multipliers given per-cluster score and cross-product sums. A chunk of
+  draws is a (draws x clusters) multiplier matrix times cluster-level
+  arrays; the rows are never touched again.
+- Randomization inference: adoption dates (or instrument values) are
+  permuted across units. On a balanced panel with unit and period effects
+  the residualized Gram matrix is unchanged by any permutation, so a draw
+  only needs each unit's outcome sum under its reassigned date, gathered
+  from a per-unit table.
+
+Chunks of draws are spread across a process pool whose workers receive
+the shared arrays once; every chunk has its own seed, so results do not
+depend on the number of workers.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+try:
+    from .simulation_engine import _InlineExecutor
+    from .panel_regression import group_codes
+except ImportError:
+    from simulation_engine import _InlineExecutor
+    from panel_regression import group_codes
+
+
+# Arrays shared with worker processes (set once per worker)
+_shared: Dict[str, np.ndarray] = {}
+
+
+def _init_shared(arrays: Dict[str, np.ndarray]):
+    _shared.clear()
+    _shared.update(arrays)
+
+
+def _multipliers(kind: str, rng: np.random.Generator, shape: Tuple[int, int]) -> np.ndarray:
+    """Rademacher (+-1) or Webb six-point cluster multipliers."""
+    if kind == 'rademacher':
+        return rng.integers(0, 2, shape).astype(float) * 2 - 1
+    if kind == 'webb':
+        values = np.array([-np.sqrt(1.5), -1.0, -np.sqrt(0.5), np.sqrt(0.5), 1.0, np.sqrt(1.5)])
+        return values[rng.integers(0, 6, shape)]
+    raise ValueError(f"Unknown multiplier: {kind}")
+
+
+def _run_chunks(worker: Callable, arrays: Dict[str, np.ndarray], n_draws: int,
+                chunk_size: int, n_workers: int, seed: Optional[int], *args) -> np.ndarray:
+    """Evaluate worker over seeded chunks of draws, in a process pool if n_workers > 1."""
+    sizes = [min(chunk_size, n_draws - start) for start in range(0, n_draws, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_workers = min(n_workers, len(sizes))
+    if n_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_shared,
+                                       initargs=(arrays,))
+    else:
+        _init_shared(arrays)
+        executor = _InlineExecutor()
+    try:
+        futures = [executor.submit(worker, seed_sequence, size, *args)
+                   for seed_sequence, size in zip(seeds, sizes)]
+        return np.concatenate([future.result() for future in futures])
+    finally:
+        executor.shutdown()
+        _shared.clear()
+
+
+def _wild_chunk(seed_sequence: np.random.SeedSequence, n_draws: int, kind: str) -> np.ndarray:
+    """
+    Bootstrap t-statistics for every tested coefficient.
+
+    For test j with restricted fit beta_r, a draw with cluster multipliers
+    xi moves the estimate by delta = xi @ P_j and the tested coefficient's
+    cluster score by xi * s_j - delta @ M_j'.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    xi = _multipliers(kind, rng, (n_draws, _shared['s'].shape[1]))
+    t_stats = np.empty((n_draws, len(_shared['tested'])))
+    for j, column in enumerate(_shared['tested']):
+        delta = xi @ _shared['P'][j]
+        scores = xi * _shared['s'][j]
+        scores -= delta @ _shared['M'][j].T
+        t_stats[:, j] = delta[:, column] / np.sqrt(_shared['correction'] * np.einsum('bg,bg->b', scores, scores))
+    return t_stats
+
+
+def _permutation_chunk(seed_sequence: np.random.SeedSequence, n_draws: int) -> np.ndarray:
+    """Coefficients under permuted unit assignments."""
+    rng = np.random.default_rng(seed_sequence)
+    contributions, codes = _shared['contributions'], _shared['codes']
+    permuted = rng.permuted(np.tile(codes, (n_draws, 1)), axis=1)
+    numerators = contributions[np.arange(len(codes)), permuted].sum(axis=1)
+    return numerators @ _shared['gram_inverse'].T
+
+
+class WildClusterBootstrap:
+    """
+    Restricted wild-cluster bootstrap for OLS and linear IV coefficients.
+
+    Inputs are already residualized on any absorbed fixed effects. For IV
+    the instruments (or first-stage fitted values) are held fixed.
+    """
+
+    def __init__(self, n_bootstrap: int = 9999, multiplier: str = 'rademacher',
+                 chunk_size: Optional[int] = None, n_workers: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            n_bootstrap: Bootstrap draws
+            multiplier: 'rademacher' or 'webb' (few clusters)
+            chunk_size: Draws per chunk (defaults to about 4M multipliers)
+            n_workers: Worker processes (None uses every CPU, 1 runs in this
+                process)
+            seed: Root seed; results do not depend on n_workers
+        """
+        self.n_bootstrap = n_bootstrap
+        self.multiplier = multiplier
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.seed = seed
+
+    def test(self, x: np.ndarray, y: np.ndarray, clusters: np.ndarray,
+             instruments: Optional[np.ndarray] = None,
+             names: Optional[Sequence[str]] = None,
+             tested: Optional[Sequence[int]] = None,
+             null: float = 0.0) -> pd.DataFrame:
+        """
+        Bootstrap p-values of H0: beta_k = null for each tested coefficient.
+
+        The estimator is beta = (W'X)^-1 W'y with W = X for OLS or W the
+        instruments (as many as regressors) for IV.
+
+        Args:
+            x: (n, k) regressors
+            y: (n,) outcome
+            clusters: Cluster codes 0..G-1 per row
+            instruments: (n, k) instruments for IV (None for OLS)
+            names: Coefficient names
+            tested: Indices of the coefficients to test (default all)
+            null: Hypothesized value
+
+        Returns:
+            DataFrame indexed by name with coefficient, std_error (CR1),
+            t_stat and bootstrap p_value
+        """
+        x = np.asarray(x, dtype=float).reshape(len(y), -1)
+        y = np.asarray(y, dtype=float).ravel()
+        w = x if instruments is None else np.asarray(instruments, dtype=float).reshape(x.shape)
+        k = x.shape[1]
+        names = list(names) if names is not None else [f'x{i}' for i in range(k)]
+        tested = list(tested) if tested is not None else list(range(k))
+        n_clusters = clusters.max() + 1
+
+        def cluster_sums(values):
+            return np.column_stack([np.bincount(clusters, weights=values[:, i], minlength=n_clusters)
+                                    for i in range(values.shape[1])])
+
+        q_inverse = np.linalg.inv(w.T @ x)
+        beta = q_inverse @ (w.T @ y)
+        # W_g' X_g for every cluster, (G, k, k)
+        cross = np.empty((n_clusters, k, k))
+        for i in range(k):
+            cross[:, i] = cluster_sums(w[:, i, None] * x)
+        correction = n_clusters / (n_clusters - 1) * (len(y) - 1) / (len(y) - k)
+
+        scores = cluster_sums(w * (y - x @ beta)[:, None])
+        covariance = correction * q_inverse @ (scores.T @ scores) @ q_inverse.T
+        se = np.sqrt(np.diag(covariance))
+
+        s, P, M = [], [], []
+        for column in tested:
+            # Restricted fit with beta_column = null
+            rest = [i for i in range(k) if i != column]
+            restricted = np.zeros(k)
+            restricted[column] = null
+            if rest:
+                restricted[rest] = np.linalg.solve(w[:, rest].T @ x[:, rest],
+                                                   w[:, rest].T @ (y - x[:, column] * null))
+            restricted_scores = cluster_sums(w * (y - x @ restricted)[:, None])
+            v = q_inverse[column]
+            s.append(restricted_scores @ v)
+            P.append(restricted_scores @ q_inverse.T)
+            M.append(np.einsum('gij,i->gj', cross, v))
+
+        arrays = {'s': np.array(s), 'P': np.array(P), 'M': np.array(M),
+                  'tested': np.array(tested), 'correction': np.array(correction)}
+        chunk_size = self.chunk_size or max(1, (1 << 22) // n_clusters)
+        draws = _run_chunks(_wild_chunk, arrays, self.n_bootstrap, chunk_size,
+                            self.n_workers, self.seed, self.multiplier)
+
+        t_stat = (beta[tested] - null) / se[tested]
+        p_value = (np.abs(draws) >= np.abs(t_stat)).mean(axis=0)
+        return pd.DataFrame({
+            'coefficient': beta[tested],
+            'std_error': se[tested],
+            't_stat': t_stat,
+            'p_value': p_value,
+            'n_bootstrap': self.n_bootstrap
+        }, index=pd.Index([names[i] for i in tested], name='coefficient_name'))
+
+
+class RandomizationInference:
+    """
+    Permutation inference over unit-level treatment assignments.
+
+    A statistic is linear in the assignment: beta = G^-1 sum_i C[i, a_i]
+    where a_i is unit i's assignment level and C[i, l] its contribution
+    under level l. G must be invariant to permuting assignments across
+    units (true for unit and period effects on a balanced panel).
+    """
+
+    def __init__(self, n_permutations: int = 9999, chunk_size: Optional[int] = None,
+                 n_workers: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Args:
+            n_permutations: Permutation draws
+            chunk_size: Draws per chunk (defaults to about 4M gathered values)
+            n_workers: Worker processes (None uses every CPU, 1 runs in this
+                process)
+            seed: Root seed; results do not depend on n_workers
+        """
+        self.n_permutations = n_permutations
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.seed = seed
+
+    def test(self, contributions: np.ndarray, codes: np.ndarray, gram: np.ndarray,
+             names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Two-sided permutation p-values of the sharp null of no effect.
+
+        Args:
+            contributions: (n_units, n_levels, k) per-unit contributions
+            codes: (n_units,) observed assignment level of each unit
+            gram: (k, k) permutation-invariant Gram matrix
+            names: Coefficient names
+
+        Returns:
+            DataFrame with coefficient, p_value and the permutation
+            distribution's mean and standard deviation
+        """
+        n_units, _, k = contributions.shape
+        names = list(names) if names is not None else [f'x{i}' for i in range(k)]
+        gram_inverse = np.linalg.inv(np.atleast_2d(gram))
+        beta = gram_inverse @ contributions[np.arange(n_units), codes].sum(axis=0)
+
+        arrays = {'contributions': contributions, 'codes': codes, 'gram_inverse': gram_inverse}
+        chunk_size = self.chunk_size or max(1, (1 << 22) // (n_units * k))
+        draws = _run_chunks(_permutation_chunk, arrays, self.n_permutations, chunk_size,
+                            self.n_workers, self.seed)
+
+        # Observed assignment counts as one draw
+        exceed = (np.abs(draws) >= np.abs(beta)).sum(axis=0)
+        return pd.DataFrame({
+            'coefficient': beta,
+            'p_value': (exceed + 1) / (self.n_permutations + 1),
+            'permutation_mean': draws.mean(axis=0),
+            'permutation_std': draws.std(axis=0),
+            'n_permutations': self.n_permutations
+        }, index=pd.Index(names, name='coefficient_name'))
+
+
+def adoption_contributions(data: pd.DataFrame, residuals: np.ndarray,
+                           relative_columns: Callable[[np.ndarray], np.ndarray], n_columns: int,
+                           unit: str = 'firm_id', time: str = 'period',
+                           adoption: str = 'adoption_period') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-unit outcome sums under every observed adoption date.
+
+    Contribution C[i, l, j] sums unit i's residualized outcome over the
+    periods that fall in regressor column j if the unit adopted on date l
+    (never-treated contributes zero).
+
+    Args:
+        data: Balanced panel
+        residuals: (n_rows,) outcome residualized on unit and period effects
+        relative_columns: Maps relative times to regressor columns (-1 none)
+        n_columns: Number of regressor columns
+        unit: Unit column
+        time: Period column
+        adoption: First treated period column (missing for never-treated)
+
+    Returns:
+        contributions (n_units, n_levels, n_columns) and observed level codes
+    """
+    units = group_codes(data, unit)
+    periods = np.unique(data[time].to_numpy())
+    period_index = np.searchsorted(periods, data[time].to_numpy())
+    n_units = units.max() + 1
+
+    wide = np.full((n_units, len(periods)), np.nan)
+    wide[units, period_index] = residuals
+    if np.isnan(wide).any():
+        raise ValueError("Randomization inference over adoption dates requires a balanced panel")
+
+    first_treated = np.full(n_units, np.nan)
+    first_treated[units] = data[adoption].to_numpy(dtype=float, na_value=np.nan)
+    levels, codes = np.unique(first_treated, return_inverse=True)
+
+    contributions = np.zeros((n_units, len(levels), n_columns))
+    for level, date in enumerate(levels):
+        if np.isnan(date):
+            continue
+        columns = relative_columns(periods - date)
+        for j in range(n_columns):
+            contributions[:, level, j] = wide[:, columns == j].sum(axis=1)
+    return contributions, codes.ravel()
+
+
+def instrument_contributions(data: pd.DataFrame, outcome: np.ndarray, instrument: np.ndarray,
+                             unit: str = 'firm_id') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-unit reduced-form contributions under every instrument value.
+
+    For the reduced-form slope of the outcome on a unit-level instrument,
+    C[i, l] = (z_l - mean z) * sum_t y_it; its permutation test is the
+    randomization version of the Anderson-Rubin test of no IV effect.
+
+    Args:
+        data: Balanced panel (sample of the IV regression)
+        outcome: (n_rows,) outcome
+        instrument: (n_rows,) instrument, constant within unit
+        unit: Unit column
+
+    Returns:
+        contributions (n_units, n_levels, 1) and observed level codes
+    """
+    units = group_codes(data, unit)
+    n_units = units.max() + 1
+    unit_instrument = np.empty(n_units)
+    unit_instrument[units] = instrument
+    levels, codes = np.unique(unit_instrument, return_inverse=True)
+
+    totals = np.bincount(units, weights=outcome, minlength=n_units)
+    centered = levels - np.asarray(instrument, dtype=float).mean()
+    return (totals[:, None] * centered[None, :])[:, :, None], codes.ravel()
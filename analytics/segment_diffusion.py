@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Multi-Segment Bass Diffusion Engine
+
+Matrix-valued Bass model over the FirmSize x Industry grid. Each segment
+has its own innovation, imitation and market potential coefficients, and
+imitation is driven by adoption in every segment through a contact matrix:
+
+    a_i[t+1] = min(a_i[t] + (p_i + q_i * sum_j C_ij a_j[t] / m_j)
+                   * (m_i - a_i[t]) * shock[t], m_i)
+
+With C the identity each segment follows the simulator's two-segment Bass
+recursion. All segments and paths advance in one batched update per year,
+driven by the AIAdoptionSimulator market shocks.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple, Optional
+
+try:
+    from .simulation_engine import AIAdoptionSimulator, ScenarioType
+except ImportError:
+    from simulation_engine import AIAdoptionSimulator, ScenarioType
+
+try:
+    from business.mechanism_optimizer import FirmSize, Industry
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'business'))
+    from mechanism_optimizer import FirmSize, Industry
+
+
+Segment = Tuple[FirmSize, Industry]
+
+# Every size x industry combination, size-major
+ALL_SEGMENTS: List[Segment] = [(size, industry) for size in FirmSize for industry in Industry]
+
+
+class SegmentedBassModel:
+    """
+    Vectorized Bass diffusion over firm segments with cross-segment imitation.
+
+    Coefficients are arrays over segments (scalars broadcast). Adoption
+    levels are fractions of all firms in a segment, as in the simulator.
+    """
+
+    def __init__(self, innovation, imitation, potential,
+                 initial_adoption,
+                 contact: Optional[np.ndarray] = None,
+                 weights: Optional[np.ndarray] = None,
+                 segments: Optional[List[Segment]] = None):
+        """
+        Args:
+            innovation: Innovation coefficient p per segment
+            imitation: Imitation coefficient q per segment
+            potential: Market potential m per segment
+            initial_adoption: Year-0 adoption level per segment
+            contact: (n_segments x n_segments) matrix; row i weights the
+                adoption of each segment in segment i's imitation term
+                (defaults to the identity)
+            weights: Segment shares of all firms for the overall adoption
+                rate (defaults to equal shares; see segment_weights)
+            segments: Segment labels (defaults to ALL_SEGMENTS)
+        """
+        self.segments = list(segments) if segments is not None else list(ALL_SEGMENTS)
+        n = len(self.segments)
+
+        self.innovation = np.broadcast_to(np.asarray(innovation, dtype=float), (n,)).copy()
+        self.imitation = np.broadcast_to(np.asarray(imitation, dtype=float), (n,)).copy()
+        self.potential = np.broadcast_to(np.asarray(potential, dtype=float), (n,)).copy()
+        self.initial_adoption = np.broadcast_to(np.asarray(initial_adoption, dtype=float), (n,)).copy()
+
+        self.contact = np.eye(n) if contact is None else np.asarray(contact, dtype=float)
+        if self.contact.shape != (n, n):
+            raise ValueError(f"contact must be {n}x{n} to match segments")
+
+        if weights is None:
+            weights = np.full(n, 1.0 / n)
+        self.weights = np.asarray(weights, dtype=float)
+        if self.weights.shape != (n,):
+            raise ValueError(f"weights must have one entry per segment ({n})")
+        self.weights = self.weights / self.weights.sum()
+
+    @classmethod
+    def from_simulator(cls, simulator: AIAdoptionSimulator,
+                       scenario_type: ScenarioType = ScenarioType.BASELINE,
+                       policy_effects: Dict[str, float] = None,
+                       contact: Optional[np.ndarray] = None,
+                       weights: Optional[np.ndarray] = None,
+                       segments: Optional[List[Segment]] = None) -> 'SegmentedBassModel':
+        """
+        Build a model from a simulator's Bass and scenario parameters.
+
+        Micro, small and medium firms take the SME coefficients, starting
+        level and potential; large firms take the large-enterprise ones.
+
+        Args:
+            simulator: Source of diffusion_params, adoption_rates and
+                scenario multipliers
+            scenario_type: Scenario whose multipliers are applied
+            policy_effects: Policy intervention effects
+            contact: Contact matrix (defaults to the identity)
+            weights: Segment shares (defaults to equal shares)
+            segments: Segment labels (defaults to ALL_SEGMENTS)
+
+        Returns:
+            SegmentedBassModel
+        """
+        segments = list(segments) if segments is not None else list(ALL_SEGMENTS)
+        coefficients = simulator._diffusion_coefficients(
+            simulator._get_scenario_multipliers(scenario_type, policy_effects)
+        )
+        group = ['large' if size == FirmSize.LARGE else 'sme' for size, _ in segments]
+
+        return cls(
+            innovation=[coefficients[f'{g}_p'] for g in group],
+            imitation=[coefficients[f'{g}_q'] for g in group],
+            potential=[coefficients[f'{g}_m'] for g in group],
+            initial_adoption=[simulator.params.adoption_rates[g] for g in group],
+            contact=contact,
+            weights=weights,
+            segments=segments
+        )
+
+    @staticmethod
+    def contact_matrix(segments: Optional[List[Segment]] = None,
+                       within: float = 1.0, same_industry: float = 0.0,
+                       same_size: float = 0.0, other: float = 0.0) -> np.ndarray:
+        """
+        Structured contact matrix from shared firm size and industry.
+
+        Args:
+            segments: Segment labels (defaults to ALL_SEGMENTS)
+            within: Weight of a segment's own adoption
+            same_industry: Weight of other sizes in the same industry
+            same_size: Weight of other industries of the same size
+            other: Weight of segments sharing neither
+
+        Returns:
+            (n_segments x n_segments) contact matrix
+        """
+        segments = list(segments) if segments is not None else list(ALL_SEGMENTS)
+        sizes = np.array([size.value for size, _ in segments])
+        industries = np.array([industry.value for _, industry in segments])
+        shared_size = sizes[:, None] == sizes[None, :]
+        shared_industry = industries[:, None] == industries[None, :]
+
+        contact = np.full((len(segments), len(segments)), other)
+        contact[shared_size & ~shared_industry] = same_size
+        contact[shared_industry & ~shared_size] = same_industry
+        np.fill_diagonal(contact, within)
+        return contact
+
+    @staticmethod
+    def segment_weights(firms: pd.DataFrame, size_column: str = 'size_category',
+                        industry_column: str = 'industry',
+                        weight_column: Optional[str] = None,
+                        segments: Optional[List[Segment]] = None) -> np.ndarray:
+        """
+        Segment shares of a firm-level dataset.
+
+        Size and industry labels are matched to the enum values
+        case-insensitively, so 'Micro' / 'Manufacturing' map to
+        FirmSize.MICRO / Industry.MANUFACTURING.
+
+        Args:
+            firms: One row per firm
+            size_column: Column with the firm size category
+            industry_column: Column with the industry
+            weight_column: Optional column weighting each firm (e.g.
+                employees); firms count equally if None
+            segments: Segment labels (defaults to ALL_SEGMENTS)
+
+        Returns:
+            Shares over segments summing to one
+        """
+        segments = list(segments) if segments is not None else list(ALL_SEGMENTS)
+        index = pd.MultiIndex.from_tuples([(size.value, industry.value) for size, industry in segments])
+        weight = firms[weight_column] if weight_column is not None else pd.Series(1.0, index=firms.index)
+
+        totals = weight.groupby([firms[size_column].str.lower(),
+                                 firms[industry_column].str.lower()]).sum()
+        shares = totals.reindex(index, fill_value=0.0).to_numpy(dtype=float)
+        if shares.sum() == 0:
+            raise ValueError("No firms fall into the given segments")
+        return shares / shares.sum()
+
+    def simulate(self, n_years: int, n_paths: int,
+                 shocks: Optional[np.ndarray] = None,
+                 simulator: Optional[AIAdoptionSimulator] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 keep_segments: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Simulate adoption in every segment and path.
+
+        Args:
+            n_years: Number of years to simulate
+            n_paths: Number of simulation paths
+            shocks: (n_paths, n_years) market shock multipliers; drawn from
+                simulator (a default AIAdoptionSimulator if None) otherwise
+            simulator: Source of market shocks when shocks is None
+            rng: Random generator for the shocks (defaults to the global
+                NumPy random state)
+            keep_segments: Return every segment's path; if False only the
+                final year is kept per segment, bounding memory
+
+        Returns:
+            Dictionary with 'overall_adoption' (n_paths, n_years + 1),
+            'segment_adoption' of shape (n_years + 1, n_paths, n_segments)
+            (or (n_paths, n_segments) final levels if not keep_segments),
+            'segments' and 'years'
+        """
+        n = len(self.segments)
+        if shocks is None:
+            simulator = simulator or AIAdoptionSimulator()
+            shocks = simulator.generate_market_shocks(n_years, n_paths, rng=rng)
+        elif shocks.shape != (n_paths, n_years):
+            raise ValueError(f"shocks must have shape {(n_paths, n_years)}, got {shocks.shape}")
+
+        p, q, m = self.innovation, self.imitation, self.potential
+        # Imitation pressure is (a / m) @ C.T, so fold 1/m into the contact matrix
+        scaled_contact = (self.contact / m[None, :]).T
+
+        history = np.empty((n_years + 1 if keep_segments else 1, n_paths, n))
+        overall = np.empty((n_paths, n_years + 1))
+        current = history[0]
+        current[...] = self.initial_adoption
+        overall[:, 0] = current @ self.weights
+
+        rate = np.empty((n_paths, n))
+        remaining = np.empty((n_paths, n))
+        for year in range(1, n_years + 1):
+            # Adoption rate: p + q * contact-weighted adoption share
+            np.matmul(current, scaled_contact, out=rate)
+            rate *= q
+            rate += p
+
+            # Growth scaled by remaining potential (none once saturated) and the shock
+            np.subtract(m, current, out=remaining)
+            np.maximum(remaining, 0.0, out=remaining)
+            rate *= remaining
+            rate *= shocks[:, year - 1, None]
+
+            following = history[year] if keep_segments else current
+            np.add(current, rate, out=following)
+            np.minimum(following, m, out=following)
+            current = following
+            np.matmul(current, self.weights, out=overall[:, year])
+
+        return {
+            'overall_adoption': overall,
+            'segment_adoption': history if keep_segments else current,
+            'segments': [f'{size.value}/{industry.value}' for size, industry in self.segments],
+            'years': np.arange(n_years + 1)
+        }
+
+    def summarize(self, results: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Mean final-year adoption per segment.
+
+        Args:
+            results: Output of simulate
+
+        Returns:
+            DataFrame indexed by (size, industry) with initial and final mean
+            adoption, potential and weight
+        """
+        final = results['segment_adoption']
+        final = final[-1] if final.ndim == 3 else final
+        return pd.DataFrame({
+            'initial_adoption': self.initial_adoption,
+            'final_adoption': final.mean(axis=0),
+            'potential': self.potential,
+            'weight': self.weights
+        }, index=pd.MultiIndex.from_tuples(
+            [(size.value, industry.value) for size, industry in self.segments],
+            names=['size', 'industry']
+        ))
+
+
+if __name__ == '__main__':
+    import time
+
+    print("Multi-Segment Bass Diffusion Demo")
+    print("=" * 50)
+
+    segments = ALL_SEGMENTS
+    model = SegmentedBassModel.from_simulator(
+        AIAdoptionSimulator(),
+        contact=SegmentedBassModel.contact_matrix(segments, within=0.6, same_industry=0.25,
+                                                  same_size=0.1, other=0.01)
+    )
+
+    start = time.time()
+    results = model.simulate(n_years=20, n_paths=100_000, rng=np.random.default_rng(42))
+    elapsed = time.time() - start
+
+    print(f"{len(segments)} segments x 100,000 paths x 20 years in {elapsed:.2f}s")
+    print(f"Mean overall adoption in year 20: {results['overall_adoption'][:, -1].mean():.3f}")
+    print(model.summarize(results).to_string(float_format='%.3f'))
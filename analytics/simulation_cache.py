@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Cache for Simulation Results
+
+Persistent on-disk cache placed in front of
+AIAdoptionSimulator.simulate_adoption_scenario and
+AIAdoptionSimulator.run_comprehensive_analysis. Entries are keyed by a
+stable hash of everything that determines a seeded run, stored as
+memory-mappable .npy arrays, and evicted least-recently-used once the
+cache exceeds its size limit.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+class SimulationCache:
+    """
+    Persistent cache of seeded simulation results.
+
+    Each entry is a directory named by its key holding one .npy file per
+    array and a manifest.json describing the nested result layout. Arrays
+    are returned memory-mapped read-only, so a hit costs a few file opens
+    regardless of path count.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, directory: str = '.simulation_cache', max_bytes: int = 2 * 1024 ** 3):
+        """
+        Args:
+            directory: Cache root directory (created if missing)
+            max_bytes: Total size above which least-recently-used entries
+                are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._code_versions = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def code_version(self, simulator) -> str:
+        """Hash of the source file defining the simulator's class."""
+        path = inspect.getsourcefile(type(simulator))
+        if path not in self._code_versions:
+            with open(path, 'rb') as f:
+                self._code_versions[path] = hashlib.sha256(f.read()).hexdigest()
+        return self._code_versions[path]
+
+    def key(self, simulator, **spec) -> str:
+        """
+        Stable content hash identifying a simulation request.
+
+        Args:
+            simulator: AIAdoptionSimulator whose configuration is hashed
+            **spec: Request-specific inputs (scenario, policy effects, seed, ...)
+
+        Returns:
+            Hex digest used as the entry name
+        """
+        payload = {
+            'parameters': asdict(simulator.params),
+            'market_drivers': simulator.market_drivers,
+            'diffusion_params': simulator.diffusion_params,
+            'driver_correlation': simulator.driver_correlation,
+            'code_version': self.code_version(simulator),
+            'spec': spec
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=_encode_value)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Load an entry, marking it as recently used.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            Nested results with memory-mapped arrays, or None on a miss
+        """
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, self.MANIFEST)) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(entry)
+        return self._restore(manifest, entry)
+
+    def store(self, key: str, results: Dict):
+        """
+        Write an entry atomically and enforce the size limit.
+
+        Args:
+            key: Entry key
+            results: Nested dictionary of arrays and JSON-serializable values
+        """
+        staging = tempfile.mkdtemp(dir=self.directory, prefix='.staging-')
+        try:
+            manifest = self._save(results, staging, [])
+            with open(os.path.join(staging, self.MANIFEST), 'w') as f:
+                json.dump(manifest, f)
+        except BaseException:
+            # Staging directories are never evicted, so never leave one behind
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        try:
+            os.rename(staging, os.path.join(self.directory, key))
+        except OSError:
+            # Another writer stored the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict()
+
+    def get_or_run(self, simulator, run: Callable[[], Dict], **spec) -> Dict:
+        """
+        Return the cached results for a request, running it on a miss.
+
+        Args:
+            simulator: AIAdoptionSimulator whose configuration is hashed
+            run: Callable producing the results
+            **spec: Request-specific inputs included in the key
+
+        Returns:
+            Cached or freshly computed results
+        """
+        key = self.key(simulator, **spec)
+        cached = self.load(key)
+        if cached is not None:
+            return cached
+        results = run()
+        self.store(key, results)
+        return results
+
+    def clear(self):
+        """Remove every cache entry."""
+        for name in os.listdir(self.directory):
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _save(self, node, directory: str, path: list):
+        """Write arrays under directory and return the manifest for node."""
+        if isinstance(node, dict):
+            return {'dict': [[key, self._save(value, directory, path + [str(i)])]
+                             for i, (key, value) in enumerate(node.items())]}
+        if isinstance(node, np.ndarray):
+            filename = '_'.join(path) + '.npy'
+            np.save(os.path.join(directory, filename), node)
+            return {'array': filename}
+        if isinstance(node, (list, tuple)):
+            return {'list': [self._save(value, directory, path + [str(i)])
+                             for i, value in enumerate(node)]}
+        if node is None or isinstance(node, (bool, int, float, str)):
+            return {'value': node}
+        return {'value': _encode_value(node)}
+
+    def _restore(self, manifest: Dict, directory: str):
+        """Rebuild a nested result from its manifest."""
+        if 'dict' in manifest:
+            return {key: self._restore(value, directory) for key, value in manifest['dict']}
+        if 'array' in manifest:
+            return np.load(os.path.join(directory, manifest['array']), mmap_mode='r')
+        if 'list' in manifest:
+            return [self._restore(value, directory) for value in manifest['list']]
+        return manifest['value']
+
+    def _evict(self):
+        """Delete least-recently-used entries until under max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isdir(entry):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, entry))
+            total += size
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def _encode_value(value):
+    """JSON encoding for enums, NumPy scalars and arrays in keys and manifests."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a simulation cache key or manifest")
@@ -8,12 +8,19 @@ market evolution, and policy impact assessment.
 
 import numpy as np
 import pandas as pd
-from scipy import stats
+from scipy import stats, signal
+from scipy.stats import qmc
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict, List, Tuple, Optional, Callable
+from typing import Dict, List, Tuple, Optional, Sequence, Callable, Iterator, AsyncIterator
+import asyncio
 import json
-from dataclasses import dataclass
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from dataclasses import asdict, dataclass
 from enum import Enum
 import warnings
 warnings.filterwarnings('ignore')
@@ -34,6 +41,8 @@ class SimulationParameters:
     base_growth_rate: float = 0.233  # 23.3% CAGR
     adoption_rates: Dict[str, float] = None
     volatility: float = 0.15
+    sampling: str = 'pseudo'  # 'pseudo', 'antithetic' or 'sobol'
+    common_random_numbers: bool = False  # share shocks across scenarios
     
     def __post_init__(self):
         if self.adoption_rates is None:
@@ -42,17 +51,246 @@ class SimulationParameters:
                 'large': 0.42,
                 'overall': 0.29
             }
+        if self.sampling not in ('pseudo', 'antithetic', 'sobol'):
+            raise ValueError(f"Unknown sampling mode: {self.sampling}")
+
+@dataclass
+class SimulationCheckpoint:
+    """
+    Resumable state of a seeded scenario run.
+    
+    Holds the paths simulated so far plus the per-path state needed to
+    continue them: the last market size and SME/large adoption levels
+    (the final path columns) and the AR(1) driver shock state.
+    """
+    scenario_type: ScenarioType
+    policy_effects: Optional[Dict[str, float]]
+    seed: int
+    config: str  # JSON of the parameters a continuation must share
+    paths: Dict[str, np.ndarray]  # metric -> (n_sims, years_completed + 1)
+    shock_state: Optional[np.ndarray] = None  # (n_drivers, n_sims); None before year 1
+    
+    @property
+    def years_completed(self) -> int:
+        return self.paths['market_size'].shape[1] - 1
+    
+    def save(self, filename: str):
+        """Write the checkpoint to an .npz file, replacing it atomically."""
+        header = {
+            'scenario_type': self.scenario_type.value,
+            'policy_effects': self.policy_effects,
+            'seed': self.seed,
+            'config': self.config
+        }
+        arrays = dict(self.paths)
+        if self.shock_state is not None:
+            arrays['shock_state'] = self.shock_state
+        staging = filename + '.tmp'
+        with open(staging, 'wb') as f:
+            np.savez(f, header=np.array(json.dumps(header)), **arrays)
+        os.replace(staging, filename)
+    
+    @classmethod
+    def load(cls, filename: str) -> 'SimulationCheckpoint':
+        """Read a checkpoint written by save."""
+        with np.load(filename) as data:
+            header = json.loads(str(data['header']))
+            return cls(
+                scenario_type=ScenarioType(header['scenario_type']),
+                policy_effects=header['policy_effects'],
+                seed=header['seed'],
+                config=header['config'],
+                paths={metric: data[metric] for metric in AIAdoptionSimulator.PATH_METRICS},
+                shock_state=data['shock_state'] if 'shock_state' in data.files else None
+            )
+
+class StreamingStatistics:
+    """
+    Mergeable running summary of simulation paths, one column per year.
+    
+    Keeps the count, mean and sum of squared deviations (Chan's parallel
+    update) plus a fixed-bin histogram per column for quantiles. Bin widths
+    are powers of two and bin edges are multiples of the width, so any two
+    sketches share a grid after widening and merge without loss of counts.
+    Quantiles are accurate to within one bin width (about range / n_bins).
+    """
+    
+    def __init__(self, n_columns: int, n_bins: int = 4096):
+        self.n_columns = n_columns
+        self.n_bins = n_bins
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.minimum = np.full(n_columns, np.inf)
+        self.maximum = np.full(n_columns, -np.inf)
+        self.lower = np.zeros(n_columns)
+        self.width = np.zeros(n_columns)
+        self.counts = np.zeros((n_columns, n_bins), dtype=np.int64)
+    
+    def update(self, data: np.ndarray):
+        """
+        Fold a chunk of paths into the sketch.
+        
+        Args:
+            data: Array of shape (n_paths, n_columns)
+        """
+        chunk = StreamingStatistics(self.n_columns, self.n_bins)
+        n = data.shape[0]
+        if n == 0:
+            return
+        chunk.count = n
+        chunk.mean = data.mean(axis=0)
+        chunk.m2 = ((data - chunk.mean) ** 2).sum(axis=0)
+        chunk.minimum = data.min(axis=0)
+        chunk.maximum = data.max(axis=0)
+        
+        # Smallest power-of-two width whose aligned grid spans the chunk
+        span = chunk.maximum - chunk.minimum
+        scale = np.maximum(np.abs(chunk.maximum), np.abs(chunk.minimum))
+        floor_width = np.where(scale > 0, scale * 2.0 ** -40, 2.0 ** -40)
+        width = 2.0 ** np.ceil(np.log2(np.maximum(span / (self.n_bins - 1), floor_width)))
+        chunk.lower = np.floor(chunk.minimum / width) * width
+        chunk.width = width
+        
+        idx = np.floor((data - chunk.lower) / width).astype(np.int64)
+        np.clip(idx, 0, self.n_bins - 1, out=idx)
+        idx += np.arange(self.n_columns) * self.n_bins
+        chunk.counts = np.bincount(
+            idx.ravel(), minlength=self.n_columns * self.n_bins
+        ).reshape(self.n_columns, self.n_bins)
+        
+        self.merge(chunk)
+    
+    def merge(self, other: 'StreamingStatistics'):
+        """
+        Merge another sketch with the same shape into this one.
+        
+        Args:
+            other: Sketch built from a disjoint set of paths
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean = other.mean.copy()
+            self.m2 = other.m2.copy()
+            self.minimum = other.minimum.copy()
+            self.maximum = other.maximum.copy()
+            self.lower = other.lower.copy()
+            self.width = other.width.copy()
+            self.counts = other.counts.copy()
+            return
+        
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.count = total
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        
+        # Widen both histograms onto a common grid covering the union
+        lower = np.minimum(self.lower, other.lower)
+        upper = np.maximum(self.lower + self.n_bins * self.width,
+                           other.lower + other.n_bins * other.width)
+        width = np.maximum(self.width, other.width)
+        while True:
+            aligned = np.floor(lower / width) * width
+            short = aligned + self.n_bins * width < upper
+            if not short.any():
+                break
+            width = np.where(short, width * 2, width)
+        
+        counts = self._regrid(self.counts, self.lower, self.width, aligned, width)
+        counts += self._regrid(other.counts, other.lower, other.width, aligned, width)
+        self.lower = aligned
+        self.width = width
+        self.counts = counts
+    
+    def _regrid(self, counts: np.ndarray, lower: np.ndarray, width: np.ndarray,
+                new_lower: np.ndarray, new_width: np.ndarray) -> np.ndarray:
+        """Re-bin histogram counts onto a coarser aligned grid."""
+        ratio = np.rint(new_width / width).astype(np.int64)
+        offset = np.rint((lower - new_lower) / width).astype(np.int64)
+        bins = np.arange(self.n_bins)
+        target = (offset[:, None] + bins[None, :]) // ratio[:, None]
+        target += np.arange(self.n_columns)[:, None] * self.n_bins
+        return np.bincount(
+            target.ravel(), weights=counts.ravel(), minlength=self.n_columns * self.n_bins
+        ).astype(np.int64).reshape(self.n_columns, self.n_bins)
+    
+    def percentile(self, q: float) -> np.ndarray:
+        """
+        Estimate the q-th percentile of every column.
+        
+        Args:
+            q: Percentile in [0, 100]
+            
+        Returns:
+            Array of per-column percentile estimates
+        """
+        rank = q / 100 * (self.count - 1)
+        cumulative = np.cumsum(self.counts, axis=1)
+        result = np.empty(self.n_columns)
+        for col in range(self.n_columns):
+            k = np.searchsorted(cumulative[col], rank, side='right')
+            before = cumulative[col, k - 1] if k > 0 else 0
+            fraction = (rank - before + 0.5) / self.counts[col, k]
+            result[col] = self.lower[col] + (k + fraction) * self.width[col]
+        return np.clip(result, self.minimum, self.maximum)
+    
+    def summary(self) -> Dict[str, np.ndarray]:
+        """
+        Summary statistics in the layout used by run_comprehensive_analysis.
+        
+        Returns:
+            Dictionary with mean, median, p5, p25, p75, p95 and std arrays
+        """
+        return {
+            'mean': self.mean.copy(),
+            'median': self.percentile(50),
+            'p5': self.percentile(5),
+            'p25': self.percentile(25),
+            'p75': self.percentile(75),
+            'p95': self.percentile(95),
+            'std': np.where(self.minimum == self.maximum, 0.0, np.sqrt(self.m2 / self.count))
+        }
 
 class AIAdoptionSimulator:
     """
     Monte Carlo simulation engine for AI adoption scenarios.
     """
     
-    def __init__(self, parameters: SimulationParameters = None):
+    # Paths per AR(1) filter pass when generating market shocks
+    SHOCK_FILTER_CHUNK = 65536
+    
+    # Path arrays returned by simulate_adoption_scenario
+    PATH_METRICS = ('market_size', 'sme_adoption', 'large_adoption', 'overall_adoption')
+    
+    # Summary statistics computed per metric and year
+    STAT_NAMES = ('mean', 'median', 'p5', 'p25', 'p75', 'p95', 'std')
+    
+    # Segment shares in overall adoption (70% of companies are SMEs)
+    SME_WEIGHT = 0.7
+    LARGE_WEIGHT = 0.3
+    
+    # Scenarios covered by run_comprehensive_analysis
+    ANALYSIS_SCENARIOS = (
+        (ScenarioType.BASELINE, None),
+        (ScenarioType.OPTIMISTIC, None),
+        (ScenarioType.PESSIMISTIC, None),
+        (ScenarioType.POLICY_INTERVENTION, {'sme_support': 0.15, 'overall_boost': 0.05}),
+        (ScenarioType.DISRUPTION, None)
+    )
+    
+    def __init__(self, parameters: SimulationParameters = None, cache=None):
         self.params = parameters or SimulationParameters()
         self.results = {}
         self.scenario_data = {}
         
+        # Optional SimulationCache for seeded runs
+        self.cache = cache
+        
         # Market dynamics parameters
         self.market_drivers = {
             'demographic_pressure': {'weight': 0.25, 'volatility': 0.10},
@@ -62,49 +300,179 @@ class AIAdoptionSimulator:
             'competitive_pressure': {'weight': 0.10, 'volatility': 0.18}
         }
         
+        # Cross-driver shock correlation (None = independent drivers)
+        self.driver_correlation = None
+        
         # Adoption diffusion parameters
         self.diffusion_params = {
             'innovation_coefficient': 0.03,  # p parameter in Bass model
             'imitation_coefficient': 0.38,   # q parameter in Bass model
-            'market_potential': 1.0          # Maximum adoption rate
+            'market_potential': 1.0          # Scale on the scenario adoption ceilings
         }
     
-    def generate_market_shocks(self, n_years: int, n_simulations: int) -> np.ndarray:
+    def generate_market_shocks(self, n_years: int, n_simulations: int,
+                               correlation: Optional[np.ndarray] = None,
+                               out: Optional[np.ndarray] = None,
+                               rng: Optional[np.random.Generator] = None) -> np.ndarray:
         """
         Generate random market shocks for Monte Carlo simulation.
         
+        All drivers are drawn in one batched call as a (drivers x sims x years)
+        block, optionally correlated across drivers, and the AR(1)
+        autocorrelation is applied with one batched filter along the year axis.
+        With no correlation the draws and output are identical to generating
+        each driver separately from the global NumPy random state.
+        
         Args:
             n_years: Number of years to simulate
             n_simulations: Number of simulation runs
+            correlation: Cross-driver correlation matrix ordered like
+                market_drivers (defaults to self.driver_correlation)
+            out: Optional preallocated (n_simulations, n_years) float array
+                that receives the result
+            rng: Random generator to draw from (defaults to the global
+                NumPy random state)
             
         Returns:
             Array of market shock multipliers
         """
-        # Generate correlated shocks for different market drivers
-        shocks = {}
+        drivers = list(self.market_drivers.values())
+        volatilities = np.array([driver['volatility'] for driver in drivers])
         
-        for driver, params in self.market_drivers.items():
-            # Generate auto-correlated shocks (economic conditions persist)
-            base_shocks = np.random.normal(0, params['volatility'], (n_simulations, n_years))
-            
-            # Apply auto-correlation
-            correlated_shocks = np.zeros_like(base_shocks)
-            correlated_shocks[:, 0] = base_shocks[:, 0]
-            
-            for t in range(1, n_years):
-                correlated_shocks[:, t] = (0.7 * correlated_shocks[:, t-1] + 
-                                         0.3 * base_shocks[:, t])
+        if correlation is None:
+            correlation = self.driver_correlation
+        
+        if out is None:
+            out = np.empty((n_simulations, n_years))
+        elif out.shape != (n_simulations, n_years):
+            raise ValueError(f"out must have shape {(n_simulations, n_years)}, got {out.shape}")
+        
+        if n_years == 0:
+            return out
+        
+        # Draw standard normal innovations for every driver at once
+        base_shocks = self._driver_innovations(n_simulations, n_years, correlation, rng)
+        base_shocks *= volatilities[:, None, None]
+        
+        # Apply auto-correlation (economic conditions persist)
+        self._autocorrelate(base_shocks)
+        
+        return self._combine_shocks(base_shocks, out)
+    
+    def _combine_shocks(self, base_shocks: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Weight autocorrelated driver shocks into multipliers, in place.
+        
+        Args:
+            base_shocks: Autocorrelated driver shocks (n_drivers, n_sims,
+                n_years); overwritten
+            out: (n_sims, n_years) array receiving the multipliers
             
-            shocks[driver] = correlated_shocks
+        Returns:
+            out
+        """
+        weights = np.array([driver['weight'] for driver in self.market_drivers.values()])
         
         # Combine shocks with weights
-        combined_shocks = np.zeros((n_simulations, n_years))
-        for driver, shock_array in shocks.items():
-            weight = self.market_drivers[driver]['weight']
-            combined_shocks += weight * shock_array
+        out[...] = 0.0
+        for weight, shock_array in zip(weights, base_shocks):
+            shock_array *= weight
+            out += shock_array
         
         # Convert to multiplicative shocks (1 + shock_rate)
-        return np.exp(combined_shocks)
+        return np.exp(out, out=out)
+    
+    def _driver_innovations(self, n_simulations: int, n_years: int,
+                            correlation: Optional[np.ndarray] = None,
+                            rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Unit-variance driver innovations, correlated across drivers.
+        
+        Args:
+            n_simulations: Number of simulation paths
+            n_years: Number of years
+            correlation: Cross-driver correlation matrix ordered like
+                market_drivers (None for independent drivers)
+            rng: Random generator (defaults to the global NumPy random state)
+            
+        Returns:
+            Array of shape (n_drivers, n_simulations, n_years)
+        """
+        n_drivers = len(self.market_drivers)
+        base_shocks = self._standard_normal_block(n_drivers, n_simulations, n_years, rng)
+        
+        if correlation is not None:
+            correlation = np.asarray(correlation, dtype=float)
+            if correlation.shape != (n_drivers, n_drivers):
+                raise ValueError(
+                    f"correlation must be {n_drivers}x{n_drivers} to match market_drivers"
+                )
+            # Cholesky factor mixes the independent draws across drivers
+            base_shocks = np.tensordot(np.linalg.cholesky(correlation), base_shocks, axes=1)
+        
+        return base_shocks
+    
+    def _autocorrelate(self, base_shocks: np.ndarray, state: Optional[np.ndarray] = None):
+        """
+        Apply the AR(1) driver persistence along the last axis, in place.
+        
+        s[t] = 0.7 * s[t-1] + 0.3 * e[t], with s[0] = e[0]. The filter runs
+        over blocks of paths and writes back to bound memory.
+        
+        Args:
+            base_shocks: Innovations of shape (n_drivers, n_sims, n_years)
+            state: Filtered shock s[t-1] preceding the block, shape
+                (n_drivers, n_sims), when continuing an earlier block;
+                None starts a fresh series
+        """
+        first = 0 if state is not None else 1
+        if base_shocks.shape[-1] <= first:
+            return
+        for start in range(0, base_shocks.shape[1], self.SHOCK_FILTER_CHUNK):
+            block = base_shocks[:, start:start + self.SHOCK_FILTER_CHUNK]
+            previous = (state[:, start:start + self.SHOCK_FILTER_CHUNK, None]
+                        if state is not None else block[..., :1])
+            block[..., first:] = signal.lfilter(
+                [0.3], [1.0, -0.7], block[..., first:], axis=-1,
+                zi=0.7 * previous
+            )[0]
+    
+    def _standard_normal_block(self, n_drivers: int, n_simulations: int, n_years: int,
+                               rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Draw a (drivers x sims x years) block of standard normal innovations.
+        
+        The sampling mode comes from params.sampling: 'pseudo' draws plain
+        pseudo-random normals, 'antithetic' pairs each path with its negated
+        copy, and 'sobol' maps a scrambled Sobol sequence over the
+        drivers x years dimensions through the inverse normal CDF.
+        
+        Args:
+            n_drivers: Number of market drivers
+            n_simulations: Number of simulation paths
+            n_years: Number of years
+            rng: Random generator (defaults to the global NumPy random state)
+            
+        Returns:
+            Array of shape (n_drivers, n_simulations, n_years)
+        """
+        random = np.random if rng is None else rng
+        sampling = self.params.sampling
+        
+        if sampling == 'antithetic':
+            half = random.standard_normal((n_drivers, (n_simulations + 1) // 2, n_years))
+            return np.concatenate([half, -half], axis=1)[:, :n_simulations]
+        
+        if sampling == 'sobol':
+            sobol_seed = rng if rng is not None else np.random.randint(0, 2**31 - 1)
+            sampler = qmc.Sobol(d=n_drivers * n_years, scramble=True, seed=sobol_seed)
+            points = sampler.random(n_simulations)
+            np.clip(points, 1e-12, 1 - 1e-12, out=points)
+            # Year-major dimension order puts early years on the best-spread axes
+            block = stats.norm.ppf(points).reshape(n_simulations, n_years, n_drivers)
+            return np.ascontiguousarray(block.transpose(2, 0, 1))
+        
+        return random.standard_normal((n_drivers, n_simulations, n_years))
     
     def bass_diffusion_model(self, t: float, p: float, q: float, m: float, 
                            current_adopters: float) -> float:
@@ -131,19 +499,44 @@ class AIAdoptionSimulator:
         return innovation_effect + imitation_effect
     
     def simulate_adoption_scenario(self, scenario_type: ScenarioType, 
-                                 policy_effects: Dict[str, float] = None) -> Dict[str, np.ndarray]:
+                                 policy_effects: Dict[str, float] = None,
+                                 num_simulations: Optional[int] = None,
+                                 rng: Optional[np.random.Generator] = None,
+                                 seed: Optional[int] = None) -> Dict[str, np.ndarray]:
         """
         Simulate AI adoption under specific scenario conditions.
         
+        Seeded runs are served from self.cache when one is configured.
+        
         Args:
             scenario_type: Type of scenario to simulate
             policy_effects: Dictionary of policy intervention effects
+            num_simulations: Number of paths (defaults to params.num_simulations)
+            rng: Random generator for market shocks (defaults to the global
+                NumPy random state)
+            seed: Seed for a fresh generator; makes the run cacheable
             
         Returns:
             Dictionary containing simulation results
         """
+        n_sims = self.params.num_simulations if num_simulations is None else num_simulations
+        
+        if seed is not None:
+            rng = np.random.default_rng(seed)
+            if self.cache is not None:
+                return self.cache.get_or_run(
+                    self, lambda: self._simulate_scenario(scenario_type, policy_effects, n_sims, rng),
+                    kind='scenario', scenario_type=scenario_type, policy_effects=policy_effects,
+                    num_simulations=n_sims, seed=seed
+                )
+        
+        return self._simulate_scenario(scenario_type, policy_effects, n_sims, rng)
+    
+    def _simulate_scenario(self, scenario_type: ScenarioType,
+                           policy_effects: Optional[Dict[str, float]], n_sims: int,
+                           rng: Optional[np.random.Generator]) -> Dict[str, np.ndarray]:
+        """Run one scenario; see simulate_adoption_scenario."""
         n_years = self.params.time_horizon
-        n_sims = self.params.num_simulations
         
         # Initialize arrays
         market_size = np.zeros((n_sims, n_years + 1))
@@ -158,54 +551,14 @@ class AIAdoptionSimulator:
         overall_adoption[:, 0] = self.params.adoption_rates['overall']
         
         # Generate market shocks
-        shocks = self.generate_market_shocks(n_years, n_sims)
+        shocks = self.generate_market_shocks(n_years, n_sims, rng=rng)
         
         # Scenario-specific adjustments
         scenario_multipliers = self._get_scenario_multipliers(scenario_type, policy_effects)
         
-        # Run simulation
-        for year in range(1, n_years + 1):
-            for sim in range(n_sims):
-                # Market size evolution
-                base_growth = 1 + self.params.base_growth_rate
-                shock_effect = shocks[sim, year - 1]
-                scenario_effect = scenario_multipliers['market_growth']
-                
-                market_size[sim, year] = (market_size[sim, year - 1] * 
-                                        base_growth * shock_effect * scenario_effect)
-                
-                # Adoption evolution using Bass diffusion model
-                # SME adoption
-                sme_growth = self.bass_diffusion_model(
-                    year, 
-                    self.diffusion_params['innovation_coefficient'] * scenario_multipliers['sme_innovation'],
-                    self.diffusion_params['imitation_coefficient'] * scenario_multipliers['sme_imitation'],
-                    scenario_multipliers['sme_potential'],
-                    sme_adoption[sim, year - 1]
-                )
-                sme_adoption[sim, year] = min(
-                    sme_adoption[sim, year - 1] + sme_growth * shock_effect,
-                    scenario_multipliers['sme_potential']
-                )
-                
-                # Large enterprise adoption
-                large_growth = self.bass_diffusion_model(
-                    year,
-                    self.diffusion_params['innovation_coefficient'] * scenario_multipliers['large_innovation'],
-                    self.diffusion_params['imitation_coefficient'] * scenario_multipliers['large_imitation'],
-                    scenario_multipliers['large_potential'],
-                    large_adoption[sim, year - 1]
-                )
-                large_adoption[sim, year] = min(
-                    large_adoption[sim, year - 1] + large_growth * shock_effect,
-                    scenario_multipliers['large_potential']
-                )
-                
-                # Overall adoption (weighted average)
-                sme_weight = 0.7  # 70% of companies are SMEs
-                large_weight = 0.3  # 30% are large enterprises
-                overall_adoption[sim, year] = (sme_weight * sme_adoption[sim, year] + 
-                                             large_weight * large_adoption[sim, year])
+        # Run simulation (all paths advance one year per step)
+        self._propagate_paths(shocks, self._diffusion_coefficients(scenario_multipliers), market_size,
+                              sme_adoption, large_adoption, overall_adoption)
         
         return {
             'market_size': market_size,
@@ -215,6 +568,264 @@ class AIAdoptionSimulator:
             'years': np.arange(n_years + 1)
         }
     
+    def simulate_resumable(self, scenario_type: ScenarioType,
+                           policy_effects: Dict[str, float] = None,
+                           seed: int = 0,
+                           num_simulations: Optional[int] = None,
+                           checkpoint_path: Optional[str] = None,
+                           chunk_years: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Seeded scenario run that can be resumed or extended.
+        
+        Year t draws its shocks from child t of SeedSequence(seed), so the
+        paths for a year do not depend on the horizon or on where a run was
+        split. With checkpoint_path, state is saved after every chunk of
+        years, and an existing checkpoint for the same scenario, policy,
+        seed and configuration is picked up: an interrupted run resumes and
+        raising params.time_horizon only simulates the new years. The
+        result is bit-identical to an uninterrupted run to the same horizon.
+        
+        Args:
+            scenario_type: Type of scenario to simulate
+            policy_effects: Dictionary of policy intervention effects
+            seed: Root seed of the per-year streams
+            num_simulations: Number of paths (defaults to params.num_simulations)
+            checkpoint_path: Checkpoint .npz file to resume from and save to
+            chunk_years: Years simulated between checkpoint saves
+            
+        Returns:
+            Dictionary containing simulation results, as
+            simulate_adoption_scenario
+        """
+        checkpoint = None
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            checkpoint = SimulationCheckpoint.load(checkpoint_path)
+            expected = self.start_checkpoint(scenario_type, policy_effects, seed, num_simulations)
+            if (checkpoint.scenario_type, checkpoint.policy_effects, checkpoint.seed,
+                    checkpoint.config) != (expected.scenario_type, expected.policy_effects,
+                                           expected.seed, expected.config):
+                raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different run")
+        if checkpoint is None:
+            checkpoint = self.start_checkpoint(scenario_type, policy_effects, seed, num_simulations)
+        
+        remaining = self.params.time_horizon - checkpoint.years_completed
+        if remaining > 0:
+            checkpoint = self.advance_checkpoint(checkpoint, remaining, chunk_years, checkpoint_path)
+        
+        n_years = self.params.time_horizon
+        results = {metric: checkpoint.paths[metric][:, :n_years + 1]
+                   for metric in self.PATH_METRICS}
+        results['years'] = np.arange(n_years + 1)
+        return results
+    
+    def start_checkpoint(self, scenario_type: ScenarioType,
+                         policy_effects: Optional[Dict[str, float]] = None,
+                         seed: int = 0,
+                         num_simulations: Optional[int] = None) -> SimulationCheckpoint:
+        """
+        Year-0 checkpoint holding the initial conditions of every path.
+        
+        Args:
+            scenario_type: Type of scenario to simulate
+            policy_effects: Dictionary of policy intervention effects
+            seed: Root seed of the per-year streams
+            num_simulations: Number of paths (defaults to params.num_simulations)
+            
+        Returns:
+            SimulationCheckpoint with zero years completed
+        """
+        n_sims = self.params.num_simulations if num_simulations is None else num_simulations
+        initial = {
+            'market_size': self.params.initial_market_size,
+            'sme_adoption': self.params.adoption_rates['sme'],
+            'large_adoption': self.params.adoption_rates['large'],
+            'overall_adoption': self.params.adoption_rates['overall']
+        }
+        # Everything but the horizon must match for a continuation
+        config = asdict(self.params)
+        del config['time_horizon']
+        config['num_simulations'] = n_sims
+        config.update(market_drivers=self.market_drivers, diffusion_params=self.diffusion_params,
+                      driver_correlation=self.driver_correlation)
+        return SimulationCheckpoint(
+            scenario_type=scenario_type,
+            policy_effects=dict(policy_effects) if policy_effects is not None else None,
+            seed=seed,
+            config=json.dumps(config, sort_keys=True, default=lambda value: np.asarray(value).tolist()),
+            paths={metric: np.full((n_sims, 1), value) for metric, value in initial.items()}
+        )
+    
+    def advance_checkpoint(self, checkpoint: SimulationCheckpoint, n_years: int,
+                           chunk_years: int = 1,
+                           checkpoint_path: Optional[str] = None) -> SimulationCheckpoint:
+        """
+        Extend a checkpointed run by n_years.
+        
+        Only the new years are simulated, continuing each path from its last
+        state and each driver's AR(1) shock series from its last value.
+        
+        Args:
+            checkpoint: Run to extend (not modified)
+            n_years: Additional years to simulate
+            chunk_years: Years simulated between checkpoint saves
+            checkpoint_path: File the checkpoint is saved to after each chunk
+            
+        Returns:
+            New SimulationCheckpoint covering the extended horizon
+        """
+        start = checkpoint.years_completed
+        n_sims = checkpoint.paths['market_size'].shape[0]
+        volatilities = np.array([driver['volatility'] for driver in self.market_drivers.values()])
+        coefficients = self._diffusion_coefficients(
+            self._get_scenario_multipliers(checkpoint.scenario_type, checkpoint.policy_effects)
+        )
+        
+        paths = {}
+        for metric, data in checkpoint.paths.items():
+            paths[metric] = np.empty((n_sims, start + n_years + 1))
+            paths[metric][:, :start + 1] = data
+        shock_state = checkpoint.shock_state
+        root_seed = np.random.SeedSequence(checkpoint.seed)
+        
+        for chunk_start in range(start, start + n_years, chunk_years):
+            chunk_stop = min(chunk_start + chunk_years, start + n_years)
+            
+            # One stream per year keeps draws independent of the chunking
+            base_shocks = np.concatenate([
+                self._driver_innovations(
+                    n_sims, 1, self.driver_correlation,
+                    np.random.default_rng(np.random.SeedSequence(root_seed.entropy, spawn_key=(year,)))
+                )
+                for year in range(chunk_start, chunk_stop)
+            ], axis=-1)
+            base_shocks *= volatilities[:, None, None]
+            self._autocorrelate(base_shocks, shock_state)
+            shock_state = base_shocks[..., -1].copy()
+            shocks = self._combine_shocks(base_shocks, np.empty((n_sims, chunk_stop - chunk_start)))
+            
+            window = slice(chunk_start, chunk_stop + 1)
+            self._propagate_paths(shocks, coefficients, paths['market_size'][:, window],
+                                  paths['sme_adoption'][:, window], paths['large_adoption'][:, window],
+                                  paths['overall_adoption'][:, window])
+            
+            checkpoint = SimulationCheckpoint(
+                scenario_type=checkpoint.scenario_type,
+                policy_effects=checkpoint.policy_effects,
+                seed=checkpoint.seed,
+                config=checkpoint.config,
+                paths={metric: data[:, :chunk_stop + 1] for metric, data in paths.items()},
+                shock_state=shock_state
+            )
+            if checkpoint_path is not None:
+                checkpoint.save(checkpoint_path)
+        
+        return checkpoint
+    
+    def bass_diffusion_step(self, p, q, m, current_adopters: np.ndarray) -> np.ndarray:
+        """
+        Vectorized Bass diffusion model over an array of adoption paths.
+        
+        Element-wise equivalent of bass_diffusion_model, so results are
+        bit-identical to the scalar version.
+        
+        Args:
+            p: Innovation coefficient
+            q: Imitation coefficient
+            m: Market potential
+            current_adopters: Array of current adoption rates
+            
+        Returns:
+            Array of new adoption rates for the period
+        """
+        remaining_potential = m - current_adopters
+        innovation_effect = p * remaining_potential
+        imitation_effect = (q * current_adopters * remaining_potential) / m
+        
+        return np.where(current_adopters >= m, 0.0, innovation_effect + imitation_effect)
+    
+    def _diffusion_coefficients(self, scenario_multipliers: Dict[str, float]) -> Dict[str, float]:
+        """
+        Per-step growth and Bass coefficients for a scenario.
+        
+        Args:
+            scenario_multipliers: Output of _get_scenario_multipliers
+            
+        Returns:
+            Dictionary of coefficients consumed by _propagate_paths
+        """
+        return {
+            'base_growth': 1 + self.params.base_growth_rate,
+            'market_growth': scenario_multipliers['market_growth'],
+            'sme_p': self.diffusion_params['innovation_coefficient'] * scenario_multipliers['sme_innovation'],
+            'sme_q': self.diffusion_params['imitation_coefficient'] * scenario_multipliers['sme_imitation'],
+            'sme_m': self.diffusion_params['market_potential'] * scenario_multipliers['sme_potential'],
+            'large_p': self.diffusion_params['innovation_coefficient'] * scenario_multipliers['large_innovation'],
+            'large_q': self.diffusion_params['imitation_coefficient'] * scenario_multipliers['large_imitation'],
+            'large_m': self.diffusion_params['market_potential'] * scenario_multipliers['large_potential']
+        }
+    
+    def _propagate_paths(self, shocks: np.ndarray, coefficients: Dict[str, float],
+                         market_size: Optional[np.ndarray], sme_adoption: Optional[np.ndarray],
+                         large_adoption: Optional[np.ndarray], overall_adoption: Optional[np.ndarray]):
+        """
+        Advance every simulation path through the time horizon in place.
+        
+        Column 0 of each state array holds the initial conditions; column t is
+        filled from column t - 1 and shocks[..., t - 1]. Coefficients may be
+        scalars or per-path arrays of shape (n_sims,). State arrays may carry
+        leading batch axes, e.g. (n_policies, n_sims, n_years + 1) with
+        coefficients of shape (n_policies, 1), in which case the shared
+        (n_sims, n_years) shocks broadcast across the batch. A state array
+        passed as None is not propagated (overall adoption needs both
+        segments).
+        
+        Args:
+            shocks: Market shock multipliers, shape (n_sims, n_years)
+            coefficients: Output of _diffusion_coefficients
+            market_size: Market size paths, shape (n_sims, n_years + 1)
+            sme_adoption: SME adoption paths, same shape
+            large_adoption: Large enterprise adoption paths, same shape
+            overall_adoption: Weighted overall adoption paths, same shape
+        """
+        base_growth = coefficients['base_growth']
+        scenario_effect = coefficients['market_growth']
+        
+        sme_p = coefficients['sme_p']
+        sme_q = coefficients['sme_q']
+        sme_m = coefficients['sme_m']
+        large_p = coefficients['large_p']
+        large_q = coefficients['large_q']
+        large_m = coefficients['large_m']
+        
+        sme_weight = self.SME_WEIGHT
+        large_weight = self.LARGE_WEIGHT
+        
+        for year in range(1, shocks.shape[-1] + 1):
+            shock_effect = shocks[..., year - 1]
+            
+            # Market size evolution
+            if market_size is not None:
+                market_size[..., year] = (market_size[..., year - 1] *
+                                        base_growth * shock_effect * scenario_effect)
+            
+            # Adoption evolution using Bass diffusion model
+            if sme_adoption is not None:
+                sme_growth = self.bass_diffusion_step(sme_p, sme_q, sme_m, sme_adoption[..., year - 1])
+                sme_adoption[..., year] = np.minimum(
+                    sme_adoption[..., year - 1] + sme_growth * shock_effect, sme_m
+                )
+            
+            if large_adoption is not None:
+                large_growth = self.bass_diffusion_step(large_p, large_q, large_m, large_adoption[..., year - 1])
+                large_adoption[..., year] = np.minimum(
+                    large_adoption[..., year - 1] + large_growth * shock_effect, large_m
+                )
+            
+            # Overall adoption (weighted average)
+            if overall_adoption is not None:
+                overall_adoption[..., year] = (sme_weight * sme_adoption[..., year] +
+                                             large_weight * large_adoption[..., year])
+    
     def _get_scenario_multipliers(self, scenario_type: ScenarioType, 
                                 policy_effects: Dict[str, float] = None) -> Dict[str, float]:
         """
@@ -280,26 +891,69 @@ class AIAdoptionSimulator:
         
         return base_multipliers
     
-    def run_comprehensive_analysis(self) -> Dict[str, Dict]:
+    def run_comprehensive_analysis(self, streaming: bool = False,
+                                   chunk_size: int = 100_000,
+                                   n_workers: Optional[int] = None,
+                                   seed: Optional[int] = None) -> Dict[str, Dict]:
         """
         Run comprehensive analysis across multiple scenarios.
         
+        In streaming mode each scenario is simulated in chunks of paths that
+        are folded into StreamingStatistics sketches and then discarded, so
+        memory no longer grows with num_simulations. The 'statistics' layout
+        is unchanged, quantiles become histogram estimates and 'raw_data' is
+        omitted from the results. stream_comprehensive_analysis yields the
+        same statistics progressively, after every chunk.
+        
+        When n_workers or seed is given, scenarios are split into chunks of
+        chunk_size paths, each drawing from its own generator spawned from
+        SeedSequence(seed), and run across a process pool. Results depend
+        only on seed and chunk_size, not on the number of workers.
+        
+        With params.common_random_numbers every scenario is driven by the
+        same shocks, so scenario comparisons (e.g. baseline vs policy in
+        generate_policy_recommendations) are taken over matched paths.
+        
+        Args:
+            streaming: Summarize chunks on the fly instead of keeping raw paths
+            chunk_size: Paths simulated per chunk in streaming or parallel mode
+            n_workers: Worker processes for parallel execution (1 runs the
+                chunks in this process)
+            seed: Root seed for the per-chunk random streams
+            
         Returns:
             Dictionary containing results for all scenarios
         """
-        scenarios = [
-            (ScenarioType.BASELINE, None),
-            (ScenarioType.OPTIMISTIC, None),
-            (ScenarioType.PESSIMISTIC, None),
-            (ScenarioType.POLICY_INTERVENTION, {'sme_support': 0.15, 'overall_boost': 0.05}),
-            (ScenarioType.DISRUPTION, None)
-        ]
+        if n_workers is not None or seed is not None:
+            def run():
+                return self._run_chunked_analysis(streaming, chunk_size, n_workers or 1, seed)
+            
+            if self.cache is not None and seed is not None:
+                results = self.cache.get_or_run(self, run, kind='analysis', streaming=streaming,
+                                                chunk_size=chunk_size, seed=seed)
+            else:
+                results = run()
+            self.results = results
+            return results
         
         results = {}
         
-        for scenario_type, policy_effects in scenarios:
+        # Common random numbers: every scenario replays the same random stream
+        random_state = np.random.get_state() if self.params.common_random_numbers else None
+        
+        for scenario_type, policy_effects in self.ANALYSIS_SCENARIOS:
             print(f"Running simulation for {scenario_type.value} scenario...")
             
+            if random_state is not None:
+                np.random.set_state(random_state)
+            
+            if streaming:
+                sketches = self._simulate_streaming(scenario_type, policy_effects, chunk_size)
+                results[scenario_type.value] = {
+                    'statistics': {metric: sketch.summary() for metric, sketch in sketches.items()}
+                }
+                continue
+            
             # Run simulation
             sim_results = self.simulate_adoption_scenario(scenario_type, policy_effects)
             
@@ -307,15 +961,7 @@ class AIAdoptionSimulator:
             stats_dict = {}
             for metric, data in sim_results.items():
                 if metric != 'years':
-                    stats_dict[metric] = {
-                        'mean': np.mean(data, axis=0),
-                        'median': np.median(data, axis=0),
-                        'p5': np.percentile(data, 5, axis=0),
-                        'p25': np.percentile(data, 25, axis=0),
-                        'p75': np.percentile(data, 75, axis=0),
-                        'p95': np.percentile(data, 95, axis=0),
-                        'std': np.std(data, axis=0)
-                    }
+                    stats_dict[metric] = _path_statistics(data)
             
             results[scenario_type.value] = {
                 'raw_data': sim_results,
@@ -325,6 +971,504 @@ class AIAdoptionSimulator:
         self.results = results
         return results
     
+    def _run_chunked_analysis(self, streaming: bool, chunk_size: int,
+                              n_workers: int, seed: Optional[int]) -> Dict[str, Dict]:
+        """
+        Run all analysis scenarios as reproducibly seeded path chunks.
+        
+        Raw paths are written by the workers straight into shared memory
+        blocks; statistics are computed next to the data in the pool, then
+        each block is copied out and released before the next. In
+        streaming mode workers return per-chunk sketches that are merged in
+        chunk order.
+        
+        Args:
+            streaming: Return merged sketches instead of raw paths
+            chunk_size: Paths per chunk
+            n_workers: Worker processes (1 runs everything in this process)
+            seed: Root seed for SeedSequence
+            
+        Returns:
+            Dictionary containing results for all scenarios
+        """
+        n_sims = self.params.num_simulations
+        n_years = self.params.time_horizon
+        starts = list(range(0, n_sims, chunk_size))
+        chunk_seeds = self._analysis_chunk_seeds(seed, len(starts))
+        executor = self._analysis_executor(n_workers)
+        
+        blocks = {}
+        try:
+            pending = []
+            for (scenario_type, policy_effects), scenario_chunk_seeds in zip(self.ANALYSIS_SCENARIOS,
+                                                                              chunk_seeds):
+                print(f"Running simulation for {scenario_type.value} scenario...")
+                
+                shm_names = None
+                if not streaming:
+                    blocks[scenario_type.value] = {
+                        metric: shared_memory.SharedMemory(create=True, size=max(n_sims * (n_years + 1) * 8, 1))
+                        for metric in self.PATH_METRICS
+                    }
+                    shm_names = {metric: shm.name for metric, shm in blocks[scenario_type.value].items()}
+                
+                futures = [
+                    executor.submit(_run_path_chunk, scenario_type, policy_effects, start,
+                                    min(chunk_size, n_sims - start), chunk_seed, shm_names)
+                    for start, chunk_seed in zip(starts, scenario_chunk_seeds)
+                ]
+                pending.append((scenario_type, shm_names, futures))
+            
+            results = {}
+            summaries = []
+            for scenario_type, shm_names, futures in pending:
+                chunk_outputs = [future.result() for future in futures]
+                if streaming:
+                    sketches = chunk_outputs[0]
+                    for chunk_sketches in chunk_outputs[1:]:
+                        for metric, sketch in chunk_sketches.items():
+                            sketches[metric].merge(sketch)
+                    results[scenario_type.value] = {
+                        'statistics': {metric: sketch.summary() for metric, sketch in sketches.items()}
+                    }
+                else:
+                    summaries.append((scenario_type, shm_names,
+                                      executor.submit(_summarize_shared_paths, shm_names)))
+            
+            for scenario_type, shm_names, future in summaries:
+                statistics = future.result()
+                # Copy out and release one block at a time, so peak memory
+                # is the shared blocks plus a single path array
+                raw_data = {}
+                scenario_blocks = blocks[scenario_type.value]
+                for metric in list(scenario_blocks):
+                    shm = scenario_blocks[metric]
+                    view = np.ndarray((n_sims, n_years + 1), buffer=shm.buf)
+                    raw_data[metric] = view.copy()
+                    del view
+                    shm.close()
+                    shm.unlink()
+                    del scenario_blocks[metric]
+                raw_data['years'] = np.arange(n_years + 1)
+                results[scenario_type.value] = {
+                    'raw_data': raw_data,
+                    'statistics': statistics
+                }
+        finally:
+            executor.shutdown()
+            for scenario_blocks in blocks.values():
+                for shm in scenario_blocks.values():
+                    shm.close()
+                    shm.unlink()
+        
+        return results
+    
+    def _analysis_chunk_seeds(self, seed: Optional[int],
+                              n_chunks: int) -> List[List[np.random.SeedSequence]]:
+        """
+        Per-scenario, per-chunk seed sequences for the analysis scenarios.
+        
+        With params.common_random_numbers chunk i of every scenario replays
+        the same random stream.
+        """
+        root_seed = np.random.SeedSequence(seed)
+        if self.params.common_random_numbers:
+            shared_seeds = root_seed.spawn(n_chunks)
+            return [shared_seeds] * len(self.ANALYSIS_SCENARIOS)
+        return [scenario_seed.spawn(n_chunks)
+                for scenario_seed in root_seed.spawn(len(self.ANALYSIS_SCENARIOS))]
+    
+    def _analysis_executor(self, n_workers: int):
+        """Process pool of initialized workers, or in-process execution for one worker."""
+        state = (self.params, self.market_drivers, self.diffusion_params, self.driver_correlation)
+        if n_workers > 1:
+            return ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                       initargs=(state,))
+        _init_worker(state)
+        return _InlineExecutor()
+    
+    def stream_comprehensive_analysis(self, chunk_size: int = 100_000,
+                                      n_workers: Optional[int] = None,
+                                      seed: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Run the comprehensive analysis, yielding partial results per chunk.
+        
+        Scenarios are simulated in chunks of chunk_size paths folded into
+        StreamingStatistics sketches. After every chunk an update is yielded
+        whose 'results' has the usual per-scenario 'statistics' layout, so
+        calculate_economic_impact works on partial results. Chunking, seeding
+        and worker semantics match run_comprehensive_analysis(streaming=True),
+        and the last update equals its results. Closing the generator (e.g.
+        breaking out of the loop) cancels outstanding work.
+        
+        Args:
+            chunk_size: Paths simulated per chunk
+            n_workers: Worker processes (1 runs the chunks in this process)
+            seed: Root seed for the per-chunk random streams
+            
+        Yields:
+            Dictionary with 'scenario' (the scenario just updated), 'results'
+            (statistics for every scenario started so far), 'paths_done' and
+            'scenario_paths' for that scenario, 'total_paths_done',
+            'total_paths', 'elapsed_seconds' and 'eta_seconds'
+        """
+        n_sims = self.params.num_simulations
+        starts = list(range(0, n_sims, chunk_size))
+        total_paths = n_sims * len(self.ANALYSIS_SCENARIOS)
+        
+        if n_workers is not None or seed is not None:
+            chunks = self._seeded_chunk_sketches(starts, chunk_size, n_workers or 1, seed)
+        else:
+            chunks = self._global_state_chunks(chunk_size)
+        
+        results = {}
+        sketches = None
+        current = None
+        paths_done = 0
+        total_done = 0
+        started = time.perf_counter()
+        try:
+            for scenario_type, n_paths, chunk in chunks:
+                if scenario_type is not current:
+                    current, sketches, paths_done = scenario_type, None, 0
+                
+                if sketches is None:
+                    if isinstance(next(iter(chunk.values())), StreamingStatistics):
+                        sketches = chunk
+                    else:
+                        sketches = {metric: StreamingStatistics(chunk[metric].shape[1])
+                                    for metric in self.PATH_METRICS}
+                        for metric in self.PATH_METRICS:
+                            sketches[metric].update(chunk[metric])
+                else:
+                    for metric in self.PATH_METRICS:
+                        if isinstance(chunk[metric], StreamingStatistics):
+                            sketches[metric].merge(chunk[metric])
+                        else:
+                            sketches[metric].update(chunk[metric])
+                
+                paths_done += n_paths
+                total_done += n_paths
+                results[scenario_type.value] = {
+                    'statistics': {metric: sketch.summary() for metric, sketch in sketches.items()}
+                }
+                
+                elapsed = time.perf_counter() - started
+                yield {
+                    'scenario': scenario_type.value,
+                    'results': results,
+                    'paths_done': paths_done,
+                    'scenario_paths': n_sims,
+                    'total_paths_done': total_done,
+                    'total_paths': total_paths,
+                    'elapsed_seconds': elapsed,
+                    'eta_seconds': elapsed / total_done * (total_paths - total_done)
+                }
+        finally:
+            chunks.close()
+        
+        self.results = results
+    
+    async def astream_comprehensive_analysis(self, chunk_size: int = 100_000,
+                                             n_workers: Optional[int] = None,
+                                             seed: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Async variant of stream_comprehensive_analysis.
+        
+        Chunks run in the event loop's default executor, so the loop stays
+        responsive between updates. Cancelling the consumer waits for the
+        chunk in flight to finish, then stops the stream and re-raises
+        CancelledError.
+        """
+        loop = asyncio.get_running_loop()
+        updates = self.stream_comprehensive_analysis(chunk_size, n_workers, seed)
+        finished = object()
+        pending = None
+        try:
+            while True:
+                pending = loop.run_in_executor(None, next, updates, finished)
+                # Shielded so a cancelled consumer leaves the chunk running
+                # until the generator can be closed
+                update = await asyncio.shield(pending)
+                if update is finished:
+                    break
+                yield update
+        finally:
+            if pending is not None and not pending.done():
+                await asyncio.wait([pending])
+            updates.close()
+    
+    def _global_state_chunks(self, chunk_size: int) -> Iterator[Tuple]:
+        """Simulate analysis scenarios chunk by chunk from the global random state."""
+        random_state = np.random.get_state() if self.params.common_random_numbers else None
+        for scenario_type, policy_effects in self.ANALYSIS_SCENARIOS:
+            if random_state is not None:
+                np.random.set_state(random_state)
+            remaining = self.params.num_simulations
+            while remaining > 0:
+                n_chunk = min(chunk_size, remaining)
+                yield (scenario_type, n_chunk,
+                       self.simulate_adoption_scenario(scenario_type, policy_effects, n_chunk))
+                remaining -= n_chunk
+    
+    def _seeded_chunk_sketches(self, starts: List[int], chunk_size: int,
+                               n_workers: int, seed: Optional[int]) -> Iterator[Tuple]:
+        """
+        Seeded per-chunk sketches for all analysis scenarios, in chunk order.
+        
+        At most two chunks per worker are in flight, so stopping early
+        leaves little work to cancel.
+        """
+        n_sims = self.params.num_simulations
+        chunk_seeds = self._analysis_chunk_seeds(seed, len(starts))
+        calls = [
+            (scenario_type, policy_effects, start, min(chunk_size, n_sims - start), chunk_seed)
+            for (scenario_type, policy_effects), scenario_chunk_seeds in zip(self.ANALYSIS_SCENARIOS,
+                                                                              chunk_seeds)
+            for start, chunk_seed in zip(starts, scenario_chunk_seeds)
+        ]
+        
+        executor = self._analysis_executor(n_workers)
+        pending = deque()
+        try:
+            for call in calls:
+                pending.append((call, executor.submit(_run_path_chunk, *call, None)))
+                if len(pending) >= 2 * n_workers:
+                    call, future = pending.popleft()
+                    yield call[0], call[3], future.result()
+            while pending:
+                call, future = pending.popleft()
+                yield call[0], call[3], future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+    
+    def _simulate_streaming(self, scenario_type: ScenarioType,
+                            policy_effects: Optional[Dict[str, float]],
+                            chunk_size: int) -> Dict[str, StreamingStatistics]:
+        """
+        Simulate a scenario chunk by chunk into per-metric sketches.
+        
+        Args:
+            scenario_type: Type of scenario to simulate
+            policy_effects: Dictionary of policy intervention effects
+            chunk_size: Paths simulated per chunk
+            
+        Returns:
+            Dictionary mapping metric names to StreamingStatistics
+        """
+        sketches = {}
+        remaining = self.params.num_simulations
+        while remaining > 0:
+            n_chunk = min(chunk_size, remaining)
+            chunk = self.simulate_adoption_scenario(scenario_type, policy_effects, n_chunk)
+            for metric, data in chunk.items():
+                if metric != 'years':
+                    if metric not in sketches:
+                        sketches[metric] = StreamingStatistics(data.shape[1])
+                    sketches[metric].update(data)
+            remaining -= n_chunk
+        return sketches
+    
+    def run_to_precision(self, scenario_type: ScenarioType,
+                         tolerances: Dict[str, Dict[str, float]],
+                         policy_effects: Dict[str, float] = None,
+                         batch_size: int = 10_000,
+                         max_simulations: int = 1_000_000,
+                         confidence: float = 0.95,
+                         year: int = -1,
+                         min_batches: int = 10,
+                         seed: Optional[int] = None) -> Dict:
+        """
+        Simulate batches of paths until target confidence widths are met.
+        
+        Each batch draws from its own generator spawned from
+        SeedSequence(seed). Confidence half-widths use batch means: every
+        statistic is also computed per batch, and the spread of the batch
+        values gives its standard error. This covers quantiles as well as
+        means, and randomized Sobol batches as well as pseudo-random ones.
+        
+        Args:
+            scenario_type: Type of scenario to simulate
+            tolerances: Relative half-widths per metric and statistic, e.g.
+                {'market_size': {'mean': 0.005, 'p95': 0.005}}; where the
+                statistic is zero the tolerance applies to the absolute
+                half-width instead
+            policy_effects: Dictionary of policy intervention effects
+            batch_size: Paths per batch
+            max_simulations: Path budget
+            confidence: Confidence level of the intervals
+            year: Year index the tolerances apply to (default final year)
+            min_batches: Batches run before convergence is first checked
+            seed: Root seed for the batch random streams
+            
+        Returns:
+            Dictionary with 'statistics' (same layout as
+            run_comprehensive_analysis), 'num_simulations', 'converged' and
+            'precision' (achieved relative half-widths, absolute for
+            statistics that are zero)
+        """
+        root_seed = np.random.SeedSequence(seed)
+        sketches = {}
+        batch_values = {metric: {stat: [] for stat in targets}
+                        for metric, targets in tolerances.items()}
+        
+        n_done = 0
+        n_batches = 0
+        converged = False
+        precision = {}
+        while n_done < max_simulations:
+            n_batch = min(batch_size, max_simulations - n_done)
+            rng = np.random.default_rng(root_seed.spawn(1)[0])
+            batch = self.simulate_adoption_scenario(scenario_type, policy_effects, n_batch, rng=rng)
+            
+            for metric in self.PATH_METRICS:
+                if metric not in sketches:
+                    sketches[metric] = StreamingStatistics(batch[metric].shape[1])
+                sketches[metric].update(batch[metric])
+            for metric, targets in tolerances.items():
+                batch_stats = _path_statistics(batch[metric][:, [year]])
+                for stat in targets:
+                    batch_values[metric][stat].append(batch_stats[stat][0])
+            n_done += n_batch
+            n_batches += 1
+            
+            if n_batches < min_batches:
+                continue
+            
+            critical = stats.t.ppf((1 + confidence) / 2, n_batches - 1)
+            converged = True
+            for metric, targets in tolerances.items():
+                summary = sketches[metric].summary()
+                precision[metric] = {}
+                for stat, tolerance in targets.items():
+                    values = np.array(batch_values[metric][stat])
+                    half_width = critical * values.std(ddof=1) / np.sqrt(n_batches)
+                    scale = abs(summary[stat][year])
+                    relative = float(half_width / scale if scale > 0 else half_width)
+                    precision[metric][stat] = relative
+                    converged &= relative <= tolerance
+            if converged:
+                break
+        
+        return {
+            'statistics': {metric: sketch.summary() for metric, sketch in sketches.items()},
+            'num_simulations': n_done,
+            'converged': converged,
+            'precision': precision
+        }
+    
+    def sweep_policy_grid(self, policy_grid: Dict[str, List[float]],
+                          batch_size: int = 64,
+                          seed: Optional[int] = None,
+                          metrics: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Evaluate a grid of POLICY_INTERVENTION effects in one pass.
+        
+        Every policy point shares one block of market shocks (common random
+        numbers). Market size depends only on the growth coefficients and
+        adoption only on the Bass coefficients, so each group is propagated
+        once per distinct coefficient set, with those sets stacked on a
+        leading axis (batch_size at a time) and broadcast against the shared
+        shocks. A 50 x 50 sme_support x overall_boost grid therefore needs
+        about 100 propagations instead of 2,500 scenario runs.
+        
+        Args:
+            policy_grid: Values per policy effect, e.g.
+                {'sme_support': [0, 0.1, 0.2], 'overall_boost': [0, 0.05]};
+                the cartesian product is evaluated
+            batch_size: Coefficient sets advanced together
+            seed: Seed for the shared shocks (global NumPy state if None)
+            metrics: Path metrics to summarize (default PATH_METRICS); only
+                the paths these need are allocated and propagated
+            
+        Returns:
+            Dictionary with 'cube' mapping each requested metric to an array of shape
+            (*grid_shape, n_stats, n_years + 1), and the labels 'axes' and
+            'coords' (grid values, statistic names and years)
+        """
+        n_years = self.params.time_horizon
+        n_sims = self.params.num_simulations
+        metrics = list(metrics) if metrics is not None else list(self.PATH_METRICS)
+        unknown = set(metrics) - set(self.PATH_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown path metrics: {sorted(unknown)}")
+        # Overall adoption is the weighted sum of both segment paths
+        required = set(metrics)
+        if 'overall_adoption' in required:
+            required |= {'sme_adoption', 'large_adoption'}
+        initial = {
+            'market_size': self.params.initial_market_size,
+            'sme_adoption': self.params.adoption_rates['sme'],
+            'large_adoption': self.params.adoption_rates['large'],
+            'overall_adoption': self.params.adoption_rates['overall']
+        }
+        names = list(policy_grid)
+        values = [np.asarray(policy_grid[name], dtype=float) for name in names]
+        grid_shape = tuple(len(v) for v in values)
+        points = np.stack([g.ravel() for g in np.meshgrid(*values, indexing='ij')], axis=1)
+        
+        rng = np.random.default_rng(seed) if seed is not None else None
+        shocks = self.generate_market_shocks(n_years, n_sims, rng=rng)
+        
+        # Per-policy coefficients, one row per grid point
+        coefficients = [
+            self._diffusion_coefficients(
+                self._get_scenario_multipliers(ScenarioType.POLICY_INTERVENTION,
+                                               dict(zip(names, point)))
+            )
+            for point in points
+        ]
+        
+        groups = (
+            (('base_growth', 'market_growth'), ('market_size',)),
+            (('sme_p', 'sme_q', 'sme_m', 'large_p', 'large_q', 'large_m'),
+             ('sme_adoption', 'large_adoption', 'overall_adoption')),
+        )
+        
+        cube = {}
+        for keys, group_metrics in groups:
+            needed = [metric for metric in group_metrics if metric in required]
+            if not needed:
+                continue
+            group_metrics = [metric for metric in group_metrics if metric in metrics]
+            table = np.array([[c[key] for key in keys] for c in coefficients])
+            unique, inverse = np.unique(table, axis=0, return_inverse=True)
+            group_stats = {metric: np.empty((len(unique), len(self.STAT_NAMES), n_years + 1))
+                           for metric in group_metrics}
+            
+            for start in range(0, len(unique), batch_size):
+                stop = min(start + batch_size, len(unique))
+                batch_coefficients = dict(coefficients[0])
+                for col, key in enumerate(keys):
+                    batch_coefficients[key] = unique[start:stop, col][:, None]
+                
+                paths = dict.fromkeys(self.PATH_METRICS)
+                for metric in needed:
+                    paths[metric] = np.empty((stop - start, n_sims, n_years + 1))
+                    paths[metric][..., 0] = initial[metric]
+                self._propagate_paths(shocks, batch_coefficients, paths['market_size'],
+                                      paths['sme_adoption'], paths['large_adoption'],
+                                      paths['overall_adoption'])
+                
+                for metric in group_metrics:
+                    batch_stats = _path_statistics(paths[metric])
+                    group_stats[metric][start:stop] = np.stack(
+                        [batch_stats[stat] for stat in self.STAT_NAMES], axis=1
+                    )
+            
+            for metric in group_metrics:
+                cube[metric] = group_stats[metric][inverse.ravel()].reshape(
+                    grid_shape + group_stats[metric].shape[1:]
+                )
+        
+        return {
+            'cube': {metric: cube[metric] for metric in metrics},
+            'axes': tuple(names) + ('stat', 'year'),
+            'coords': {**dict(zip(names, values)),
+                       'stat': self.STAT_NAMES,
+                       'year': np.arange(n_years + 1)}
+        }
+    
     def calculate_economic_impact(self, scenario_results: Dict) -> Dict[str, float]:
         """
         Calculate economic impact metrics for a scenario.
@@ -421,12 +1565,33 @@ class AIAdoptionSimulator:
         
         return recommendations
     
-    def export_results(self, filename: str = 'ai_simulation_results.json'):
+    def export_results(self, filename: str = 'ai_simulation_results.json',
+                       format: str = 'json', row_group_size: int = 1_000_000):
         """
-        Export simulation results to JSON file.
+        Export simulation results to a JSON, Parquet or NPZ file.
+        
+        JSON holds the statistics, economic impact and policy
+        recommendations. The binary formats also keep every raw path:
+        
+        - 'parquet': one zstd-compressed column per scenario, metric and
+          year ('baseline/market_size/6'), written in row groups of
+          row_group_size paths, with the JSON summary in the file metadata.
+          Requires pyarrow.
+        - 'npz': compressed NumPy archive with one (paths x years) array per
+          scenario and metric plus the JSON summary. Members are
+          deflate-compressed, so they cannot be memory-mapped on load; use
+          Parquet when paths must be read without decompressing them whole.
+          A '.npz' suffix is appended to filename if missing.
+        
+        Use load_results to read either binary format back selectively.
         
         Args:
             filename: Output filename
+            format: 'json', 'parquet' or 'npz'
+            row_group_size: Paths per Parquet row group
+            
+        Returns:
+            Path of the written file
         """
         if not self.results:
             raise ValueError("No results to export. Run analysis first.")
@@ -448,10 +1613,205 @@ class AIAdoptionSimulator:
         # Add policy recommendations
         export_data['policy_recommendations'] = self.generate_policy_recommendations()
         
-        with open(filename, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        raw_paths = {
+            f'{scenario}/{metric}': data['raw_data'][metric]
+            for scenario, data in self.results.items() if 'raw_data' in data
+            for metric in self.PATH_METRICS
+        }
+        
+        if format == 'json':
+            with open(filename, 'w') as f:
+                json.dump(export_data, f, indent=2)
+        elif format == 'npz':
+            if not filename.endswith('.npz'):
+                filename += '.npz'
+            np.savez_compressed(filename, __summary__=np.array(json.dumps(export_data)), **raw_paths)
+        elif format == 'parquet':
+            _write_parquet_paths(filename, raw_paths, json.dumps(export_data), row_group_size)
+        else:
+            raise ValueError(f"Unknown export format: {format}")
         
         print(f"Results exported to {filename}")
+        return filename
+
+
+def _write_parquet_paths(filename: str, raw_paths: Dict[str, np.ndarray],
+                         summary: str, row_group_size: int):
+    """Write raw paths as per-year Parquet columns, one row group at a time."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+    
+    fields = [pa.field(f'{name}/{year}', pa.float64())
+              for name, data in raw_paths.items() for year in range(data.shape[1])]
+    schema = pa.schema(fields, metadata={'ai_simulation_summary': summary})
+    n_rows = max((len(data) for data in raw_paths.values()), default=0)
+    
+    with pq.ParquetWriter(filename, schema, compression='zstd') as writer:
+        if n_rows == 0:
+            writer.write_table(schema.empty_table())
+        for start in range(0, n_rows, row_group_size):
+            columns = [np.ascontiguousarray(data[start:start + row_group_size, year])
+                       for data in raw_paths.values() for year in range(data.shape[1])]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+# Leading bytes of each binary export format
+FILE_SIGNATURES = {b'PK\x03\x04': 'npz', b'PAR1': 'parquet'}
+
+
+def load_results(filename: str, scenarios: Optional[List[str]] = None,
+                 metrics: Optional[List[str]] = None,
+                 years: Optional[List[int]] = None,
+                 format: Optional[str] = None) -> Dict:
+    """
+    Load results written by export_results in 'parquet' or 'npz' format.
+    
+    Only the requested scenarios, metrics and years are read: Parquet
+    columns are projected and memory-mapped. NPZ members cannot be
+    memory-mapped; each selected member is decompressed whole and the
+    archive is closed before returning.
+    
+    Args:
+        filename: Exported file
+        scenarios: Scenario names to load raw paths for (default all)
+        metrics: Path metrics to load (default all)
+        years: Year indices to keep (default all)
+        format: 'parquet' or 'npz' (default: detected from the file's
+            leading bytes)
+        
+    Returns:
+        Dictionary shaped like the export summary, with a 'raw_data' entry
+        of (paths x years) arrays added to each loaded scenario
+    """
+    if format is None:
+        with open(filename, 'rb') as f:
+            magic = f.read(4)
+        if magic not in FILE_SIGNATURES:
+            raise ValueError(f"{filename} is neither an NPZ nor a Parquet export")
+        format = FILE_SIGNATURES[magic]
+    
+    def select(available):
+        return [name for name in available
+                if (scenarios is None or name.split('/')[0] in scenarios)
+                and (metrics is None or name.split('/')[1] in metrics)]
+    
+    if format == 'npz':
+        with np.load(filename) as archive:
+            summary = json.loads(str(archive['__summary__']))
+            selected = select(name for name in archive.files if name != '__summary__')
+            raw_paths = {name: archive[name] if years is None else archive[name][:, years]
+                         for name in selected}
+    elif format == 'parquet':
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(filename)
+        summary = json.loads(schema.metadata[b'ai_simulation_summary'])
+        available = sorted({name.rsplit('/', 1)[0] for name in schema.names},
+                           key=lambda name: schema.names.index(f'{name}/0'))
+        selected = select(available)
+        columns = {}
+        for name in selected:
+            n_years = sum(1 for column in schema.names if column.rsplit('/', 1)[0] == name)
+            columns[name] = [f'{name}/{year}' for year in (range(n_years) if years is None else years)]
+        table = pq.read_table(filename, columns=[c for cols in columns.values() for c in cols],
+                              memory_map=True)
+        raw_paths = {name: np.column_stack([table.column(c).to_numpy() for c in cols])
+                     for name, cols in columns.items()}
+    else:
+        raise ValueError(f"Unknown results format: {format}")
+    
+    for name, data in raw_paths.items():
+        scenario, metric = name.split('/')
+        summary[scenario].setdefault('raw_data', {})[metric] = data
+    return summary
+
+
+def _path_statistics(data: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-year summary statistics of a (..., paths x years) array."""
+    # Order statistics on year-major rows avoid partitioning a strided axis;
+    # the selected values, and so the percentiles, are unchanged
+    by_year = np.ascontiguousarray(np.swapaxes(data, -1, -2))
+    p5, p25, p75, p95 = np.percentile(by_year, [5, 25, 75, 95], axis=-1)
+    return {
+        'mean': np.mean(data, axis=-2),
+        'median': np.median(by_year, axis=-1),
+        'p5': p5,
+        'p25': p25,
+        'p75': p75,
+        'p95': p95,
+        'std': np.std(data, axis=-2)
+    }
+
+
+# Simulator rebuilt once per worker process by _init_worker
+_worker_simulator = None
+
+
+def _init_worker(state: Tuple):
+    """Build the per-process simulator from picklable configuration."""
+    global _worker_simulator
+    params, market_drivers, diffusion_params, driver_correlation = state
+    _worker_simulator = AIAdoptionSimulator(params)
+    _worker_simulator.market_drivers = market_drivers
+    _worker_simulator.diffusion_params = diffusion_params
+    _worker_simulator.driver_correlation = driver_correlation
+
+
+def _run_path_chunk(scenario_type: ScenarioType, policy_effects: Optional[Dict[str, float]],
+                    start: int, n_paths: int, seed_sequence: np.random.SeedSequence,
+                    shm_names: Optional[Dict[str, str]]):
+    """
+    Simulate one chunk of paths with its own random stream.
+    
+    Writes rows [start, start + n_paths) of the shared path arrays when
+    shm_names is given, otherwise returns per-metric StreamingStatistics.
+    """
+    sim = _worker_simulator
+    rng = np.random.default_rng(seed_sequence)
+    chunk = sim.simulate_adoption_scenario(scenario_type, policy_effects, n_paths, rng=rng)
+    
+    if shm_names is None:
+        sketches = {}
+        for metric in sim.PATH_METRICS:
+            sketches[metric] = StreamingStatistics(chunk[metric].shape[1])
+            sketches[metric].update(chunk[metric])
+        return sketches
+    
+    shape = (sim.params.num_simulations, sim.params.time_horizon + 1)
+    for metric, name in shm_names.items():
+        shm = shared_memory.SharedMemory(name=name)
+        view = np.ndarray(shape, buffer=shm.buf)
+        view[start:start + n_paths] = chunk[metric]
+        del view
+        shm.close()
+    return None
+
+
+def _summarize_shared_paths(shm_names: Dict[str, str]) -> Dict[str, Dict[str, np.ndarray]]:
+    """Compute path statistics for arrays held in shared memory."""
+    shape = (_worker_simulator.params.num_simulations, _worker_simulator.params.time_horizon + 1)
+    stats_dict = {}
+    for metric, name in shm_names.items():
+        shm = shared_memory.SharedMemory(name=name)
+        view = np.ndarray(shape, buffer=shm.buf)
+        stats_dict[metric] = _path_statistics(view)
+        del view
+        shm.close()
+    return stats_dict
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs submitted calls immediately in-process."""
+    
+    def submit(self, fn: Callable, *args) -> Future:
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+    
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        pass
 
 
 if __name__ == '__main__':
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Staggered-Adoption Difference-in-Differences
+
+Callaway-Sant'Anna group-time average treatment effects for panels in
+which firms adopt AI in different periods. For every adoption cohort g
+and period t,
+
+    ATT(g, t) = [Y_g(t) - Y_g(b)] - [Y_C(t) - Y_C(b)]
+
+where Y_g is the cohort mean, Y_C the mean of the comparison units
+(never-treated, or not yet treated by t) and b the base period (g - 1
+after adoption; t - 1 before it with the varying base). Every cell is
+read from one table of cohort x period outcome sums, aggregations to
+event time, cohort and overall effects are fixed weight matrices over
+the cells, and inference uses a multiplier bootstrap in which each draw
+only reweights the cohort sums, so thousands of draws are a few matrix
+products.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from typing import Dict, Optional
+
+
+class StaggeredDiD:
+    """
+    Group-time ATTs with event-time, cohort and overall aggregation.
+
+    Requires a balanced panel. Cohort weights in the aggregations are
+    treated as fixed in the bootstrap.
+    """
+
+    def __init__(self, control_group: str = 'never_treated', base_period: str = 'varying',
+                 unit: str = 'firm_id', time: str = 'period', adoption: str = 'adoption_period'):
+        """
+        Args:
+            control_group: 'never_treated' or 'not_yet_treated'
+            base_period: 'varying' (t - 1 for pre-treatment cells) or
+                'universal' (g - 1 for every cell)
+            unit: Unit identifier column (bootstrap cluster)
+            time: Period column
+            adoption: First treated period column (missing for never-treated)
+        """
+        if control_group not in ('never_treated', 'not_yet_treated'):
+            raise ValueError(f"Unknown control group: {control_group}")
+        if base_period not in ('varying', 'universal'):
+            raise ValueError(f"Unknown base period: {base_period}")
+        self.control_group = control_group
+        self.base_period = base_period
+        self.unit = unit
+        self.time = time
+        self.adoption = adoption
+
+    def fit(self, data: pd.DataFrame, outcome: str = 'productivity_growth',
+            n_bootstrap: int = 999, confidence: float = 0.95,
+            multiplier: str = 'mammen', seed: Optional[int] = None) -> Dict:
+        """
+        Estimate every ATT(g, t) and its aggregations.
+
+        Args:
+            data: Balanced panel with unit, time, adoption and outcome columns
+            outcome: Outcome column
+            n_bootstrap: Multiplier bootstrap draws (0 to skip inference)
+            confidence: Confidence level for pointwise and uniform bands
+            multiplier: 'mammen' or 'rademacher' multiplier weights
+            seed: Bootstrap seed
+
+        Returns:
+            Dictionary with 'group_time', 'event_time' and 'cohort' tables
+            and an 'overall' Series, each with att, std_error and
+            confidence bounds (uniform bands for the tables)
+        """
+        periods = np.unique(data[self.time].to_numpy())
+        n_periods = len(periods)
+        period_index = np.searchsorted(periods, data[self.time].to_numpy())
+        units, _ = pd.factorize(data[self.unit])
+        n_units = units.max() + 1
+        y = data[outcome].to_numpy(dtype=float)
+
+        # Cohort = first treated period index; never treated (or after the panel) = n_periods
+        first_treated = np.full(n_units, np.nan)
+        first_treated[units] = data[self.adoption].to_numpy(dtype=float, na_value=np.nan)
+        unit_cohort = np.searchsorted(periods, np.nan_to_num(first_treated, nan=np.inf))
+
+        # Units treated from the first period have no pre-period
+        keep_unit = unit_cohort > 0
+        cohort_periods, unit_cohort_code = np.unique(unit_cohort[keep_unit], return_inverse=True)
+        cohort_of_unit = np.full(n_units, -1)
+        cohort_of_unit[keep_unit] = unit_cohort_code
+        n_cohorts = len(cohort_periods)
+        never = np.flatnonzero(cohort_periods == n_periods)
+
+        # Cached cohort x period sums in one pass over the long panel
+        rows = cohort_of_unit[units] >= 0
+        cell_code = cohort_of_unit[units[rows]] * n_periods + period_index[rows]
+        sums = np.bincount(cell_code, weights=y[rows], minlength=n_cohorts * n_periods).reshape(n_cohorts, n_periods)
+        counts = np.bincount(cohort_of_unit[keep_unit], minlength=n_cohorts).astype(float)
+        observed = np.bincount(cell_code, minlength=n_cohorts * n_periods).reshape(n_cohorts, n_periods)
+        if not (observed == counts[:, None]).all() or not np.isfinite(sums).all():
+            raise ValueError("StaggeredDiD requires a balanced panel without missing outcomes")
+
+        cells = self._cells(cohort_periods, n_periods, never)
+        cohort, t, base, control = cells['cohort'], cells['t'], cells['base'], cells['control']
+        control_counts = control @ counts
+
+        # ATT(g, t) = treated mean change - pooled control mean change
+        changes = sums[:, t] - sums[:, base]
+        treated_change = changes[cohort, np.arange(len(cohort))] / counts[cohort]
+        control_change = (control * changes.T).sum(axis=1) / control_counts
+        att = treated_change - control_change
+
+        aggregations = self._aggregation_weights(cohort_periods, cohort, t, counts)
+
+        draws = None
+        if n_bootstrap > 0:
+            wide = np.empty((n_units, n_periods))
+            wide[units, period_index] = y
+            draws = self._bootstrap(wide, cohort_of_unit, n_cohorts, cells, counts, control_counts,
+                                    treated_change, control_change, n_bootstrap, multiplier,
+                                    np.random.default_rng(seed))
+
+        group_time = pd.DataFrame({
+            'event_time': t - cohort_periods[cohort],
+            'n_treated': counts[cohort].astype(int),
+            'n_control': control_counts.astype(int)
+        }, index=pd.MultiIndex.from_arrays([periods[cohort_periods[cohort]], periods[t]],
+                                           names=['cohort', 'period']))
+
+        results = {'group_time': self._summarize(att, draws, confidence, group_time)}
+        for name, (index, weights) in aggregations.items():
+            results[name] = self._summarize(weights @ att, None if draws is None else draws @ weights.T,
+                                            confidence, pd.DataFrame(index=index))
+        results['overall'] = results.pop('overall').iloc[0]
+        return results
+
+    def _cells(self, cohort_periods: np.ndarray, n_periods: int, never: np.ndarray) -> Dict[str, np.ndarray]:
+        """Cohort, period, base period and control-cohort indicator of every cell."""
+        cohort, t, base = [], [], []
+        for c, g in enumerate(cohort_periods):
+            if g == n_periods:
+                continue
+            for period in range(n_periods):
+                b = g - 1 if period >= g or self.base_period == 'universal' else period - 1
+                if b >= 0 and b != period:
+                    cohort.append(c)
+                    t.append(period)
+                    base.append(b)
+        cohort, t, base = np.array(cohort, dtype=int), np.array(t, dtype=int), np.array(base, dtype=int)
+
+        if self.control_group == 'never_treated':
+            control = np.zeros((len(cohort), len(cohort_periods)))
+            control[:, never] = 1.0
+        else:
+            # Cohorts untreated through both t and the base period
+            control = (cohort_periods[None, :] > np.maximum(t, base)[:, None]).astype(float)
+            control[np.arange(len(cohort)), cohort] = 0.0
+
+        valid = control.any(axis=1)
+        if not valid.any():
+            raise ValueError("No comparison units for any cohort")
+        return {'cohort': cohort[valid], 't': t[valid], 'base': base[valid], 'control': control[valid]}
+
+    @staticmethod
+    def _aggregation_weights(cohort_periods, cohort, t, counts) -> Dict[str, tuple]:
+        """Weight matrices mapping cell ATTs to event-time, cohort and overall effects."""
+        event_time = t - cohort_periods[cohort]
+        post = event_time >= 0
+
+        event_times = np.unique(event_time)
+        by_event = (event_time[None, :] == event_times[:, None]) * counts[cohort][None, :]
+        by_event /= by_event.sum(axis=1, keepdims=True)
+
+        treated_cohorts = np.unique(cohort[post])
+        by_cohort = ((cohort[None, :] == treated_cohorts[:, None]) & post[None, :]).astype(float)
+        by_cohort /= by_cohort.sum(axis=1, keepdims=True)
+
+        # Overall: cohort effects weighted by cohort size
+        shares = counts[treated_cohorts] / counts[treated_cohorts].sum()
+        overall = shares @ by_cohort
+
+        return {
+            'event_time': (pd.Index(event_times, name='event_time'), by_event),
+            'cohort': (pd.Index(cohort_periods[treated_cohorts], name='cohort'), by_cohort),
+            'overall': (pd.Index(['overall']), overall[None, :])
+        }
+
+    @staticmethod
+    def _bootstrap(wide, cohort_of_unit, n_cohorts, cells, counts, control_counts,
+                   treated_change, control_change, n_bootstrap, multiplier, rng,
+                   max_elements: int = 1 << 22) -> np.ndarray:
+        """
+        Multiplier bootstrap draws of ATT(g, t) - ATT(g, t).
+
+        Each draw reweights units by iid multipliers; linearizing the cell
+        means, a draw only needs the multiplier-weighted cohort x period sums
+        and multiplier totals per cohort.
+        """
+        if multiplier == 'mammen':
+            root5 = np.sqrt(5.0)
+            values = np.array([(1 - root5) / 2, (1 + root5) / 2])
+            probability = (root5 + 1) / (2 * root5)
+        elif multiplier == 'rademacher':
+            values, probability = np.array([-1.0, 1.0]), 0.5
+        else:
+            raise ValueError(f"Unknown multiplier: {multiplier}")
+
+        cohort, t, base, control = cells['cohort'], cells['t'], cells['base'], cells['control']
+        members = [np.flatnonzero(cohort_of_unit == c) for c in range(n_cohorts)]
+        blocks = [wide[m] for m in members]
+        columns = np.arange(len(cohort))
+        chunk = max(1, min(n_bootstrap, max_elements // max(len(m) for m in members)))
+
+        draws = np.empty((n_bootstrap, len(cohort)))
+        for start in range(0, n_bootstrap, chunk):
+            size = min(chunk, n_bootstrap - start)
+            weighted = np.empty((size, n_cohorts, wide.shape[1]))
+            totals = np.empty((size, n_cohorts))
+            for c, block in enumerate(blocks):
+                xi = values[(rng.random((size, len(block))) >= probability).astype(np.intp)]
+                weighted[:, c] = xi @ block
+                totals[:, c] = xi.sum(axis=1)
+
+            changes = weighted[:, :, t] - weighted[:, :, base]
+            treated = (changes[:, cohort, columns] - totals[:, cohort] * treated_change) / counts[cohort]
+            controls = (np.einsum('bkc,kc->bc', changes, control.T)
+                        - (totals @ control.T) * control_change) / control_counts
+            draws[start:start + size] = treated - controls
+        return draws
+
+    @staticmethod
+    def _summarize(estimates, draws, confidence, table) -> pd.DataFrame:
+        """Attach bootstrap standard errors and pointwise and uniform bands."""
+        table = table.copy()
+        table.insert(0, 'att', estimates)
+        if draws is None:
+            table['std_error'] = np.nan
+            return table
+
+        # Robust bootstrap standard error from the interquartile range
+        q75, q25 = np.percentile(draws, [75, 25], axis=0)
+        se = (q75 - q25) / (norm.ppf(0.75) - norm.ppf(0.25))
+        z = norm.ppf(0.5 + confidence / 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            critical = np.quantile(np.nanmax(np.abs(draws / se), axis=1), confidence)
+
+        table['std_error'] = se
+        table['ci_lower'] = estimates - z * se
+        table['ci_upper'] = estimates + z * se
+        table['uniform_lower'] = estimates - critical * se
+        table['uniform_upper'] = estimates + critical * se
+        return table
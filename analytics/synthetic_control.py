@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Synthetic Control Method
+
+Synthetic controls for every AI adopter in a staggered-adoption panel,
+with never-treated firms as the donor pool. Each treated unit's
+counterfactual is a convex combination of donors matching its
+pre-adoption outcome path:
+
+    min_w ||y_pre - Y0_pre w||^2   s.t.  w >= 0, sum(w) = 1
+
+All units of one adoption cohort share the pre-treatment donor matrix
+Y0_pre (periods x donors), so their weight problems are solved together
+by a batched active-set method: the gradients of the whole batch are two
+products with Y0_pre, and each unit only factorizes the small block of
+the donor Gram matrix on its support (at most about periods + 1 donors),
+so the cost grows linearly in donors and units. Batches are spread
+across a process pool whose workers receive the wide outcome matrix
+once.
+
+Inference is placebo-in-space: donors are re-fitted as if they had
+adopted with each cohort (excluding themselves from their pool). Each
+treated unit's post/pre RMSPE ratio is ranked among its cohort's
+placebos, and aggregate effects are compared with averages of randomly
+assigned placebo gaps (as in Cavallo et al. 2013).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .simulation_engine import _InlineExecutor
+except ImportError:
+    from simulation_engine import _InlineExecutor
+
+
+# Arrays shared with worker processes (set once per worker)
+_shared: Dict[str, np.ndarray] = {}
+
+
+def _init_shared(arrays: Dict[str, np.ndarray]):
+    _shared.clear()
+    _shared.update(arrays)
+
+
+def _support_solve(block: np.ndarray, linear: np.ndarray) -> np.ndarray:
+    """
+    Minimize 1/2 ||D_S w||^2 + linear'w subject to sum(w) = 1.
+
+    Solves the KKT system built from the support's block of the donor
+    Gram matrix.
+    """
+    size = block.shape[1]
+    kkt = np.ones((size + 1, size + 1))
+    kkt[:size, :size] = block.T @ block
+    kkt[size, size] = 0.0
+    return np.linalg.lstsq(kkt, np.append(-linear, 1.0), rcond=None)[0][:size]
+
+
+def solve_donor_weights(donors: np.ndarray, targets: np.ndarray,
+                        excluded: Optional[np.ndarray] = None, penalty: float = 0.0,
+                        tol: float = 1e-10, max_iter: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    Simplex-constrained least squares for a batch of targets sharing donors.
+
+    Minimizes ||t - D w||^2 + penalty * sum_j w_j ||t - D_j||^2 per target;
+    the penalty (Abadie and L'Hour 2021) favours donors close to the
+    target and makes the solution unique when donors outnumber periods.
+
+    Primal active set: every target starts from its best single donor;
+    each sweep computes all targets' gradients D'(Dw - t) at once, adds
+    each unfinished target's steepest donor to its support and re-solves
+    the small equality-constrained problem on the support, stepping back
+    to the simplex boundary and dropping donors whose weight would turn
+    negative. Solutions have at most about periods + 1 donors, so a
+    handful of sweeps suffice however many donors there are. Targets
+    finish when their Frank-Wolfe duality gap, an upper bound on the
+    excess loss, falls below tol times their single-donor loss.
+
+    Args:
+        donors: (n_periods, n_donors) pre-treatment donor outcomes
+        targets: (n_periods, n_targets) pre-treatment outcomes to match
+        excluded: (n_targets,) donor excluded from each target's pool
+            (-1 for none), e.g. the placebo unit itself
+        penalty: Weight of the donor-discrepancy penalty
+        tol: Relative duality-gap tolerance
+        max_iter: Maximum sweeps (default 10 x (periods + 1))
+
+    Returns:
+        (n_donors, n_targets) weights and the sweeps used
+    """
+    n_periods, n_donors = donors.shape
+    n_targets = targets.shape[1]
+    max_iter = max_iter or 10 * (n_periods + 1)
+    columns = np.arange(n_targets)
+    excluded = np.full(n_targets, -1) if excluded is None else excluded
+    has_excluded = excluded >= 0
+
+    # Half-gradient D'(Dw - t) + c with c the per-donor penalty discrepancies
+    linear = -(donors.T @ targets)
+    if penalty:
+        discrepancy = (targets ** 2).sum(axis=0) + 2 * linear + (donors ** 2).sum(axis=0)[:, None]
+        linear += penalty / 2 * discrepancy
+
+    # Start from the best vertex: loss(e_j) = |t|^2/2 + linear_j + |D_j|^2/2
+    vertex_loss = (targets ** 2).sum(axis=0) / 2 + linear + (donors ** 2).sum(axis=0)[:, None] / 2
+    vertex_loss[excluded[has_excluded], columns[has_excluded]] = np.inf
+    start = vertex_loss.argmin(axis=0)
+    scale = np.maximum(np.abs(vertex_loss[start, columns]), np.finfo(float).tiny)
+
+    supports = [np.array([j]) for j in start]
+    values = [np.ones(1) for _ in range(n_targets)]
+    fitted = donors[:, start].copy()
+    active = columns
+
+    for iteration in range(1, max_iter + 1):
+        gradient = donors.T @ fitted[:, active] + linear[:, active]
+        blocked = has_excluded[active]
+        gradient[excluded[active[blocked]], np.flatnonzero(blocked)] = np.inf
+        entering = gradient.argmin(axis=0)
+        gap = np.array([values[b] @ gradient[supports[b], i] for i, b in enumerate(active)])
+        gap -= gradient[entering, np.arange(len(active))]
+        done = gap <= tol * scale[active]
+        active, entering = active[~done], entering[~done]
+        if len(active) == 0:
+            break
+
+        for b, j in zip(active, entering):
+            support, weights = supports[b], values[b]
+            if j not in support:
+                support, weights = np.append(support, j), np.append(weights, 0.0)
+            while True:
+                if len(support) > n_periods + 1:
+                    # Singular on the support: follow a descent direction that
+                    # leaves the fit unchanged until a weight hits zero
+                    direction = np.linalg.svd(np.vstack([donors[:, support], np.ones(len(support))]))[2][-1]
+                    if direction @ linear[support, b] > 0:
+                        direction = -direction
+                    negative = direction < 0
+                    step = weights[negative] / -direction[negative]
+                    leaving = np.flatnonzero(negative)[step.argmin()]
+                    weights = weights + step.min() * direction
+                else:
+                    solution = _support_solve(donors[:, support], linear[support, b])
+                    negative = solution < 0
+                    if not negative.any():
+                        weights = solution
+                        break
+                    # Step towards the solution until the first weight hits zero
+                    step = weights[negative] / (weights[negative] - solution[negative])
+                    leaving = np.flatnonzero(negative)[step.argmin()]
+                    weights = weights + step.min() * (solution - weights)
+                weights[leaving] = 0.0
+                keep = weights > 0
+                support, weights = support[keep], weights[keep]
+            supports[b], values[b] = support, weights
+            fitted[:, b] = donors[:, support] @ weights
+
+    result = np.zeros((n_donors, n_targets))
+    for b in range(n_targets):
+        result[supports[b], b] = values[b]
+    return result, iteration
+
+
+def _weights_chunk(n_pre: int, targets: np.ndarray, excluded: np.ndarray,
+                   penalty: float, tol: float, max_iter: Optional[int]) -> np.ndarray:
+    """Donor weights for a batch of units of one cohort (worker side)."""
+    wide, donors = _shared['wide'], _shared['donors']
+    donor_pre, target_pre = wide[donors, :n_pre].T, wide[targets, :n_pre].T
+    if _shared['demean']:
+        donor_pre = donor_pre - donor_pre.mean(axis=0)
+        target_pre = target_pre - target_pre.mean(axis=0)
+    weights, _ = solve_donor_weights(donor_pre, target_pre, excluded, penalty, tol, max_iter)
+    return weights
+
+
+class SyntheticControl:
+    """
+    Per-unit synthetic controls for staggered adoption with placebo inference.
+
+    Requires a balanced panel. Donors are never-treated units (including
+    units first treated after the panel ends).
+    """
+
+    def __init__(self, min_pre_periods: int = 4, penalty: float = 0.1, demean: bool = False,
+                 n_placebos: Optional[int] = 200, n_draws: int = 999,
+                 chunk_size: int = 256, n_workers: Optional[int] = None,
+                 tol: float = 1e-10, max_iter: Optional[int] = None, seed: Optional[int] = None,
+                 unit: str = 'firm_id', time: str = 'period', adoption: str = 'adoption_period'):
+        """
+        Args:
+            min_pre_periods: Treated units with fewer pre-adoption periods
+                are skipped
+            penalty: Donor-discrepancy penalty (0 for the classic synthetic
+                control, which interpolates exactly whenever a unit lies in
+                the donors' convex hull)
+            demean: Match pre-period deviations from each unit's pre-period
+                mean (an intercept-shifted synthetic control)
+            n_placebos: Donors re-fitted as placebos per cohort (None for all)
+            n_draws: Placebo assignments for the aggregate effects
+            chunk_size: Units per batched solve
+            n_workers: Worker processes (None uses every CPU, 1 runs in this
+                process)
+            tol: Relative duality-gap tolerance of the weight solver
+            max_iter: Maximum active-set sweeps per batch
+            seed: Seed for placebo selection and assignment draws
+            unit: Unit identifier column
+            time: Period column
+            adoption: First treated period column (missing for never-treated)
+        """
+        self.min_pre_periods = min_pre_periods
+        self.penalty = penalty
+        self.demean = demean
+        self.n_placebos = n_placebos
+        self.n_draws = n_draws
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.tol = tol
+        self.max_iter = max_iter
+        self.seed = seed
+        self.unit = unit
+        self.time = time
+        self.adoption = adoption
+
+    def fit(self, data: pd.DataFrame, outcome: str = 'productivity_growth') -> Dict:
+        """
+        Fit synthetic controls for every treated unit and its placebos.
+
+        Args:
+            data: Balanced panel with unit, time, adoption and outcome columns
+            outcome: Outcome column
+
+        Returns:
+            Dictionary with 'unit_effects' (per treated unit: cohort, ATT,
+            pre/post RMSPE, RMSPE ratio and placebo p-value), 'event_time'
+            and 'overall' effects with placebo p-values, 'gaps' (treated
+            units x periods), 'weights' (sparse treated units x donors) and
+            'donors' (donor unit labels)
+        """
+        units, unit_labels = pd.factorize(data[self.unit])
+        periods = np.unique(data[self.time].to_numpy())
+        period_index = np.searchsorted(periods, data[self.time].to_numpy())
+        n_units, n_periods = len(unit_labels), len(periods)
+
+        wide = np.full((n_units, n_periods), np.nan)
+        wide[units, period_index] = data[outcome].to_numpy(dtype=float)
+        if np.isnan(wide).any():
+            raise ValueError("SyntheticControl requires a balanced panel without missing outcomes")
+
+        first_treated = np.full(n_units, np.nan)
+        first_treated[units] = data[self.adoption].to_numpy(dtype=float, na_value=np.nan)
+        cohort_of = np.searchsorted(periods, np.nan_to_num(first_treated, nan=np.inf))
+        donors = np.flatnonzero(cohort_of == n_periods)
+        treated = np.flatnonzero((cohort_of >= self.min_pre_periods) & (cohort_of < n_periods))
+        if len(donors) < 2 or len(treated) == 0:
+            raise ValueError("Need at least two never-treated donors and one treated unit")
+
+        rng = np.random.default_rng(self.seed)
+        cohorts = np.unique(cohort_of[treated])
+        placebos = {}
+        for g in cohorts:
+            size = len(donors) if self.n_placebos is None else min(self.n_placebos, len(donors))
+            placebos[g] = np.sort(rng.choice(len(donors), size, replace=False))
+
+        weights = self._solve_all(wide, donors, cohorts, treated, cohort_of, placebos)
+
+        # Gaps over the full path, matched in levels or pre-period deviations
+        def gaps_for(targets, unit_weights, g):
+            actual, synthetic = wide[targets], unit_weights.T @ wide[donors]
+            if self.demean:
+                actual = actual - actual[:, :g].mean(axis=1, keepdims=True)
+                synthetic = synthetic - synthetic[:, :g].mean(axis=1, keepdims=True)
+            return actual - synthetic
+
+        unit_rows, gap_rows, weight_rows = [], [], []
+        placebo_gaps, placebo_ratios = {}, {}
+        for g in cohorts:
+            members = treated[cohort_of[treated] == g]
+            cohort_weights, placebo_weights = weights[g]
+            gaps = gaps_for(members, cohort_weights, g)
+            pre, post = self._rmspe(gaps, g)
+
+            placebo_gaps[g] = gaps_for(donors[placebos[g]], placebo_weights, g)
+            placebo_pre, placebo_post = self._rmspe(placebo_gaps[g], g)
+            placebo_ratios[g] = np.sort(placebo_post / placebo_pre)
+
+            ratio = post / pre
+            exceed = len(placebo_ratios[g]) - np.searchsorted(placebo_ratios[g], ratio, side='left')
+            unit_rows.append(pd.DataFrame({
+                'cohort': periods[g],
+                'att': gaps[:, g:].mean(axis=1),
+                'pre_rmspe': pre,
+                'post_rmspe': post,
+                'rmspe_ratio': ratio,
+                'p_value': (exceed + 1) / (len(placebo_ratios[g]) + 1)
+            }, index=members))
+            gap_rows.append(gaps)
+            weight_rows.append(sparse.csr_matrix(cohort_weights.T))
+
+        unit_effects = pd.concat(unit_rows)
+        order = np.argsort(unit_effects.index.to_numpy(), kind='stable')
+        labels = pd.Index(unit_labels[unit_effects.index.to_numpy()], name=self.unit)
+        unit_effects.index = labels
+        gaps = pd.DataFrame(np.vstack(gap_rows), index=labels, columns=pd.Index(periods, name=self.time))
+
+        event_time, overall = self._aggregate(gap_rows, placebo_gaps, cohorts, n_periods, rng)
+        return {
+            'unit_effects': unit_effects.iloc[order],
+            'event_time': event_time,
+            'overall': overall,
+            'gaps': gaps.iloc[order],
+            'weights': sparse.vstack(weight_rows).tocsr()[order],
+            'donors': pd.Index(unit_labels[donors], name=self.unit)
+        }
+
+    def _solve_all(self, wide: np.ndarray, donors: np.ndarray, cohorts: np.ndarray,
+                   treated: np.ndarray, cohort_of: np.ndarray,
+                   placebos: Dict[int, np.ndarray]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """Donor weights of treated units and placebos, batched by cohort."""
+        tasks: List[Tuple[int, str, np.ndarray, np.ndarray]] = []
+        for g in cohorts:
+            members = treated[cohort_of[treated] == g]
+            for kind, targets, excluded in (('treated', members, np.full(len(members), -1)),
+                                            ('placebo', donors[placebos[g]], placebos[g])):
+                for start in range(0, len(targets), self.chunk_size):
+                    stop = start + self.chunk_size
+                    tasks.append((g, kind, targets[start:stop], excluded[start:stop]))
+
+        n_workers = min(self.n_workers, len(tasks))
+        arrays = {'wide': wide, 'donors': donors, 'demean': np.array(self.demean)}
+        if n_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_shared,
+                                           initargs=(arrays,))
+        else:
+            _init_shared(arrays)
+            executor = _InlineExecutor()
+        try:
+            futures = [executor.submit(_weights_chunk, g, targets, excluded, self.penalty,
+                                       self.tol, self.max_iter)
+                       for g, _, targets, excluded in tasks]
+            solved = [future.result() for future in futures]
+        finally:
+            executor.shutdown()
+            _shared.clear()
+
+        weights = {g: ([], []) for g in cohorts}
+        for (g, kind, _, _), chunk in zip(tasks, solved):
+            weights[g][kind == 'placebo'].append(chunk)
+        return {g: (np.hstack(treated_chunks), np.hstack(placebo_chunks))
+                for g, (treated_chunks, placebo_chunks) in weights.items()}
+
+    @staticmethod
+    def _rmspe(gaps: np.ndarray, g: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Root mean squared prediction error before and after adoption."""
+        return np.sqrt((gaps[:, :g] ** 2).mean(axis=1)), np.sqrt((gaps[:, g:] ** 2).mean(axis=1))
+
+    def _aggregate(self, gap_rows: List[np.ndarray], placebo_gaps: Dict[int, np.ndarray],
+                   cohorts: np.ndarray, n_periods: int,
+                   rng: np.random.Generator) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Event-time and overall ATTs with placebo-assignment p-values.
+
+        A draw gives every treated unit a random placebo of its cohort, so
+        per cohort it is a multinomial count vector times the placebo gaps.
+        """
+        event_times = np.arange(-n_periods + 1, n_periods)
+        offset = n_periods - 1
+        sums = np.zeros(len(event_times))
+        counts = np.zeros(len(event_times))
+        draw_sums = np.zeros((self.n_draws, len(event_times)))
+        overall_sum, n_treated = 0.0, 0
+        overall_draws = np.zeros(self.n_draws)
+
+        for g, gaps in zip(cohorts, gap_rows):
+            columns = np.arange(n_periods) - g + offset
+            sums[columns] += gaps.sum(axis=0)
+            counts[columns] += len(gaps)
+            overall_sum += gaps[:, g:].mean(axis=1).sum()
+            n_treated += len(gaps)
+
+            placebo = placebo_gaps[g]
+            assigned = rng.multinomial(len(gaps), np.full(len(placebo), 1 / len(placebo)),
+                                       size=self.n_draws).astype(float)
+            draw_sums[:, columns] += assigned @ placebo
+            overall_draws += assigned @ placebo[:, g:].mean(axis=1)
+
+        observed = counts > 0
+        att = sums[observed] / counts[observed]
+        draws = draw_sums[:, observed] / counts[observed]
+        overall_att = overall_sum / n_treated
+        overall_draws /= n_treated
+
+        event_time = pd.DataFrame({
+            'att': att,
+            'placebo_std': draws.std(axis=0),
+            'p_value': ((np.abs(draws) >= np.abs(att)).sum(axis=0) + 1) / (self.n_draws + 1),
+            'n_treated': counts[observed].astype(int)
+        }, index=pd.Index(event_times[observed], name='event_time'))
+        overall = pd.Series({
+            'att': overall_att,
+            'placebo_std': overall_draws.std(),
+            'p_value': ((np.abs(overall_draws) >= abs(overall_att)).sum() + 1) / (self.n_draws + 1),
+            'n_treated': n_treated
+        })
+        return event_time, overall
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bass_calibration import BassCalibrator
+from simulation_engine import AIAdoptionSimulator, SimulationParameters, ScenarioType
+
+
+def _simulate(market_potential):
+    simulator = AIAdoptionSimulator(SimulationParameters(num_simulations=200, time_horizon=10))
+    simulator.diffusion_params['market_potential'] = market_potential
+    return simulator.simulate_adoption_scenario(ScenarioType.BASELINE, seed=7)
+
+
+def test_market_potential_changes_adoption_paths():
+    full, reduced = _simulate(1.0), _simulate(0.5)
+    for metric in ('sme_adoption', 'large_adoption', 'overall_adoption'):
+        assert not np.allclose(full[metric], reduced[metric])
+    assert reduced['sme_adoption'].max() <= 0.5 * 0.8 + 1e-12
+    assert reduced['large_adoption'].max() <= 0.5 * 0.9 + 1e-12
+
+
+def test_apply_to_simulator_sets_baseline_ceiling():
+    simulator = AIAdoptionSimulator()
+    fits = pd.DataFrame({'p': [0.02, 0.04], 'q': [0.3, 0.5], 'm': [0.5, 0.7]}, index=['a', 'b'])
+    BassCalibrator.apply_to_simulator(simulator, fits)
+    coefficients = simulator._diffusion_coefficients(
+        simulator._get_scenario_multipliers(ScenarioType.BASELINE))
+    ceiling = (simulator.SME_WEIGHT * coefficients['sme_m'] +
+               simulator.LARGE_WEIGHT * coefficients['large_m'])
+    assert ceiling == pytest.approx(0.6)
+
+
+def test_fit_rejects_segment_without_observations():
+    observed = pd.DataFrame({'a': [0.1, 0.2, 0.3], 'b': [np.nan] * 3})
+    with pytest.raises(ValueError, match='b'):
+        BassCalibrator(n_workers=1).fit(observed)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from heterogeneity import HeterogeneityCube
+
+
+def _cube(size):
+    units = pd.Index([0, 1, 2, 3], name='firm_id')
+    dimensions = {
+        'size': pd.Series(pd.Categorical(size, categories=['small', 'large']), index=units),
+        'industry': pd.Series(pd.Categorical(['a', 'a', 'b', 'b']), index=units)
+    }
+    data = pd.DataFrame({
+        'firm_id': np.repeat(units, 2),
+        'ai_adoption': np.repeat([1, 0, 1, 0], 2),
+        'post_treatment': np.tile([0, 1], 4) * np.repeat([1, 0, 1, 0], 2),
+        'y': np.arange(8, dtype=float)
+    })
+    return HeterogeneityCube(data, dimensions, ['y'])
+
+
+def test_missing_dimension_kept_in_other_marginals():
+    complete = _cube(['small', 'large', 'small', 'large'])
+    missing = _cube([None, 'large', 'small', 'large'])
+
+    # Firm 0 has no size but still counts towards its industry and the total
+    pd.testing.assert_frame_equal(missing.moments('y', by=['industry']),
+                                  complete.moments('y', by=['industry']))
+    pd.testing.assert_frame_equal(missing.effects('y'), complete.effects('y'))
+
+    by_size = missing.moments('y', by=['size'])
+    assert list(by_size.index) == ['small', 'large']
+    assert by_size[('n_firms', 'treated')].tolist() == [1, 0]
+    assert missing.moments('y', where={'size': 'small'})[('n_firms', 'treated')].tolist() == [1]
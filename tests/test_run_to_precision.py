@@ -0,0 +1,18 @@
+import warnings
+
+import numpy as np
+
+from simulation_engine import AIAdoptionSimulator, ScenarioType
+
+
+def test_zero_statistic_uses_absolute_half_width():
+    simulator = AIAdoptionSimulator()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        # Every path starts at the same market size, so its year-0 spread is zero
+        result = simulator.run_to_precision(ScenarioType.BASELINE, {'market_size': {'std': 0.01}},
+                                            batch_size=500, max_simulations=50_000, year=0,
+                                            min_batches=5, seed=0)
+    assert result['converged']
+    assert result['num_simulations'] == 2_500
+    assert np.isfinite(result['precision']['market_size']['std'])
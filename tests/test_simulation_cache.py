@@ -0,0 +1,24 @@
+import os
+
+import numpy as np
+import pytest
+
+from simulation_cache import SimulationCache
+
+
+def test_round_trip_with_python_scalars(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    results = {'n': 5, 'label': 'a', 'share': 0.25, 'flag': True, 'missing': None,
+               'numpy': np.float64(1.5), 'paths': np.arange(6.0).reshape(2, 3), 'items': [1, 'b']}
+    cache.store('entry', results)
+
+    loaded = cache.load('entry')
+    np.testing.assert_array_equal(loaded.pop('paths'), results.pop('paths'))
+    assert loaded == results
+
+
+def test_failed_store_leaves_no_staging_directory(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    with pytest.raises(TypeError):
+        cache.store('entry', {'bad': object()})
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from simulation_engine import AIAdoptionSimulator, SimulationParameters, load_results
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    simulator = AIAdoptionSimulator(SimulationParameters(num_simulations=100))
+    simulator.run_comprehensive_analysis()
+    return simulator
+
+
+@pytest.mark.parametrize('format', ['npz', 'parquet'])
+def test_export_round_trip(simulator, tmp_path, format):
+    # No suffix: NPZ gains '.npz', and loading detects the format either way
+    path = simulator.export_results(str(tmp_path / 'results'), format=format)
+    loaded = load_results(path, scenarios=['baseline'], metrics=['overall_adoption'], years=[0, 3])
+
+    expected = simulator.results['baseline']['raw_data']['overall_adoption'][:, [0, 3]]
+    np.testing.assert_array_equal(loaded['baseline']['raw_data']['overall_adoption'], expected)
+    assert 'raw_data' not in loaded['optimistic']
+
+
+def test_load_rejects_unknown_format(tmp_path):
+    path = tmp_path / 'results.json'
+    path.write_text('{}')
+    with pytest.raises(ValueError):
+        load_results(str(path))
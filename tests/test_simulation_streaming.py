@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from simulation_engine import AIAdoptionSimulator, SimulationParameters
+
+
+def test_cancel_async_stream_mid_chunk():
+    simulator = AIAdoptionSimulator(SimulationParameters(num_simulations=400_000))
+    updates = []
+
+    async def consume():
+        async for update in simulator.astream_comprehensive_analysis(chunk_size=100_000, seed=0):
+            updates.append(update)
+
+    async def main():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert len(updates) < 20